@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 from dotenv import load_dotenv
+from corsheaders.defaults import default_headers
 import os
 
 load_dotenv()
@@ -44,6 +45,9 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:5174",
 ]
 
+# Allow clients to send Idempotency-Key on retried POSTs
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
+
 
 # Application definition
 INSTALLED_APPS = [
@@ -70,7 +74,10 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'learning.middleware.MetricsMiddleware',  # Prometheus request/DB metrics (outermost)
     'corsheaders.middleware.CorsMiddleware', # ✅ CORS (Must be early)
+    'learning.middleware.QueryInstrumentationMiddleware',  # Server-Timing + slow-request logs
+    'learning.middleware.NPlusOneMiddleware',  # Repeated-query detection (DEBUG only by default)
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,8 +85,49 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'learning.middleware.ProfilingMiddleware',  # Admin-only X-Profile requests (after auth)
 ]
 
+# Per-request SQL instrumentation (learning/instrumentation.py).
+# Off unless QUERY_INSTRUMENTATION=1; disabled means the middleware is not loaded.
+QUERY_INSTRUMENTATION = {
+    "ENABLED": os.getenv("QUERY_INSTRUMENTATION", "0") == "1",
+    "SERVER_TIMING": True,
+    "LOG_THRESHOLD_MS": int(os.getenv("QUERY_LOG_THRESHOLD_MS", "500")),
+    "LOG_QUERY_COUNT": int(os.getenv("QUERY_LOG_QUERY_COUNT", "50")),
+}
+
+# N+1 detection (learning/utils/nplusone.py): flags a query template repeated
+# more than THRESHOLD times from the same line in one request.
+# MODE: "warn" (Python warning), "log" (learning.performance) or "raise".
+N_PLUS_ONE_DETECTION = {
+    "ENABLED": os.getenv("N_PLUS_ONE_DETECTION", "1" if DEBUG else "0") == "1",
+    "THRESHOLD": int(os.getenv("N_PLUS_ONE_THRESHOLD", "5")),
+    "MODE": os.getenv("N_PLUS_ONE_MODE", "warn"),
+}
+
+# On-demand profiling (learning/profiling.py): admins send "X-Profile: 1"
+# (cProfile) or "X-Profile: sample" (stack sampler); results are listed at
+# /api/admin-api/profiles/. Off unless REQUEST_PROFILING=1.
+PROFILING = {
+    "ENABLED": os.getenv("REQUEST_PROFILING", "0") == "1",
+    "DIR": os.getenv("PROFILING_DIR", str(BASE_DIR / "request_profiles")),
+    "MAX_PER_MINUTE": int(os.getenv("PROFILING_MAX_PER_MINUTE", "6")),
+    "MAX_FILES": 200,
+    "SAMPLE_INTERVAL_MS": 5,
+}
+
+# Prometheus metrics at /api/metrics/ (learning/metrics.py). Off unless
+# METRICS_ENABLED=1; scrapes must send "Authorization: Bearer <TOKEN>" and the
+# endpoint refuses to serve while no token is set. Set MULTIPROCESS_DIR when
+# running several worker processes so the endpoint merges all of them.
+METRICS = {
+    "ENABLED": os.getenv("METRICS_ENABLED", "0") == "1",
+    "TOKEN": os.getenv("METRICS_TOKEN"),
+    "MULTIPROCESS_DIR": os.getenv("METRICS_MULTIPROCESS_DIR"),
+    "FLUSH_INTERVAL": 5,
+}
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -100,6 +148,25 @@ TEMPLATES = [
 WSGI_APPLICATION = 'core.wsgi.application'
 ASGI_APPLICATION = 'core.asgi.application'
 
+# Cache (course structure, instructor trends, idempotency keys, profiling rate
+# limit). Versioned keys are only invalidated for every worker when the cache
+# is shared: set REDIS_CACHE_URL (needs the redis package) whenever more than
+# one process serves requests. Without it each process keeps its own memory
+# cache and learning/structure.py falls back to a few seconds' TTL.
+if os.getenv("REDIS_CACHE_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv("REDIS_CACHE_URL"),
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
 # Channel Layers (in-memory for development)
 CHANNEL_LAYERS = {
     'default': {
@@ -122,6 +189,11 @@ DATABASES = {
     }
 }
 
+# Monthly range partitions for QuizAttempt on PostgreSQL (see learning/partitions.py).
+# Migration 0020 converts the table when this is on; to turn it on later, run
+# `manage.py quiz_attempt_partitions --convert`.
+QUIZ_ATTEMPT_PARTITIONING = os.getenv("QUIZ_ATTEMPT_PARTITIONING", "0") == "1"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
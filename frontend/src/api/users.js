@@ -12,8 +12,12 @@ export const updateProfile = (formData) => {
 };
 
 // Admin functions
-export const fetchUsers = (role = "ALL") => {
-    return api.get(`/admin-api/users/?role=${role}`);
+// Paginated: pass `after` = next_cursor from the previous page
+export const fetchUsers = ({ role = "ALL", status = "ALL", q = "", after = null, count = "approx" } = {}) => {
+    const params = { role, status, count };
+    if (q) params.q = q;
+    if (after) params.after = after;
+    return api.get("/admin-api/users/", { params });
 };
 
 export const toggleUserStatus = (userId) => {
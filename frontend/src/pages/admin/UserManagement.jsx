@@ -21,11 +21,16 @@ const UserManagement = () => {
     const [filterStatus, setFilterStatus] = useState("ALL");
     const [toggleLoading, setToggleLoading] = useState(null); // Track which user is being toggled
     const [successMessage, setSuccessMessage] = useState(null); // Success feedback
+    const [nextCursor, setNextCursor] = useState(null);
+    const [totalCount, setTotalCount] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const navigate = useNavigate();
 
+    // Filtering happens on the server; debounce typing in the search box
     useEffect(() => {
-        loadUsers();
-    }, []);
+        const timer = setTimeout(() => loadUsers(), 300);
+        return () => clearTimeout(timer);
+    }, [searchQuery, filterRole, filterStatus]);
 
     // Auto-hide success message after 3 seconds
     useEffect(() => {
@@ -38,10 +43,11 @@ const UserManagement = () => {
     const loadUsers = async () => {
         try {
             setLoading(true);
-            // Fetch ALL users once for frontend filtering
-            const res = await fetchUsers("ALL");
-            console.log("✅ Loaded users:", res.data.length);
-            setUsers(res.data);
+            const res = await fetchUsers({ role: filterRole, status: filterStatus, q: searchQuery.trim() });
+            console.log("✅ Loaded users:", res.data.results.length);
+            setUsers(res.data.results);
+            setNextCursor(res.data.next_cursor);
+            setTotalCount(res.data.count ?? null);
             setError(null);
         } catch (err) {
             console.error("❌ Failed to load users:", err);
@@ -52,6 +58,22 @@ const UserManagement = () => {
         }
     };
 
+    const loadMore = async () => {
+        if (!nextCursor || loadingMore) return;
+        try {
+            setLoadingMore(true);
+            const res = await fetchUsers({
+                role: filterRole, status: filterStatus, q: searchQuery.trim(), after: nextCursor, count: null
+            });
+            setUsers((prev) => [...prev, ...res.data.results]);
+            setNextCursor(res.data.next_cursor);
+        } catch (err) {
+            console.error("❌ Failed to load more users:", err);
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     const handleToggle = async (userId) => {
         // Prevent multiple clicks while toggle is in progress
         if (toggleLoading === userId) {
@@ -106,20 +128,11 @@ const UserManagement = () => {
         navigate(`/profile?user_id=${userId}`);
     };
 
-    const filteredUsers = users.filter((user) => {
-        const matchesSearch =
-            user.username.toLowerCase().includes(searchQuery.toLowerCase()) ||
-            (user.email && user.email.toLowerCase().includes(searchQuery.toLowerCase()));
-
-        const matchesRole =
-            filterRole === "ALL" || (user.role && user.role.toUpperCase() === filterRole);
-
-        const matchesStatus =
-            filterStatus === "ALL" ||
-            (filterStatus === "ACTIVE" ? user.is_active : !user.is_active);
-
-        return matchesSearch && matchesRole && matchesStatus;
-    });
+    // The server already applied the filters; this only hides rows whose
+    // status was toggled out of the current status filter
+    const filteredUsers = users.filter((user) =>
+        filterStatus === "ALL" || (filterStatus === "ACTIVE" ? user.is_active : !user.is_active)
+    );
 
     return (
         <div className="bg-slate-900 border border-slate-800 rounded-2xl overflow-hidden shadow-xl mt-8">
@@ -312,7 +325,16 @@ const UserManagement = () => {
 
             {/* Footer Info */}
             <div className="p-4 bg-slate-950/30 border-t border-slate-800 text-center text-xs text-slate-500">
-                Showing {filteredUsers.length} users
+                Showing {filteredUsers.length}{totalCount !== null ? ` of about ${totalCount}` : ""} users
+                {nextCursor && (
+                    <button
+                        onClick={loadMore}
+                        disabled={loadingMore}
+                        className="ml-4 px-3 py-1 rounded-lg bg-slate-800 text-slate-300 hover:bg-slate-700 disabled:opacity-50"
+                    >
+                        {loadingMore ? "Loading..." : "Load more"}
+                    </button>
+                )}
             </div>
         </div>
     );
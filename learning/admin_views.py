@@ -4,17 +4,30 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count, Avg
-from django.http import HttpResponse
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from django.db.models import Count, Avg, DateField, Exists, OuterRef, Q, Sum, prefetch_related_objects
+from django.db.models.functions import Trunc
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils import timezone
 import csv
+import os
+from datetime import date
+from itertools import islice
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
 from reportlab.lib.styles import getSampleStyleSheet
 
+from . import archive, counters, jobs, profiling, retirement, rollups, user_import
+from .auth_tokens import blacklist_user_tokens
+from .metrics import EXPORT_DURATION
 from .permissions import IsAdmin
-from .models import Course, Enrollment, Quiz, QuizAttempt, User
+from .models import (
+    Course, DailyActivity, DailyNewUsers, Enrollment, Quiz, QuizAttempt, Role, User,
+)
+from .utils import timeseries
 
 User = get_user_model()
 
@@ -22,19 +35,46 @@ User = get_user_model()
 # ADMIN DASHBOARD & ANALYTICS
 # =======================
 
+def _read_counters(request):
+    """
+    Platform counters in the mode given by ?mode=counter|approx|exact
+    (see learning/counters.py), or None if the mode is unknown.
+    """
+    mode = request.query_params.get("mode", "counter")
+    if mode not in counters.MODES:
+        return None
+    return counters.read(mode)
+
+
+def _bad_mode():
+    return Response(
+        {"error": f"mode must be one of: {', '.join(counters.MODES)}"},
+        status=status.HTTP_400_BAD_REQUEST,
+    )
+
+
 class AdminDashboardView(APIView):
     """
     Admin checks system stats.
+    Numbers come from the platform counters; "freshness" says how current each one is.
     """
     permission_classes = [IsAuthenticated, IsAdmin]
 
+    STATS = {
+        "users_count": "users",
+        "courses_count": "courses",
+        "enrollments_count": "enrollments",
+        "quizzes_count": "quizzes",
+    }
+
     def get(self, request):
-        stats = {
-            "users_count": User.objects.count(),
-            "courses_count": Course.objects.count(),
-            "enrollments_count": Enrollment.objects.count(),
-            "quizzes_count": Quiz.objects.count(),
-        }
+        result = _read_counters(request)
+        if result is None:
+            return _bad_mode()
+        values, freshness = result
+
+        stats = {key: values.get(name, 0) for key, name in self.STATS.items()}
+        stats["freshness"] = {name: freshness.get(name) for name in self.STATS.values()}
         return Response(stats)
 
 
@@ -42,63 +82,178 @@ class AdminAnalyticsView(APIView):
     permission_classes = [IsAuthenticated, IsAdmin]
 
     def get(self, request):
-        users_by_role = (
-            User.objects
-            .values("role__name")
-            .annotate(count=Count("id"))
-        )
-
-        total_courses = Course.objects.count()
-        published_courses = Course.objects.filter(is_published=True).count()
-        total_enrollments = Enrollment.objects.count()
-
-        total_attempts = QuizAttempt.objects.count()
-        passed_attempts = QuizAttempt.objects.filter(is_passed=True).count()
+        result = _read_counters(request)
+        if result is None:
+            return _bad_mode()
+        values, freshness = result
+
+        role_names = dict(Role.all_objects.values_list("id", "name"))
+        users_by_role = {}
+        shown = {}
+        for role_id, role_name in role_names.items():
+            name = f"users.role.{role_id}"
+            if values.get(name):
+                users_by_role[role_name] = values[name]
+                shown[f"users.role.{role_name}"] = freshness.get(name)
+
+        total_attempts = values.get("attempts", 0)
+        passed_attempts = values.get("attempts.passed", 0)
 
         pass_rate = (
             round((passed_attempts / total_attempts) * 100, 2)
             if total_attempts > 0 else 0
         )
 
+        for name in ("courses", "courses.published", "enrollments", "attempts", "attempts.passed"):
+            shown[name] = freshness.get(name)
+
         return Response({
-            "users_by_role": {
-                item["role__name"]: item["count"]
-                for item in users_by_role
-            },
+            "users_by_role": users_by_role,
             "courses": {
-                "total": total_courses,
-                "published": published_courses,
+                "total": values.get("courses", 0),
+                "published": values.get("courses.published", 0),
             },
-            "enrollments": total_enrollments,
+            "enrollments": values.get("enrollments", 0),
             "quiz_pass_rate_percent": pass_rate,
+            "freshness": shown,
+        })
+
+
+class AdminAnalyticsTimeSeriesView(APIView):
+    """
+    Platform trends from the daily rollups (see learning/rollups.py).
+    ?bucket=day|week|month&start=YYYY-MM-DD&end=YYYY-MM-DD; empty buckets are
+    returned as zeros. Days after "rolled_up_through" are not rolled up yet.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        try:
+            bucket, start, end = timeseries.parse_range(request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        period = Trunc("day", bucket, output_field=DateField())
+        activity = (
+            DailyActivity.objects
+            .filter(day__gte=start, day__lte=end)
+            .annotate(period=period)
+            .values("period")
+            .annotate(
+                enrollments=Sum("enrollments"),
+                lesson_completions=Sum("lesson_completions"),
+                quiz_attempts=Sum("quiz_attempts"),
+                quiz_passes=Sum("quiz_passes"),
+                score_total=Sum("score_total"),
+                scored_attempts=Sum("scored_attempts"),
+                ratings=Sum("ratings"),
+                rating_total=Sum("rating_total"),
+            )
+            .order_by()
+        )
+        by_period = {row.pop("period"): row for row in activity}
+
+        new_users = {}
+        registrations = (
+            DailyNewUsers.objects
+            .filter(day__gte=start, day__lte=end)
+            .annotate(period=period)
+            .values("period", "role__name")
+            .annotate(count=Sum("count"))
+            .order_by()
+        )
+        for row in registrations:
+            new_users.setdefault(row["period"], {})[row["role__name"]] = row["count"]
+
+        series = []
+        for bucket_start in timeseries.periods(start, end, bucket):
+            row = by_period.get(bucket_start, {})
+            scored, rated = row.get("scored_attempts") or 0, row.get("ratings") or 0
+            series.append({
+                "period": bucket_start,
+                "enrollments": row.get("enrollments") or 0,
+                "lesson_completions": row.get("lesson_completions") or 0,
+                "quiz_attempts": row.get("quiz_attempts") or 0,
+                "quiz_passes": row.get("quiz_passes") or 0,
+                "average_score": round(row["score_total"] / scored, 2) if scored else None,
+                "ratings": rated,
+                "average_rating": round(row["rating_total"] / rated, 2) if rated else None,
+                "new_users": new_users.get(bucket_start, {}),
+            })
+
+        return Response({
+            "bucket": bucket,
+            "start": start,
+            "end": end,
+            "rolled_up_through": rollups.watermark_day(),
+            "series": series,
         })
 
 
 class ExportStudentResultsView(APIView):
+    """
+    Quiz results as CSV (?format=excel) or PDF (?format=pdf).
+    ?start / ?end (dates, inclusive) limit the attempts, and only the
+    matching months are read when QuizAttempt is partitioned.
+    ?student=<id> limits them to one student.
+    ?include_archived=true adds attempts moved to the archive, read a
+    chunk of segments at a time.
+    """
     permission_classes = [IsAuthenticated, IsAdmin]
 
+    ARCHIVE_CHUNK = 2000
+
     def perform_content_negotiation(self, request, force=False):
         # Bypass DRF content negotiation to prevent 404 on ?format=excel
         return (self.get_renderers()[0], '*/*')
 
     def get(self, request):
         export_format = request.query_params.get("format", "").lower()
+        try:
+            self.window = timeseries.window(request.query_params, "attempted_at")
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        self.student_id = request.query_params.get("student") or None
+        if self.student_id is not None and not self.student_id.isdigit():
+            return Response({"error": "student must be a user id"}, status=status.HTTP_400_BAD_REQUEST)
 
         if export_format == "excel":
-            return self.export_excel()
+            with EXPORT_DURATION.time(format="excel"):
+                return self.export_excel()
 
         if export_format == "pdf":
-            return self.export_pdf()
+            with EXPORT_DURATION.time(format="pdf"):
+                return self.export_pdf()
 
         return Response(
             {"error": "Invalid or missing format. Use ?format=excel or ?format=pdf"},
-            status=400
+            status=status.HTTP_400_BAD_REQUEST,
         )
 
     def get_queryset(self):
-        return QuizAttempt.objects.select_related(
-            "student", "quiz", "quiz__course"
+        attempts = QuizAttempt.objects.filter(**self.window)
+        if self.student_id is not None:
+            attempts = attempts.filter(student_id=self.student_id)
+        return attempts.select_related("student", "quiz", "quiz__course")
+
+    def get_attempts(self):
+        yield from self.get_queryset()
+        if not archive.include_archived(self.request):
+            return
+        archived = archive.archived(
+            "attempts",
+            user_id=self.student_id,
+            start=self.window.get("attempted_at__gte"),
+            end=self.window.get("attempted_at__lt"),
         )
+        while chunk := list(islice(archived, self.ARCHIVE_CHUNK)):
+            # Attempts of purged courses have nothing left to report against
+            quiz_ids = set(
+                Quiz.all_objects.filter(pk__in={a.quiz_id for a in chunk}).values_list("pk", flat=True)
+            )
+            chunk = [a for a in chunk if a.quiz_id in quiz_ids]
+            prefetch_related_objects(chunk, "student", "quiz__course")
+            yield from chunk
 
     def export_excel(self):
         response = HttpResponse(content_type="text/csv")
@@ -114,7 +269,7 @@ class ExportStudentResultsView(APIView):
             "Attempted At"
         ])
 
-        for a in self.get_queryset():
+        for a in self.get_attempts():
             writer.writerow([
                 a.student.username,
                 a.quiz.course.title,
@@ -140,7 +295,7 @@ class ExportStudentResultsView(APIView):
         # Table Data
         data = [["Student", "Course", "Score", "Status", "Date"]]
         
-        for a in self.get_queryset():
+        for a in self.get_attempts():
             data.append([
                 a.student.username,
                 a.quiz.course.title,
@@ -171,27 +326,77 @@ class ExportStudentResultsView(APIView):
 # =======================
 
 class AdminUserListView(APIView):
+    """
+    Admin user directory, newest first, keyset-paginated on id.
+
+    Query params:
+        role: role name, or ALL (default)
+        status: ACTIVE | INACTIVE | ALL (default)
+        q: case-insensitive prefix of username or email
+        limit: page size (default 50, max 200)
+        after: next_cursor from the previous page
+        count: exact | approx to include a total (omitted by default)
+    """
     permission_classes = [IsAuthenticated, IsAdmin]
 
-    def get(self, request):
-        role_filter = request.query_params.get("role")
-        
-        # Explicit fields as requested
-        queryset = User.objects.select_related("role").all().order_by("-id")
+    DEFAULT_LIMIT = 50
+    MAX_LIMIT = 200
+    FIELDS = ("id", "username", "email", "role__name", "is_active")
 
+    def get(self, request):
+        params = request.query_params
+        try:
+            limit = min(max(int(params.get("limit", self.DEFAULT_LIMIT)), 1), self.MAX_LIMIT)
+            after = int(params["after"]) if params.get("after") else None
+        except ValueError:
+            return Response({"error": "limit and after must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        count_mode = params.get("count")
+        if count_mode not in (None, "exact", "approx"):
+            return Response({"error": "count must be exact or approx"}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = User.objects.all()
+        # Platform counter holding the total while only the role is filtered
+        counter_name = "users"
+        role_filter = params.get("role")
         if role_filter and role_filter != "ALL":
-            queryset = queryset.filter(role__name=role_filter)
-
-        data = []
-        for user in queryset:
-            data.append({
-                "id": user.id,
-                "username": user.username,
-                "email": user.email,
-                "role": user.role.name, # Role is required field
-                "is_active": user.is_active,
-            })
-
+            role_id = Role.all_objects.filter(name=role_filter).values_list("id", flat=True).first()
+            queryset = queryset.filter(role_id=role_id)
+            counter_name = f"users.role.{role_id}"
+        status_filter = params.get("status", "ALL")
+        if status_filter in ("ACTIVE", "INACTIVE"):
+            queryset = queryset.filter(is_active=status_filter == "ACTIVE")
+            counter_name = None
+        search = params.get("q", "").strip()
+        if search:
+            # istartswith matches the UPPER(...) text_pattern_ops indexes
+            queryset = queryset.filter(Q(username__istartswith=search) | Q(email__istartswith=search))
+            counter_name = None
+
+        page = queryset.filter(id__lt=after) if after else queryset
+        rows = list(page.order_by("-id").values(*self.FIELDS)[:limit + 1])
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        data = {
+            "results": [
+                {
+                    "id": row["id"],
+                    "username": row["username"],
+                    "email": row["email"],
+                    "role": row["role__name"],
+                    "is_active": row["is_active"],
+                }
+                for row in rows
+            ],
+            "next_cursor": rows[-1]["id"] if has_more else None,
+        }
+        if count_mode == "exact":
+            data["count"], data["count_source"] = queryset.count(), "exact"
+        elif count_mode == "approx" and counter_name:
+            values, _ = counters.read()
+            data["count"], data["count_source"] = values.get(counter_name, 0), "counter"
+        elif count_mode == "approx":
+            data["count"], data["count_source"] = counters.estimate_count(queryset)
         return Response(data, status=status.HTTP_200_OK)
 
 
@@ -230,6 +435,128 @@ class AdminToggleUserStatusView(APIView):
         }, status=status.HTTP_200_OK)
 
 
+class AdminBulkUserStatusView(APIView):
+    """
+    Activate or deactivate many users with one UPDATE.
+
+    Body:
+        action: activate | deactivate
+        ids: list of user ids, and/or the filters
+        role: role name
+        inactive_since: YYYY-MM-DD; users who signed up before that day and
+            have not been issued a refresh token since (one is issued on every
+            login and every refresh, unlike last_login)
+        course: course id; users enrolled in it
+
+    Admin accounts are excluded in the UPDATE's WHERE clause, so no filter can
+    reach them. Deactivation also blacklists the users' outstanding refresh
+    tokens, in batches, so they cannot mint new access tokens.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def post(self, request):
+        data = request.data
+        action = data.get("action")
+        if action not in ("activate", "deactivate"):
+            return Response({"error": "action must be activate or deactivate"}, status=status.HTTP_400_BAD_REQUEST)
+        if "ids" not in data and not any(data.get(key) for key in ("role", "inactive_since", "course")):
+            # Never fall back to "everyone"
+            return Response({"error": "Give ids or at least one filter"}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = User.objects.all()
+        try:
+            if "ids" in data:
+                ids = data["ids"]
+                if not isinstance(ids, list):
+                    raise ValueError
+                queryset = queryset.filter(id__in=[int(user_id) for user_id in ids])
+            if data.get("course"):
+                queryset = queryset.filter(
+                    id__in=Enrollment.objects.filter(course_id=int(data["course"])).values("student_id")
+                )
+        except (TypeError, ValueError):
+            return Response({"error": "ids must be a list of integers and course an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        if data.get("role"):
+            queryset = queryset.filter(role__name=data["role"])
+        if data.get("inactive_since"):
+            try:
+                since = timeseries.day_start(date.fromisoformat(data["inactive_since"]))
+            except (TypeError, ValueError):
+                return Response({"error": "inactive_since must be a date (YYYY-MM-DD)"}, status=status.HTTP_400_BAD_REQUEST)
+            queryset = queryset.filter(created_at__lt=since).exclude(
+                Exists(OutstandingToken.objects.filter(user_id=OuterRef("pk"), created_at__gte=since))
+            )
+        matched = queryset.aggregate(
+            total=Count("id"), admins=Count("id", filter=Q(role__name="ADMIN"))
+        )
+        targets = queryset.exclude(role__name="ADMIN")
+        active = action == "activate"
+        # is_active is not a counted field, so skipping the save signals is safe
+        updated = targets.filter(is_active=not active).update(is_active=active, updated_at=timezone.now())
+
+        tokens = 0
+        if not active:
+            tokens = blacklist_user_tokens(targets.values("id"))
+
+        return Response({
+            "action": action,
+            "matched": matched["total"],
+            "skipped_admins": matched["admins"],
+            "updated": updated,
+            "unchanged": matched["total"] - matched["admins"] - updated,
+            "tokens_blacklisted": tokens,
+        }, status=status.HTTP_200_OK)
+
+
+class AdminUserImportView(APIView):
+    """
+    Create users in bulk from an uploaded CSV or JSON-lines file
+    (see learning/user_import.py for the columns).
+
+    Multipart fields:
+        file: the upload
+        format: csv | jsonl (default: from the file name)
+        role: role for rows without one (default STUDENT)
+
+    Invalid rows are listed in "errors" and skipped; the rest are created.
+    Files over SYNC_ROWS rows return 202 with a background job whose result
+    is the same summary, since each password costs a PBKDF2 hash.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+    parser_classes = (MultiPartParser, FormParser)
+
+    MAX_ROWS = 50000
+    SYNC_ROWS = 20
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "Upload a file in the 'file' field"}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.data.get("format") or user_import.guess_format(upload.name)
+        if fmt not in user_import.FORMATS:
+            return Response(
+                {"error": f"format must be one of: {', '.join(user_import.FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            text = upload.read().decode("utf-8-sig")
+        except UnicodeDecodeError:
+            return Response({"error": "The file must be UTF-8 encoded"}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = user_import.parse(text, fmt)
+        if len(rows) > self.MAX_ROWS:
+            return Response(
+                {"error": f"At most {self.MAX_ROWS} rows per upload; use manage.py import_users for more"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        role = (request.data.get("role") or user_import.DEFAULT_ROLE).upper()
+        if len(rows) > self.SYNC_ROWS:
+            job = jobs.submit("import_users", {"text": text, "format": fmt, "role": role}, user=request.user)
+            return Response({"job": jobs.describe(job)}, status=status.HTTP_202_ACCEPTED)
+        importer = user_import.Importer(workers=1, default_role=role)
+        return Response(importer.run(rows), status=status.HTTP_200_OK)
+
+
 # =======================
 # SOFT DELETE & DEPRECATED
 # =======================
@@ -278,6 +605,59 @@ class AdminCourseDeactivateView(APIView):
     def patch(self, request, course_id):
         # We can deactivate an already active course
         course = get_object_or_404(Course, id=course_id)
-        course.is_active = False
-        course.save()
-        return Response({"message": "Course deactivated successfully"}, status=status.HTTP_200_OK)
+        deactivated = retirement.deactivate(course)
+        return Response(
+            {"message": "Course deactivated successfully", **deactivated}, status=status.HTTP_200_OK
+        )
+
+
+class AdminCoursePurgeView(APIView):
+    """
+    Admin permanently deletes a deactivated course with its enrollments,
+    attempts, lessons and quizzes. Runs as a background job in batches
+    (see learning/retirement.py); answers 202 with the job to poll.
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def post(self, request, course_id):
+        course = get_object_or_404(Course.all_objects, id=course_id)
+        if course.is_active:
+            return Response(
+                {"error": "Deactivate the course before purging it"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        job = jobs.submit("purge_course", {"course_id": course.id}, user=request.user)
+        return Response({"job": jobs.describe(job)}, status=status.HTTP_202_ACCEPTED)
+
+
+# =======================
+# REQUEST PROFILES
+# =======================
+
+class AdminProfileListView(APIView):
+    """
+    Lists stored request profiles (newest first). Profile a request by
+    sending it as an admin with "X-Profile: 1" or "X-Profile: sample".
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get("limit", 100)), 1000)
+        except ValueError:
+            limit = 100
+        profiles = profiling.list_profiles(limit)
+        return Response({"count": len(profiles), "results": profiles}, status=status.HTTP_200_OK)
+
+
+class AdminProfileDownloadView(APIView):
+    """
+    Downloads one stored profile (.prof for pstats/snakeviz, .collapsed for
+    flamegraph tools).
+    """
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request, profile_id):
+        path = profiling.profile_file(profile_id)
+        if path is None:
+            raise Http404("Profile not found")
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=os.path.basename(path))
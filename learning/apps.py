@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
 
 
 class LearningConfig(AppConfig):
     name = 'learning'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .instrumentation import attach_on_connect, attach_on_request
+
+        connection_created.connect(attach_on_connect, dispatch_uid="learning.instrumentation")
+        request_started.connect(attach_on_request, dispatch_uid="learning.instrumentation")
@@ -0,0 +1,162 @@
+"""
+Archive tier for old quiz attempts and notifications.
+
+Both tables are append-mostly and read almost only for recent rows, yet old
+rows keep growing their indexes. archive() (`manage.py archive_old_rows`,
+e.g. nightly from cron) moves rows older than a cutoff out of the hot table
+in pk-ordered batches: each batch becomes one ArchiveSegment per user, a
+compressed JSON-lines blob, and the rows are deleted in the same short
+transaction.
+
+Readers only look at the archive when asked (?include_archived=true) and
+get unsaved model instances back, so serializers and exports handle them
+like live rows.
+
+Passed attempts are never archived: they are the completion record read by
+certificates, my-courses and the retake check. Failed attempts are only
+archived once the analytics rollups have finalised their day, so the daily
+totals keep counting them; the dashboard's attempt counters cover the hot
+table only.
+
+When QuizAttempt is partitioned by month (learning/partitions.py), months
+that end before the cutoff are detached and dropped whole rather than
+deleted row by row; only the rest goes through the batched path.
+"""
+import json
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+from . import counters, partitions, rollups
+from .models import ArchiveSegment, Notification, PlatformCounter, QuizAttempt
+from .utils import timeseries
+
+BATCH_SIZE = 5000
+
+# Kind -> (model, rows that may be archived, time field, user field, archived fields)
+SOURCES = {
+    "attempts": (
+        QuizAttempt, Q(is_passed=False), "attempted_at", "student_id",
+        ("id", "quiz_id", "score", "is_passed", "attempted_at"),
+    ),
+    "notifications": (
+        Notification, Q(), "created_at", "user_id",
+        ("id", "notification_type", "message", "data", "is_read", "created_at"),
+    ),
+}
+
+
+def effective_cutoff(kind, cutoff):
+    """
+    Cutoff actually used for kind: attempts wait for the rollups, so it is
+    never later than the start of the watermark day (None before the first
+    rollup).
+    """
+    if kind != "attempts":
+        return cutoff
+    watermark = rollups.watermark_day()
+    if watermark is None:
+        return None
+    return min(cutoff, timeseries.day_start(watermark))
+
+
+def _segments(kind, rows, time_field, user_field):
+    by_user = defaultdict(list)
+    for row in rows:
+        by_user[row.pop(user_field)].append(row)
+    return [
+        ArchiveSegment(
+            kind=kind,
+            user_id=user_id,
+            first_at=min(row[time_field] for row in user_rows),
+            last_at=max(row[time_field] for row in user_rows),
+            row_count=len(user_rows),
+            rows="\n".join(json.dumps(row, cls=DjangoJSONEncoder) for row in user_rows),
+        )
+        for user_id, user_rows in by_user.items()
+    ]
+
+
+def _archive_detached(kind, name, batch_size):
+    """Archive every row of a detached partition table, then drop it."""
+    model, _, time_field, user_field, fields = SOURCES[kind]
+    quote = connection.ops.quote_name
+    columns = (user_field, *fields)
+    archived = 0
+    with transaction.atomic():
+        with connection.chunked_cursor() as rows_cursor:
+            rows_cursor.execute(f"SELECT {', '.join(map(quote, columns))} FROM {quote(name)} ORDER BY id")
+            while batch := rows_cursor.fetchmany(batch_size):
+                rows = [dict(zip(columns, row)) for row in batch]
+                PlatformCounter.objects.add(counters.removed(model.__name__, rows))
+                ArchiveSegment.objects.bulk_create(_segments(kind, rows, time_field, user_field))
+                archived += len(rows)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {quote(name)}")
+    return archived
+
+
+def archive(kind, cutoff, batch_size=BATCH_SIZE):
+    """
+    Move kind rows older than cutoff into archive segments.
+
+    Returns the number of rows archived.
+    """
+    model, condition, time_field, user_field, fields = SOURCES[kind]
+    cutoff = effective_cutoff(kind, cutoff)
+    if cutoff is None:
+        return 0
+    archived = 0
+    if kind == "attempts" and partitions.is_partitioned():
+        for name in partitions.detach_before(cutoff):
+            archived += _archive_detached(kind, name, batch_size)
+    candidates = model.objects.filter(condition, **{f"{time_field}__lt": cutoff}).order_by("pk")
+    quote = connection.ops.quote_name
+    while True:
+        with transaction.atomic():
+            # Locked, so a concurrent update (e.g. mark as read) cannot be lost
+            rows = list(candidates.select_for_update().values(user_field, *fields)[:batch_size])
+            if not rows:
+                return archived
+            ids = [row["id"] for row in rows]
+            ArchiveSegment.objects.bulk_create(_segments(kind, rows, time_field, user_field))
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"DELETE FROM {quote(model._meta.db_table)} "
+                    f"WHERE {quote(model._meta.pk.column)} IN ({', '.join(['%s'] * len(ids))})",
+                    ids,
+                )
+            if model.__name__ in counters.TRACKED:
+                # Raw deletes send no signals
+                PlatformCounter.objects.add(counters.removed(model.__name__, rows))
+        archived += len(rows)
+
+
+def archived(kind, user_id=None, start=None, end=None):
+    """
+    Archived kind rows (of one user, or everyone grouped by user) as unsaved
+    model instances, oldest segment first. start / end bound the time field
+    like a [start, end) window; segments outside it are never read.
+    """
+    model, _, time_field, user_field, _ = SOURCES[kind]
+    segments = ArchiveSegment.objects.filter(kind=kind).order_by("user_id", "id")
+    if user_id is not None:
+        segments = segments.filter(user_id=user_id)
+    if start is not None:
+        segments = segments.filter(last_at__gte=start)
+    if end is not None:
+        segments = segments.filter(first_at__lt=end)
+    for segment in segments.iterator():
+        for line in segment.rows.splitlines():
+            row = json.loads(line)
+            row[time_field] = parse_datetime(row[time_field])
+            if (start is None or row[time_field] >= start) and (end is None or row[time_field] < end):
+                yield model(**row, **{user_field: segment.user_id})
+
+
+def include_archived(request):
+    """Whether a read endpoint was asked to include archived rows."""
+    return str(request.query_params.get("include_archived", "")).lower() in ("1", "true")
@@ -1,5 +1,6 @@
 from datetime import timedelta
 from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from rest_framework_simplejwt.tokens import RefreshToken
 
 ROLE_LIFETIMES = {
@@ -35,4 +36,33 @@ class CustomRefreshToken(RefreshToken):
         exp_dt = timezone.now() + lifetime
         access["exp"] = int(exp_dt.timestamp())
 
-        return token
\ No newline at end of file
+        return token
+
+
+def blacklist_user_tokens(user_ids, batch_size=1000):
+    """
+    Blacklist every unexpired, not yet blacklisted refresh token of the given
+    users, batch_size tokens per INSERT.
+
+    Args:
+        user_ids: iterable of ids, or a values("id") queryset used as a subquery
+
+    Returns:
+        number of tokens blacklisted
+    """
+    pending = (
+        OutstandingToken.objects
+        .filter(user_id__in=user_ids, expires_at__gt=timezone.now(), blacklistedtoken__isnull=True)
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    total, last_id = 0, 0
+    while True:
+        batch = list(pending.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            return total
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token_id=token_id) for token_id in batch], ignore_conflicts=True
+        )
+        total += len(batch)
+        last_id = batch[-1]
@@ -0,0 +1,155 @@
+"""
+Course cloning for instructors re-running a course.
+
+A clone copies the course row and its active lessons, quizzes and questions
+in a fixed number of statements, whatever the size of the course:
+
+    lessons    one INSERT ... SELECT (compressed content is copied as stored,
+               never loaded into Python)
+    quizzes    one bulk_create; the returned ids give the old -> new map
+    questions  one INSERT ... SELECT that remaps quiz_id with a CASE
+
+Progress (rows copied so far out of the total) is stored on the job when the
+clone runs in the background (see learning/jobs.py). Student data
+(enrollments, progress, attempts, ratings, comments) is never copied.
+"""
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import jobs
+from .models import Course, Lesson, PlatformCounter, Question, Quiz, User
+from .structure import invalidate_course_structure
+
+
+def _count(queryset, course_path):
+    """Scalar subquery counting queryset rows of the outer course."""
+    return Coalesce(Subquery(
+        queryset.filter(**{course_path: OuterRef("pk")})
+        .order_by().values(course_path).annotate(n=Count("pk")).values("n")
+    ), 0)
+
+
+def course_size(course):
+    """{"lessons", "quizzes", "questions"}: active rows to copy, in one query."""
+    return Course.all_objects.filter(pk=course.pk).annotate(
+        lessons=_count(Lesson.objects.all(), "course"),
+        quizzes=_count(Quiz.objects.all(), "course"),
+        questions=_count(Question.objects.filter(quiz__is_active=True), "quiz__course"),
+    ).values("lessons", "quizzes", "questions").get()
+
+
+def _copy_rows(model, where, where_params, replace):
+    """
+    INSERT INTO table (every column but the pk) SELECT the same columns FROM
+    table WHERE where, with replace = {column: (sql, params)} substituted.
+
+    Returns the number of rows copied.
+    """
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns, select, params = [], [], []
+    for field in model._meta.concrete_fields:
+        if field.primary_key:
+            continue
+        columns.append(quote(field.column))
+        sql, column_params = replace.get(field.column, (quote(field.column), []))
+        select.append(sql)
+        params += column_params
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"SELECT {', '.join(select)} FROM {table} WHERE {where} ORDER BY {quote(model._meta.pk.column)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params + where_params)
+        return cursor.rowcount
+
+
+def clone_course(course, title=None, instructor=None, job=None):
+    """
+    Copy course into a new unpublished course.
+
+    Args:
+        title: title of the copy (default: "<title> (copy)")
+        instructor: owner of the copy (default: the course's instructor)
+        job: BackgroundJob to report progress on
+
+    Returns:
+        {"course_id", "lessons", "quizzes", "questions"}
+    """
+    if job:
+        jobs.progress(job, 0, sum(course_size(course).values()))
+
+    quote = connection.ops.quote_name
+    now = timezone.now()
+    adapt_now = connection.ops.adapt_datetimefield_value(now)
+    copy = None
+    try:
+        # One transaction per step, so a polling client sees the progress;
+        # a failure part way deletes the partial copy
+        with transaction.atomic():
+            copy = Course.objects.create(
+                instructor=instructor or course.instructor,
+                title=title or f"{course.title} (copy)"[:Course._meta.get_field("title").max_length],
+                description=course.description,
+                is_published=False,
+            )
+            lessons = _copy_rows(
+                Lesson, f"{quote('course_id')} = %s AND {quote('is_active')} = %s", [course.id, True],
+                {
+                    "course_id": ("%s", [copy.id]),
+                    "created_at": ("%s", [adapt_now]),
+                    "updated_at": ("%s", [adapt_now]),
+                },
+            )
+            if job:
+                # Commits with the copy, so a rerun after a crash can find it
+                jobs.checkpoint(job, {"course_id": copy.id})
+        if job:
+            jobs.progress(job, lessons)
+
+        with transaction.atomic():
+            originals = list(Quiz.objects.filter(course=course).order_by("id"))
+            # PostgreSQL returns ids from the bulk INSERT in input order
+            copies = Quiz.objects.bulk_create([
+                Quiz(course=copy, total_marks=quiz.total_marks, pass_marks=quiz.pass_marks, created_at=now)
+                for quiz in originals
+            ])
+            # bulk_create sends no signals
+            PlatformCounter.objects.add({"quizzes": len(copies)})
+        quiz_ids = {original.id: new.id for original, new in zip(originals, copies)}
+        if job:
+            jobs.progress(job, lessons + len(copies))
+
+        questions = 0
+        if quiz_ids:
+            remap = "CASE " + " ".join(f"WHEN {quote('quiz_id')} = %s THEN %s" for _ in quiz_ids) + " END"
+            placeholders = ", ".join(["%s"] * len(quiz_ids))
+            with transaction.atomic():
+                questions = _copy_rows(
+                    Question,
+                    f"{quote('quiz_id')} IN ({placeholders}) AND {quote('is_active')} = %s",
+                    [*quiz_ids, True],
+                    {"quiz_id": (remap, [value for pair in quiz_ids.items() for value in pair])},
+                )
+        if job:
+            jobs.progress(job, lessons + len(copies) + questions)
+    except Exception:
+        if copy is not None:
+            # Cascades to the copied rows; delete signals correct the counters
+            Course.all_objects.filter(pk=copy.pk).delete()
+        raise
+
+    invalidate_course_structure(copy.id)
+    return {"course_id": copy.id, "lessons": lessons, "quizzes": len(copies), "questions": questions}
+
+
+def run_clone_job(job):
+    leftover = (job.result or {}).get("course_id")
+    if leftover:
+        # An earlier attempt died part way; its copy was never handed out
+        Course.all_objects.filter(pk=leftover, is_published=False).delete()
+    course = Course.objects.select_related("instructor").get(id=job.params["course_id"])
+    instructor = User.objects.get(id=job.params["instructor_id"])
+    return clone_course(course, title=job.params.get("title"), instructor=instructor, job=job)
@@ -0,0 +1,110 @@
+"""
+Cohort enrollment: enroll a list of students in one course.
+
+Students are given as ids, usernames or emails and resolved to active
+STUDENT accounts a batch at a time. Each batch is enrolled with one
+multi-row INSERT ... ON CONFLICT (Enrollment.objects.enroll_many), and the
+students it actually enrolled get their ENROLLED notification through one
+bulk INSERT and a batched WebSocket fan-out. Large cohorts run as a
+background job (see learning/jobs.py).
+"""
+import csv
+import io
+
+from django.db.models import Q
+from django.utils import timezone
+
+from . import jobs
+from .models import Course, Enrollment, User
+from .notifications import send_bulk_notifications
+from .trends import invalidate_instructor_trends
+
+BATCH_SIZE = 1000
+
+# Header cells skipped in the first row of an uploaded list
+_HEADERS = {"id", "student", "student_id", "username", "email"}
+
+
+def parse_csv(text):
+    """Identifiers from the first column of a CSV, with an optional header row."""
+    identifiers = [row[0].strip() for row in csv.reader(io.StringIO(text)) if row and row[0].strip()]
+    if identifiers and identifiers[0].lower() in _HEADERS:
+        identifiers = identifiers[1:]
+    return identifiers
+
+
+def resolve_students(identifiers):
+    """
+    Active student ids for a batch of ids, usernames or emails.
+
+    Returns:
+        (student ids in input order without duplicates, identifiers that
+        match no active student)
+    """
+    identifiers = [str(identifier).strip() for identifier in identifiers]
+    ids = [int(identifier) for identifier in identifiers if identifier.isdigit()]
+    by_id, by_name = {}, {}
+    students = User.objects.filter(
+        Q(id__in=ids) | Q(username__in=identifiers) | Q(email__in=identifiers),
+        role__name="STUDENT",
+        is_active=True,
+    )
+    for student_id, username, email in students.values_list("id", "username", "email"):
+        by_id[str(student_id)] = by_name[username] = by_name[email] = student_id
+
+    student_ids, seen, unknown = [], set(), []
+    for identifier in identifiers:
+        student_id = by_id.get(identifier) or by_name.get(identifier)
+        if student_id is None:
+            unknown.append(identifier)
+        elif student_id not in seen:
+            seen.add(student_id)
+            student_ids.append(student_id)
+    return student_ids, unknown
+
+
+def enroll_cohort(course, identifiers, job=None):
+    """
+    Enroll every identified student in course.
+
+    Returns:
+        {"course_id", "requested", "enrolled", "already_enrolled", "unknown"}
+    """
+    enrolled_at = timezone.now()
+    enrolled, already, unknown = 0, 0, []
+    message = f"Successfully enrolled in '{course.title}'"
+    data = {
+        "course_id": course.id,
+        "course_title": course.title,
+        "instructor": course.instructor.username,
+    }
+    if job:
+        jobs.progress(job, 0, len(identifiers))
+
+    for start in range(0, len(identifiers), BATCH_SIZE):
+        student_ids, missing = resolve_students(identifiers[start:start + BATCH_SIZE])
+        unknown += missing
+        # One transaction per batch; notify only after it has committed
+        rows = Enrollment.objects.enroll_many(student_ids, course.id, enrolled_at)
+        new_ids = [student_id for _, student_id in rows]
+        send_bulk_notifications(new_ids, "ENROLLED", message, data)
+        enrolled += len(new_ids)
+        already += len(student_ids) - len(new_ids)
+        if job:
+            jobs.progress(job, min(start + BATCH_SIZE, len(identifiers)))
+
+    if enrolled:
+        # The raw inserts send no post_save, so refresh the instructor's trends here
+        invalidate_instructor_trends(course.instructor_id)
+    return {
+        "course_id": course.id,
+        "requested": len(identifiers),
+        "enrolled": enrolled,
+        "already_enrolled": already,
+        "unknown": unknown,
+    }
+
+
+def run_enroll_job(job):
+    course = Course.all_objects.select_related("instructor").get(id=job.params["course_id"])
+    return enroll_cohort(course, job.params["students"], job=job)
@@ -7,8 +7,11 @@ from channels.db import database_sync_to_async
 from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 
+from . import metrics
+from .instrumentation import InstrumentedConsumerMixin
 
-class NotificationConsumer(AsyncWebsocketConsumer):
+
+class NotificationConsumer(InstrumentedConsumerMixin, AsyncWebsocketConsumer):
     """
     WebSocket consumer for sending real-time notifications to users.
     Authenticates via JWT token passed in query string.
@@ -46,9 +49,14 @@ class NotificationConsumer(AsyncWebsocketConsumer):
         )
 
         await self.accept()
+        self.counted = True
+        metrics.WEBSOCKET_CONNECTIONS.inc()
 
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection."""
+        if getattr(self, 'counted', False):
+            self.counted = False
+            metrics.WEBSOCKET_CONNECTIONS.dec()
         if hasattr(self, 'group_name'):
             await self.channel_layer.group_discard(
                 self.group_name,
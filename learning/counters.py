@@ -0,0 +1,200 @@
+"""
+Platform counters for the admin dashboard.
+
+Counting users, courses, enrollments, quizzes and attempts with COUNT(*) on
+every dashboard load scans the biggest tables. Instead, the signal handlers
+in learning/signals.py add +1/-1 to PlatformCounter rows in the same
+transaction as the change, and the dashboard sums a handful of rows.
+
+QuerySet.update(), bulk_create() and raw SQL send no signals, so
+`manage.py reconcile_counters` should run periodically (e.g. hourly from
+cron): it compares every counter with an exact COUNT and adds the drift.
+
+Read modes:
+    counter  sums of the counter rows (default, one query)
+    approx   as counter, but counters over whole tables use the planner's
+             pg_class.reltuples estimate on PostgreSQL
+    exact    live COUNT(*) per counter
+"""
+import json
+
+from django.apps import apps as global_apps
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+MODES = ("counter", "approx", "exact")
+
+
+def _user(row):
+    return {"users", f"users.role.{row['role_id']}"}
+
+
+def _course(row):
+    if not row["is_active"]:
+        return set()
+    return {"courses", "courses.published"} if row["is_published"] else {"courses"}
+
+
+def _active(name):
+    return lambda row: {name} if row["is_active"] else set()
+
+
+def _attempt(row):
+    return {"attempts", "attempts.passed"} if row["is_passed"] else {"attempts"}
+
+
+# Model name -> (fields that decide membership, counters a row belongs to)
+TRACKED = {
+    "User": (("role_id",), _user),
+    "Course": (("is_active", "is_published"), _course),
+    "Enrollment": (("is_active",), _active("enrollments")),
+    "Quiz": (("is_active",), _active("quizzes")),
+    "QuizAttempt": (("is_passed",), _attempt),
+}
+
+# Counters over every row of a table, which reltuples can estimate
+WHOLE_TABLE = {"users": "User", "attempts": "QuizAttempt"}
+
+
+def memberships(model_name, row):
+    """Counters a row belongs to, given its tracked field values."""
+    return TRACKED[model_name][1](row)
+
+
+def removed(model_name, rows):
+    """{name: -n} deltas for rows (dicts of tracked fields) deleted without signals."""
+    deltas = {}
+    for row in rows:
+        for name in memberships(model_name, row):
+            deltas[name] = deltas.get(name, 0) - 1
+    return deltas
+
+
+def definitions(apps=global_apps, using=DEFAULT_DB_ALIAS):
+    """
+    {name: queryset} for every counter. Works with historical models, so
+    filters are spelled out instead of relying on the default managers.
+    """
+    def rows(model_name):
+        return apps.get_model("learning", model_name)._base_manager.db_manager(using).all()
+
+    users = rows("User")
+    courses = rows("Course").filter(is_active=True)
+    attempts = rows("QuizAttempt")
+    queries = {
+        "users": users,
+        "courses": courses,
+        "courses.published": courses.filter(is_published=True),
+        "enrollments": rows("Enrollment").filter(is_active=True),
+        "quizzes": rows("Quiz").filter(is_active=True),
+        "attempts": attempts,
+        "attempts.passed": attempts.filter(is_passed=True),
+    }
+    for role_id in rows("Role").values_list("id", flat=True):
+        queries[f"users.role.{role_id}"] = users.filter(role_id=role_id)
+    return queries
+
+
+def reconcile(names=None, apps=global_apps, using=DEFAULT_DB_ALIAS):
+    """
+    Correct every counter (or just names) against an exact count.
+
+    Returns:
+        list of (name, correction) in reconcile order
+    """
+    manager = apps.get_model("learning", "PlatformCounter").objects.db_manager(using)
+    now = timezone.now()
+    results = []
+    for name, queryset in definitions(apps, using).items():
+        if names and name not in names:
+            continue
+        correction = manager.drift(name, queryset)
+        manager.add({name: correction}, shard=0, reconciled_at=now)
+        results.append((name, correction))
+    return results
+
+
+def _estimates(using):
+    """{name: (reltuples, last analyze)} for WHOLE_TABLE counters on PostgreSQL."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return {}
+    tables = {
+        global_apps.get_model("learning", model_name)._meta.db_table: name
+        for name, model_name in WHOLE_TABLE.items()
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, c.reltuples::bigint, GREATEST(s.last_analyze, s.last_autoanalyze)
+            FROM pg_class c
+            LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+            WHERE c.relname = ANY(%s) AND pg_table_is_visible(c.oid)
+            """,
+            [list(tables)],
+        )
+        # reltuples is -1 until the table has been analyzed once
+        return {
+            tables[table]: (int(estimate), analyzed)
+            for table, estimate, analyzed in cursor.fetchall()
+            if estimate >= 0
+        }
+
+
+def _age(now, moment):
+    return round((now - moment).total_seconds()) if moment else None
+
+
+def read(mode="counter", using=DEFAULT_DB_ALIAS):
+    """
+    Current value of every counter and how fresh it is.
+
+    Returns:
+        (values, freshness): {name: value} and {name: {"source", "as_of",
+        "reconciled_at", "age_seconds"}}. For counters, age is the time since
+        the last reconcile (the bound on drift from bulk writes); for
+        estimates, the time since the table was last analyzed.
+    """
+    now = timezone.now()
+    values, freshness = {}, {}
+
+    if mode == "exact":
+        for name, queryset in definitions(using=using).items():
+            values[name] = queryset.count()
+            freshness[name] = {"source": "exact", "as_of": now, "reconciled_at": None, "age_seconds": 0}
+        return values, freshness
+
+    manager = global_apps.get_model("learning", "PlatformCounter").objects.db_manager(using)
+    for name, total in manager.totals().items():
+        values[name] = total["value"]
+        freshness[name] = {
+            "source": "counter",
+            "as_of": total["updated_at"],
+            "reconciled_at": total["reconciled_at"],
+            "age_seconds": _age(now, total["reconciled_at"]),
+        }
+
+    if mode == "approx":
+        for name, (estimate, analyzed) in _estimates(using).items():
+            values[name] = estimate
+            freshness[name] = {
+                "source": "approximate",
+                "as_of": analyzed,
+                "reconciled_at": None,
+                "age_seconds": _age(now, analyzed),
+            }
+    return values, freshness
+
+
+def estimate_count(queryset):
+    """
+    Row count of an arbitrary filtered queryset without counting it: the
+    planner's estimate from EXPLAIN on PostgreSQL, an exact COUNT elsewhere.
+
+    Returns:
+        (count, "approximate" | "exact")
+    """
+    if connections[queryset.db].vendor != "postgresql":
+        return queryset.count(), "exact"
+    plan = json.loads(queryset.order_by().values("pk").explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"]), "approximate"
@@ -0,0 +1,64 @@
+"""
+Custom model fields for the learning application.
+"""
+import zlib
+
+from django.db import models
+
+# Bodies shorter than this are stored as-is; compression would not pay off.
+COMPRESSION_THRESHOLD = 512
+
+_RAW = b"r"
+_ZLIB = b"z"
+
+
+def compress_text(value, threshold=COMPRESSION_THRESHOLD, level=6):
+    """Encode text as a one-byte header followed by raw or zlib-compressed UTF-8."""
+    raw = value.encode("utf-8")
+    if len(raw) >= threshold:
+        packed = zlib.compress(raw, level)
+        if len(packed) < len(raw):
+            return _ZLIB + packed
+    return _RAW + raw
+
+
+def decompress_text(value):
+    """Inverse of compress_text()."""
+    value = bytes(value)
+    header, payload = value[:1], value[1:]
+    if header == _ZLIB:
+        payload = zlib.decompress(payload)
+    return payload.decode("utf-8")
+
+
+class CompressedTextField(models.TextField):
+    """
+    TextField stored as a binary column, zlib-compressed above a size threshold.
+
+    Reads and writes are transparent: Python code always sees ``str``.
+    The column cannot be filtered on with text lookups.
+    """
+
+    def __init__(self, *args, threshold=COMPRESSION_THRESHOLD, **kwargs):
+        self.threshold = threshold
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.threshold != COMPRESSION_THRESHOLD:
+            kwargs["threshold"] = self.threshold
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        return "BinaryField"
+
+    def get_db_prep_value(self, value, connection, prepared=False):
+        value = super().get_db_prep_value(value, connection, prepared)
+        if value is None:
+            return None
+        return connection.Database.Binary(compress_text(value, self.threshold))
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return decompress_text(value)
@@ -0,0 +1,175 @@
+"""
+Per-request / per-message SQL instrumentation.
+
+A single execute_wrapper is attached to each database connection when it is
+opened (connection_created) or, for connections opened earlier, on
+request_started / the first consumer message, which Django and Channels run
+in the thread that executes the ORM code. It records into the QueryStats
+held in a ContextVar, so the numbers follow the request across
+sync_to_async / database_sync_to_async threads under ASGI and stay
+per-request under WSGI. Outside an instrumented block the wrapper is a plain
+pass-through; with both QUERY_INSTRUMENTATION and METRICS disabled nothing
+is attached at all.
+"""
+import asyncio
+import json
+import logging
+import time
+from contextvars import ContextVar
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from .utils.query_stats import QueryStats
+
+logger = logging.getLogger("learning.performance")
+
+DEFAULTS = {
+    "ENABLED": False,
+    "SERVER_TIMING": True,
+    # Log a structured line when either threshold is crossed (None disables)
+    "LOG_THRESHOLD_MS": 500,
+    "LOG_QUERY_COUNT": 50,
+}
+
+# QueryStats of every instrumented block the current code runs inside
+_active_stats = ContextVar("query_stats", default=())
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "QUERY_INSTRUMENTATION", {})}
+
+
+def is_enabled():
+    return bool(getattr(settings, "QUERY_INSTRUMENTATION", {}).get("ENABLED", DEFAULTS["ENABLED"]))
+
+
+def _wanted():
+    # Metrics (learning/metrics.py) read per-request DB stats from here too
+    return is_enabled() or bool(getattr(settings, "METRICS", {}).get("ENABLED"))
+
+
+def _record(execute, sql, params, many, context):
+    active = _active_stats.get()
+    if not active:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        rowcount = getattr(context.get("cursor"), "rowcount", -1)
+        for stats in active:
+            stats.record(sql, elapsed, rowcount)
+
+
+def _attach(connection):
+    if _record not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record)
+
+
+def attach_on_connect(sender, connection, **kwargs):
+    """connection_created receiver (connected in LearningConfig.ready)."""
+    if _wanted():
+        _attach(connection)
+
+
+def attach_on_request(sender, **kwargs):
+    """request_started receiver; under ASGI it runs in the sync view thread."""
+    if _wanted():
+        _attach_open_connections()
+
+
+def _attach_open_connections():
+    # Connections belong to the thread that created them; never touch them
+    # from the event loop. Threads running sync code get covered here or by
+    # attach_on_connect when they first connect.
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        for connection in connections.all(initialized_only=True):
+            _attach(connection)
+
+
+class instrument:
+    """
+    Context manager that collects QueryStats for the enclosed block.
+    Blocks nest: every enclosing block sees the inner block's queries too.
+
+    Usage:
+        with instrument() as block:
+            ...
+        block.stats.count, block.elapsed
+    """
+
+    def __init__(self):
+        self.stats = QueryStats()
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        _attach_open_connections()
+        self._token = _active_stats.set(_active_stats.get() + (self.stats,))
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self._start
+        _active_stats.reset(self._token)
+        return False
+
+
+def server_timing(block):
+    """Server-Timing header value for an instrumented block."""
+    stats = block.stats
+    parts = [
+        f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"',
+        f"app;dur={(block.elapsed - stats.duration) * 1000:.2f}",
+    ]
+    if stats.count:
+        parts.append(f"db-slowest;dur={stats.slowest[0] * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def log_if_slow(block, kind, name, config=None, **fields):
+    """
+    Emit one structured WARNING line on the learning.performance logger when
+    the block crossed LOG_THRESHOLD_MS or LOG_QUERY_COUNT.
+    """
+    config = config or get_config()
+    threshold_ms, query_limit = config["LOG_THRESHOLD_MS"], config["LOG_QUERY_COUNT"]
+    elapsed_ms = block.elapsed * 1000
+    slow = threshold_ms is not None and elapsed_ms >= threshold_ms
+    chatty = query_limit is not None and block.stats.count >= query_limit
+    if not (slow or chatty):
+        return
+
+    payload = {
+        "kind": kind,
+        "name": name,
+        "duration_ms": round(elapsed_ms, 2),
+        **block.stats.as_dict(),
+        **fields,
+    }
+    logger.warning("slow %s %s", kind, json.dumps(payload, default=str), extra={"query_stats": payload})
+
+
+class InstrumentedConsumerMixin:
+    """
+    Instruments each Channels handler call (connect, receive, group
+    messages, disconnect) the same way the middleware instruments requests.
+    """
+
+    async def dispatch(self, message):
+        if not is_enabled():
+            return await super().dispatch(message)
+        if not getattr(self, "_instrumentation_attached", False):
+            await database_sync_to_async(_attach_open_connections)()
+            self._instrumentation_attached = True
+        with instrument() as block:
+            result = await super().dispatch(message)
+        log_if_slow(
+            block, "consumer", f"{type(self).__name__}:{message.get('type')}",
+            path=self.scope.get("path"),
+        )
+        return result
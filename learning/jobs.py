@@ -0,0 +1,160 @@
+"""
+Background jobs for bulk operations too large for one request.
+
+submit() records a PENDING BackgroundJob; the endpoint returns 202 with the
+job id and clients poll /api/jobs/<id>/ for progress and the result. Jobs
+only ever run in the worker, `manage.py run_jobs --loop`, never in the web
+process.
+
+A running job holds a lease: while the handler runs, its worker renews
+heartbeat_at every HEARTBEAT_INTERVAL seconds. If the worker dies, the lease
+expires after LEASE_TIMEOUT and requeue_stale(), called by run_jobs on every
+poll, sets the job back to PENDING, or fails it after MAX_ATTEMPTS. Handlers
+must therefore cope with running again after a partial run.
+
+A handler is a function taking the job; it reports progress through
+progress() and returns a JSON-serialisable result.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import connections
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import BackgroundJob
+
+logger = logging.getLogger("learning.jobs")
+
+# Job kind -> dotted path of its handler
+HANDLERS = {
+    "enroll_cohort": "learning.cohorts.run_enroll_job",
+    "clone_course": "learning.cloning.run_clone_job",
+    "purge_course": "learning.retirement.run_purge_job",
+    "import_users": "learning.user_import.run_import_job",
+}
+
+
+HEARTBEAT_INTERVAL = 30
+LEASE_TIMEOUT = 5 * 60
+MAX_ATTEMPTS = 3
+
+
+def submit(kind, params, user=None):
+    """Record a job for the run_jobs worker."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return BackgroundJob.objects.create(kind=kind, params=params, created_by=user)
+
+
+def _leased(job):
+    """The job's row while this runner still holds its lease."""
+    return BackgroundJob.objects.filter(id=job.id, status="RUNNING", attempts=job.attempts)
+
+
+def progress(job, done, total=None):
+    """Store how far a job has got (one UPDATE; call it per batch, not per row)."""
+    fields = {"progress_done": done, "heartbeat_at": timezone.now()}
+    if total is not None:
+        fields["progress_total"] = total
+    BackgroundJob.objects.filter(id=job.id).update(**fields)
+
+
+def checkpoint(job, result):
+    """Store partial state in job.result, for a rerun to pick up after a crash."""
+    _leased(job).update(result=result)
+    job.result = result
+
+
+@contextmanager
+def _heartbeat(job):
+    """Renew the job's lease from a side thread while the handler runs."""
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(HEARTBEAT_INTERVAL):
+                _leased(job).update(heartbeat_at=timezone.now())
+        finally:
+            # Connections are per thread; do not leak this one
+            connections.close_all()
+
+    thread = threading.Thread(target=beat, name=f"job-{job.id}-heartbeat", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run(job_id):
+    """
+    Run a PENDING job to completion in the calling thread.
+
+    Returns the finished job, or None if another runner already claimed it.
+    """
+    # Claiming with a conditional UPDATE lets several runners race safely
+    now = timezone.now()
+    claimed = BackgroundJob.objects.filter(id=job_id, status="PENDING").update(
+        status="RUNNING", started_at=now, heartbeat_at=now, attempts=F("attempts") + 1
+    )
+    if not claimed:
+        return None
+    job = BackgroundJob.objects.get(id=job_id)
+    with _heartbeat(job):
+        try:
+            result = import_string(HANDLERS[job.kind])(job)
+        except Exception as exc:
+            logger.exception("job %s (%s) failed", job.id, job.kind)
+            job.status, job.error = "FAILED", str(exc)
+        else:
+            job.status, job.result = "DONE", result
+    job.finished_at = timezone.now()
+    # A runner whose lease was taken over (it looked dead) leaves the outcome to the new one
+    if not _leased(job).update(
+        status=job.status, result=job.result, error=job.error, finished_at=job.finished_at
+    ):
+        logger.warning("job %s (%s) lost its lease; result discarded", job.id, job.kind)
+        job.refresh_from_db()
+    return job
+
+
+def requeue_stale(now=None):
+    """
+    Put RUNNING jobs whose lease expired back to PENDING, or fail them once
+    they have used MAX_ATTEMPTS.
+
+    Returns (requeued, failed) counts.
+    """
+    now = now or timezone.now()
+    stale = BackgroundJob.objects.filter(
+        Q(heartbeat_at__lt=now - timedelta(seconds=LEASE_TIMEOUT)) | Q(heartbeat_at__isnull=True),
+        status="RUNNING",
+    )
+    failed = stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status="FAILED", error=f"Worker lost {MAX_ATTEMPTS} times; giving up", finished_at=now
+    )
+    requeued = stale.filter(attempts__lt=MAX_ATTEMPTS).update(status="PENDING")
+    if requeued or failed:
+        logger.warning("re-queued %s and failed %s job(s) lost with their worker", requeued, failed)
+    return requeued, failed
+
+
+def describe(job):
+    """The job as returned by the status endpoint."""
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": {"done": job.progress_done, "total": job.progress_total},
+        "result": job.result,
+        "error": job.error or None,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
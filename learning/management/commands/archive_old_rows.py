@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from learning import archive
+
+
+class Command(BaseCommand):
+    help = (
+        'Move failed quiz attempts and notifications older than --days into compressed '
+        'archive segments, in batches. Run it nightly; readers include archived rows '
+        'with ?include_archived=true.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'kinds', nargs='*', help=f'What to archive: {", ".join(sorted(archive.SOURCES))} (default: all)'
+        )
+        parser.add_argument('--days', type=int, default=365, help='Archive rows older than this many days')
+        parser.add_argument('--batch-size', type=int, default=archive.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        unknown = sorted(set(options['kinds']) - set(archive.SOURCES))
+        if unknown:
+            raise CommandError(f'Unknown kind(s): {", ".join(unknown)}')
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        for kind in options['kinds'] or sorted(archive.SOURCES):
+            effective = archive.effective_cutoff(kind, cutoff)
+            if effective is None:
+                self.stdout.write(f'  {kind:<14} skipped: run rollup_analytics first')
+                continue
+            count = archive.archive(kind, cutoff, batch_size=options['batch_size'])
+            self.stdout.write(f'  {kind:<14} {count:,} row(s) older than {effective:%Y-%m-%d %H:%M}')
+        self.stdout.write(self.style.SUCCESS('Archive done'))
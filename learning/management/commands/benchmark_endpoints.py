@@ -0,0 +1,295 @@
+import json
+import math
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Exists, OuterRef
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from learning.models import (
+    Role, User, Course, Lesson, Quiz, Question, Enrollment, LessonProgress,
+    QuizAttempt, Comment, Notification,
+)
+from learning.structure import get_course_structure
+from learning.utils.query_stats import capture_query_stats
+
+BENCH_PREFIX = 'bench'
+
+# Per-endpoint budgets. Query counts must not grow with the dataset, so they
+# are flat; latency budgets are deliberately loose and meant to be tightened
+# per environment with --budgets.
+DEFAULT_BUDGETS = {
+    'my_courses': {'p95_ms': 300, 'queries': 10},
+    'lesson_list': {'p95_ms': 150, 'queries': 8},
+    'lesson_complete': {'p95_ms': 150, 'queries': 8},
+    'quiz_attempt': {'p95_ms': 250, 'queries': 15},
+    'instructor_analytics': {'p95_ms': 500, 'queries': 8},
+    'admin_analytics': {'p95_ms': 1000, 'queries': 8},
+    'export': {'p95_ms': 10000, 'queries': 6},
+    'comments': {'p95_ms': 200, 'queries': 10},
+    'notifications': {'p95_ms': 200, 'queries': 6},
+}
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the hot API endpoints against seed_scale datasets of increasing size, '
+        'writes p50/p95 latency, query counts and rows to a JSON report and fails on budget overruns'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000',
+                            help='Comma-separated dataset sizes in users. Sizes are cumulative: '
+                                 'each step seeds only the missing users, so use a fresh database '
+                                 'for clean per-size numbers')
+        parser.add_argument('--iterations', type=int, default=30, help='Measured requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per endpoint')
+        parser.add_argument('--output', default='benchmark_report.json')
+        parser.add_argument('--budgets', help='JSON file overriding DEFAULT_BUDGETS; top-level keys may '
+                                              'be endpoint names or sizes mapping to endpoint budgets')
+        parser.add_argument('--seed-workers', type=int, help='Passed to seed_scale as --workers')
+        parser.add_argument('--no-seed', action='store_true', help='Benchmark the data already present')
+        parser.add_argument('--no-assert', action='store_true', help='Report without failing on budgets')
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(',') if size.strip())
+        if not sizes:
+            raise CommandError('--sizes must list at least one dataset size')
+        budgets = self.load_budgets(options['budgets'])
+
+        report = {
+            'generated_at': datetime.now(dt_timezone.utc).isoformat(),
+            'database': connection.vendor,
+            'iterations': options['iterations'],
+            'sizes': {},
+            'violations': [],
+        }
+
+        for size in sizes:
+            if not options['no_seed']:
+                self.ensure_dataset(size, options['seed_workers'])
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\nDataset size {size:,}'))
+
+            scenarios = self.build_scenarios()
+            results = {}
+            for name, scenario in scenarios.items():
+                results[name] = self.measure(scenario, options['iterations'], options['warmup'])
+                self.print_result(name, results[name])
+
+            report['sizes'][str(size)] = {'dataset': self.dataset_counts(), 'endpoints': results}
+            report['violations'] += self.check_budgets(size, results, budgets)
+
+        with open(options['output'], 'w') as handle:
+            json.dump(report, handle, indent=2, default=str)
+        self.stdout.write(f'\nReport written to {options["output"]}')
+
+        if report['violations']:
+            for violation in report['violations']:
+                self.stdout.write(self.style.ERROR(f'  {violation}'))
+            if not options['no_assert']:
+                raise CommandError(f'{len(report["violations"])} budget(s) exceeded')
+        else:
+            self.stdout.write(self.style.SUCCESS('All endpoints within budget.'))
+
+    # ---- dataset ----
+
+    def ensure_dataset(self, size, workers):
+        existing = self.bench_users().count()
+        missing = size - existing
+        if missing > 0:
+            self.stdout.write(f'Seeding {missing:,} users for size {size:,}...')
+            seed_options = {
+                'users': missing,
+                'courses': max(5, missing // 50),
+                'prefix': f'{BENCH_PREFIX}{size}',
+                'seed': size,
+                'stdout': self.stdout,
+            }
+            if workers:
+                seed_options['workers'] = workers
+            call_command('seed_scale', **seed_options)
+
+    @staticmethod
+    def bench_users():
+        return User.objects.filter(username__startswith=BENCH_PREFIX).exclude(username=f'{BENCH_PREFIX}_admin')
+
+    def dataset_counts(self):
+        return {
+            model.__name__: model._default_manager.count()
+            for model in (User, Course, Lesson, Enrollment, LessonProgress, QuizAttempt, Comment, Notification)
+        }
+
+    # ---- scenarios ----
+
+    def build_scenarios(self):
+        """
+        Pick representative (heaviest) actors and map endpoint name to
+        (user, method, path, payload, mutates).
+        """
+        bench_users = self.bench_users()
+        admin_role, _ = Role.objects.get_or_create(name='ADMIN')
+        admin, created = User.objects.get_or_create(
+            username=f'{BENCH_PREFIX}_admin',
+            defaults={'email': f'{BENCH_PREFIX}_admin@example.com', 'role': admin_role},
+        )
+        if created:
+            admin.set_unusable_password()
+            admin.save(update_fields=['password'])
+
+        course_id = (
+            Enrollment.objects.filter(student__in=bench_users)
+            .values('course_id').annotate(n=Count('id')).order_by('-n')
+            .values_list('course_id', flat=True).first()
+        )
+        if course_id is None:
+            raise CommandError('No enrolled courses with lessons found. Seed data first.')
+
+        heavy_student_id = (
+            Enrollment.objects.filter(student__in=bench_users).values('student_id')
+            .annotate(n=Count('id')).order_by('-n').values_list('student_id', flat=True).first()
+        )
+        course_student_id = (
+            Enrollment.objects.filter(course_id=course_id).order_by('id').values_list('student_id', flat=True).first()
+        )
+        instructor_id = (
+            Course.objects.filter(instructor__in=bench_users).values('instructor_id')
+            .annotate(n=Count('id')).order_by('-n').values_list('instructor_id', flat=True).first()
+        )
+        notified_id = (
+            Notification.objects.filter(user__in=bench_users).values('user_id')
+            .annotate(n=Count('id')).order_by('-n').values_list('user_id', flat=True).first()
+        ) or heavy_student_id
+
+        structure = get_course_structure(course_id)
+        attempt = self.attempt_candidate(bench_users)
+        users = {u.id: u for u in User.objects.select_related('role').filter(
+            id__in=[heavy_student_id, course_student_id, instructor_id, notified_id, attempt[0]]
+        )}
+
+        return {
+            'my_courses': (users[heavy_student_id], 'get', '/api/my-courses/', None, False),
+            'lesson_list': (users[course_student_id], 'get', f'/api/courses/{course_id}/lessons/', None, False),
+            'lesson_complete': (
+                users[course_student_id], 'post', f'/api/lessons/{structure.lesson_ids[0]}/complete/', None, True
+            ),
+            'quiz_attempt': (users[attempt[0]], 'post', f'/api/quizzes/{attempt[1]}/attempt/', attempt[2], True),
+            'instructor_analytics': (users[instructor_id], 'get', '/api/instructor/analytics/', None, False),
+            'admin_analytics': (admin, 'get', '/api/admin-api/analytics/', None, False),
+            'export': (admin, 'get', '/api/admin-api/export-results/?format=excel', None, False),
+            'comments': (users[course_student_id], 'get', f'/api/courses/{course_id}/comments/', None, False),
+            'notifications': (users[notified_id], 'get', '/api/notifications/', None, False),
+        }
+
+    def attempt_candidate(self, bench_users):
+        """
+        (student_id, quiz_id, payload) for a student who finished a course
+        and has not passed its quiz yet.
+        """
+        passed = QuizAttempt.objects.filter(
+            student_id=OuterRef('enrollment__student_id'), quiz__course_id=OuterRef('lesson__course_id'),
+            is_passed=True,
+        )
+        for quiz in Quiz.objects.filter(course__instructor__in=bench_users).order_by('id')[:200]:
+            final_lesson_id = get_course_structure(quiz.course_id).final_lesson_id
+            student_id = (
+                LessonProgress.objects
+                .filter(lesson_id=final_lesson_id, completed_at__isnull=False, enrollment__is_active=True)
+                .exclude(Exists(passed))
+                .values_list('enrollment__student_id', flat=True).first()
+            )
+            if student_id:
+                answers = {
+                    str(qid): option
+                    for qid, option in Question.objects.filter(quiz=quiz).values_list('id', 'correct_option')
+                }
+                return student_id, quiz.id, {'answers': answers}
+        raise CommandError('No student eligible for a quiz attempt. Seed a larger dataset.')
+
+    # ---- measurement ----
+
+    def measure(self, scenario, iterations, warmup):
+        user, method, path, payload, mutates = scenario
+        client = APIClient(SERVER_NAME='localhost')
+        client.force_authenticate(user=user)
+
+        timings, statuses, stats = [], {}, None
+        # Keep emails out of the numbers; the channel layer is exercised as in production
+        with override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend'):
+            for i in range(warmup + iterations):
+                with transaction.atomic() if mutates else nullcontext():
+                    with capture_query_stats() as current:
+                        start = time.perf_counter()
+                        response = getattr(client, method)(path, payload, format='json')
+                        elapsed = time.perf_counter() - start
+                    if mutates:
+                        # Roll back so every iteration sees the same data
+                        transaction.set_rollback(True)
+                if i < warmup:
+                    continue
+                timings.append(elapsed * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if stats is None or current.count > stats.count:
+                    stats = current
+
+        summary = stats.as_dict()
+        return {
+            'path': path,
+            'method': method.upper(),
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'max_ms': round(max(timings), 2),
+            'queries': summary['queries'],
+            'rows': summary['rows'],
+            'db_ms': summary['db_ms'],
+            'slowest_sql': summary['slowest_sql'],
+            'statuses': statuses,
+        }
+
+    def print_result(self, name, result):
+        rows = '-' if result['rows'] is None else f'{result["rows"]:,}'
+        codes = ','.join(str(code) for code in sorted(result['statuses']))
+        self.stdout.write(
+            f'  {name:<22} p50 {result["p50_ms"]:>8.1f}ms  p95 {result["p95_ms"]:>8.1f}ms  '
+            f'queries {result["queries"]:>4}  rows {rows:>9}  [{codes}]'
+        )
+
+    # ---- budgets ----
+
+    def load_budgets(self, path):
+        budgets = {name: dict(limits) for name, limits in DEFAULT_BUDGETS.items()}
+        per_size = {}
+        if path:
+            with open(path) as handle:
+                overrides = json.load(handle)
+            for key, value in overrides.items():
+                if key.isdigit():
+                    per_size[int(key)] = value
+                else:
+                    budgets.setdefault(key, {}).update(value)
+        return budgets, per_size
+
+    def check_budgets(self, size, results, budgets):
+        defaults, per_size = budgets
+        violations = []
+        for name, result in results.items():
+            limits = {**defaults.get(name, {}), **per_size.get(size, {}).get(name, {})}
+            failed = [code for code in result['statuses'] if code >= 400]
+            if failed:
+                violations.append(f'[{size}] {name}: unexpected status {failed}')
+            for metric, limit in limits.items():
+                value = result.get(metric)
+                if value is not None and value > limit:
+                    violations.append(f'[{size}] {name}: {metric} {value} > budget {limit}')
+        return violations
@@ -0,0 +1,85 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Sum
+from django.db.models.functions import Length
+
+from learning.models import Course, Lesson
+
+
+class Command(BaseCommand):
+    help = 'Reports Lesson.content storage savings and the speed-up from deferring content'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--course', type=int, help='Course to benchmark (default: the one with most lessons)')
+        parser.add_argument('--iterations', type=int, default=50, help='Repetitions per measured path')
+
+    def handle(self, *args, **options):
+        self.report_storage()
+
+        course_id = options['course'] or self.largest_course_id()
+        if course_id is None:
+            raise CommandError('No course with lessons found. Seed some data first.')
+
+        iterations = options['iterations']
+        lesson_ids = list(
+            Lesson.objects.filter(course_id=course_id).order_by('lesson_order').values_list('id', flat=True)
+        )
+        self.stdout.write(f'\nCourse {course_id}: {len(lesson_ids)} lessons, {iterations} iterations')
+
+        # Lesson list path
+        full = self.timed(iterations, lambda: list(
+            Lesson.objects.with_content().filter(course_id=course_id).order_by('lesson_order')
+        ))
+        deferred = self.timed(iterations, lambda: list(
+            Lesson.objects.filter(course_id=course_id).only('id', 'title', 'lesson_order').order_by('lesson_order')
+        ))
+        self.report_path('Lesson list', full, deferred)
+
+        # Completion path (one lesson lookup per lesson in the course)
+        full = self.timed(iterations, lambda: [
+            Lesson.objects.with_content().get(pk=pk) for pk in lesson_ids
+        ])
+        deferred = self.timed(iterations, lambda: [
+            Lesson.objects.only('id', 'title', 'course_id', 'lesson_order').get(pk=pk) for pk in lesson_ids
+        ])
+        self.report_path('Lesson completion lookup', full, deferred)
+
+    def report_storage(self):
+        raw_bytes = sum(
+            len(content.encode('utf-8'))
+            for content in Lesson.all_objects.values_list('content', flat=True).iterator()
+        )
+        stored_bytes = Lesson.all_objects.aggregate(total=Sum(Length('content')))['total'] or 0
+        saved = raw_bytes - stored_bytes
+        ratio = (saved / raw_bytes * 100) if raw_bytes else 0
+
+        self.stdout.write('Lesson content storage')
+        self.stdout.write(f'  raw:    {raw_bytes:,} bytes')
+        self.stdout.write(f'  stored: {stored_bytes:,} bytes')
+        self.stdout.write(self.style.SUCCESS(f'  saved:  {saved:,} bytes ({ratio:.1f}%)'))
+
+    def report_path(self, label, full, deferred):
+        speedup = (full / deferred) if deferred else 0
+        self.stdout.write(f'{label}')
+        self.stdout.write(f'  with content:     {full * 1000:.2f} ms/iter')
+        self.stdout.write(f'  content deferred: {deferred * 1000:.2f} ms/iter')
+        self.stdout.write(self.style.SUCCESS(f'  speed-up:         {speedup:.2f}x'))
+
+    @staticmethod
+    def largest_course_id():
+        return (
+            Course.all_objects
+            .annotate(lesson_count=Count('lesson'))
+            .filter(lesson_count__gt=0)
+            .order_by('-lesson_count')
+            .values_list('id', flat=True)
+            .first()
+        )
+
+    @staticmethod
+    def timed(iterations, func):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) / iterations
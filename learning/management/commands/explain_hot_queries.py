@@ -0,0 +1,133 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from learning import partitions
+from learning.models import (
+    Comment,
+    Enrollment,
+    Lesson,
+    LessonProgress,
+    Notification,
+    QuizAttempt,
+)
+
+
+def _sample_id(queryset, field='id'):
+    """Any existing value for the filter; plans do not depend on it existing."""
+    return queryset.values_list(field, flat=True).first() or 1
+
+
+def hot_queries():
+    """
+    (name, queryset, acceptable index names) for each hot filter in the views.
+    """
+    student_id = _sample_id(Enrollment.objects, 'student_id')
+    course_id = _sample_id(Lesson.objects, 'course_id')
+    enrollment_id = _sample_id(Enrollment.objects)
+    quiz_id = _sample_id(QuizAttempt.objects, 'quiz_id')
+    user_id = _sample_id(Notification.objects, 'user_id')
+    month_start, month_end = partitions.bounds(partitions.month_of(timezone.now()))
+
+    return [
+        (
+            'quiz already passed (AttemptQuizView, MyCoursesView)',
+            QuizAttempt.objects.filter(student_id=student_id, quiz_id=quiz_id, is_passed=True),
+            ('attempt_student_quiz_pass_idx',),
+        ),
+        (
+            'attempts in one month (exports and analytics with start/end, rollups)',
+            QuizAttempt.objects.filter(attempted_at__gte=month_start, attempted_at__lt=month_end)
+            .values_list('id', 'attempted_at'),
+            ('attempt_attempted_at_idx',),
+        ),
+        (
+            'completed lessons (LessonListCreateView, progress counts)',
+            LessonProgress.objects.filter(enrollment_id=enrollment_id, completed_at__isnull=False),
+            ('progress_enroll_completed_idx',),
+        ),
+        (
+            'lessons in order (LessonListCreateView, CourseStructure)',
+            Lesson.objects.filter(course_id=course_id).order_by('lesson_order').values_list('id', 'lesson_order'),
+            ('lesson_active_course_order_idx',),
+        ),
+        (
+            'course-level threads (CommentListCreateView)',
+            Comment.objects.filter(course_id=course_id, lesson__isnull=True, parent__isnull=True).order_by('-created_at'),
+            ('comment_thread_idx',),
+        ),
+        (
+            'enrollments per course (analytics)',
+            Enrollment.objects.filter(course_id=course_id).order_by('enrolled_at').values_list('id', 'enrolled_at'),
+            ('enrollment_active_course_idx',),
+        ),
+        (
+            'unread notifications (UnreadCountView)',
+            Notification.objects.filter(user_id=user_id, is_read=False).order_by('-created_at'),
+            ('notif_user_read_created_idx',),
+        ),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Prints EXPLAIN plans for the hot queries and asserts each one uses its index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--natural', action='store_true',
+            help='Do not disable sequential scans on PostgreSQL (small tables may then seq-scan)'
+        )
+        parser.add_argument('--analyze', action='store_true', help='Use EXPLAIN ANALYZE on PostgreSQL')
+        parser.add_argument('--no-assert', action='store_true', help='Print plans without failing')
+
+    def handle(self, *args, **options):
+        is_postgres = connection.vendor == 'postgresql'
+        partitioned = partitions.is_partitioned()
+        failures = []
+
+        with transaction.atomic():
+            if is_postgres and not options['natural']:
+                # On a small dev database the planner rightly prefers a seq scan;
+                # disabling it shows whether the index is usable for the query.
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+
+            for name, queryset, indexes in hot_queries():
+                explain_options = {'analyze': True} if (is_postgres and options['analyze']) else {}
+                plan = queryset.explain(**explain_options)
+                accepted = list(indexes)
+                if partitioned:
+                    # Each partition scans its own copy of a partitioned index
+                    accepted += [child for index in indexes for child in partitions.child_indexes(index)]
+
+                used = [index for index in accepted if index in plan]
+                marker = self.style.SUCCESS('OK ') if used else self.style.ERROR('MISS')
+                self.stdout.write(f'{marker} {name}')
+                self.stdout.write(f'     expected: {", ".join(indexes)}')
+                for line in plan.splitlines():
+                    self.stdout.write(f'     {line}')
+                self.stdout.write('')
+
+                if not used:
+                    failures.append(name)
+
+            if partitioned:
+                failures += self.check_pruning()
+
+        if failures and not options['no_assert']:
+            raise CommandError(f'{len(failures)} hot queries do not use their index: {"; ".join(failures)}')
+        if not failures:
+            self.stdout.write(self.style.SUCCESS('All hot queries use their indexes.'))
+
+    def check_pruning(self):
+        """A one-month range must only read that month's partition."""
+        start, end = partitions.bounds(partitions.month_of(timezone.now()))
+        plan = QuizAttempt.objects.filter(attempted_at__gte=start, attempted_at__lt=end).explain()
+        names = [*partitions.partitions().values(), partitions.DEFAULT_PARTITION]
+        scanned = [name for name in names if name in plan]
+        pruned = len(scanned) <= 1
+        marker = self.style.SUCCESS('OK ') if pruned else self.style.ERROR('MISS')
+        self.stdout.write(f'{marker} partition pruning for one month of attempts')
+        self.stdout.write(f'     scanned: {", ".join(scanned) or "none"}')
+        self.stdout.write('')
+        return [] if pruned else ['partition pruning for one month of attempts']
@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from learning import user_import
+
+
+class Command(BaseCommand):
+    help = (
+        'Create users in bulk from a CSV or JSON-lines file (username, email, '
+        'password, role). Bad rows are reported and skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import')
+        parser.add_argument('--format', choices=user_import.FORMATS, help='Default: from the file extension')
+        parser.add_argument('--role', default=user_import.DEFAULT_ROLE, help='Role for rows without one')
+        parser.add_argument('--workers', type=int, default=None, help='Password hashing processes (default: CPU count)')
+        parser.add_argument('--batch-size', type=int, default=user_import.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = Path(options['path'])
+        fmt = options['format'] or user_import.guess_format(path.name)
+        if fmt is None:
+            raise CommandError('Cannot tell the format from the file name; pass --format')
+        try:
+            text = path.read_text(encoding='utf-8-sig')
+        except (OSError, UnicodeDecodeError) as exc:
+            raise CommandError(f'Cannot read {path}: {exc}')
+
+        importer = user_import.Importer(
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            default_role=options['role'].upper(),
+        )
+        summary = importer.run(user_import.parse(text, fmt))
+
+        for error in summary['errors']:
+            problems = '; '.join(
+                f'{field}: {" ".join(messages)}' for field, messages in error['errors'].items()
+            )
+            self.stderr.write(f'  line {error["line"]}: {problems}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {summary["created"]:,} of {summary["total"]:,} user(s); {summary["failed"]:,} failed'
+        ))
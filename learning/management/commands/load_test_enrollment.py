@@ -0,0 +1,198 @@
+import queue
+import random
+import statistics
+import threading
+import time
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from rest_framework.test import APIClient
+
+from learning.models import Role, User, Course, Enrollment
+
+
+class Command(BaseCommand):
+    help = (
+        'Enrolls thousands of synthetic students concurrently through EnrollCourseView, '
+        'then verifies there are no duplicate enrollments and that throughput stays stable'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000)
+        parser.add_argument('--courses', type=int, default=5)
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--retry-ratio', type=float, default=0.2,
+                            help='Fraction of requests re-sent (half with the same Idempotency-Key, half without)')
+        parser.add_argument('--windows', type=int, default=10, help='Throughput windows to compare')
+        parser.add_argument('--max-degradation', type=float, default=0.5,
+                            help='Fail if the slowest window is below (1 - this) x the median window')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--keep', action='store_true', help='Keep the generated rows')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        prefix = f"loadtest_{uuid.uuid4().hex[:8]}"
+        students, courses = self.create_dataset(prefix, options['students'], options['courses'])
+
+        try:
+            tasks = self.build_tasks(rng, students, courses, options['retry_ratio'])
+            self.stdout.write(
+                f'Sending {len(tasks)} enroll requests for {len(students)} students '
+                f'with {options["workers"]} workers...'
+            )
+            results, elapsed = self.run(tasks, options['workers'])
+            self.verify(prefix, tasks, results)
+            self.report(results, elapsed, options['windows'], options['max_degradation'])
+        finally:
+            if not options['keep']:
+                self.cleanup(prefix)
+
+    def create_dataset(self, prefix, student_count, course_count):
+        student_role, _ = Role.objects.get_or_create(name='STUDENT')
+        instructor_role, _ = Role.objects.get_or_create(name='INSTRUCTOR')
+        password = make_password(None)  # unusable, hashed once
+
+        instructor = User.objects.create(
+            username=f'{prefix}_instructor',
+            email=f'{prefix}_instructor@example.com',
+            password=password,
+            role=instructor_role
+        )
+        Course.objects.bulk_create([
+            Course(instructor=instructor, title=f'{prefix} course {i}', is_published=True)
+            for i in range(course_count)
+        ])
+        User.objects.bulk_create([
+            User(
+                username=f'{prefix}_student_{i}',
+                email=f'{prefix}_student_{i}@example.com',
+                password=password,
+                role=student_role
+            )
+            for i in range(student_count)
+        ], batch_size=1000)
+        students = list(
+            User.objects.filter(username__startswith=f'{prefix}_student_').select_related('role')
+        )
+        courses = list(Course.objects.filter(title__startswith=prefix))
+        return students, courses
+
+    @staticmethod
+    def build_tasks(rng, students, courses, retry_ratio):
+        """Each task is (student, course_id, idempotency_key or None, is_retry)."""
+        tasks = []
+        for student in students:
+            course = rng.choice(courses)
+            key = uuid.uuid4().hex
+            tasks.append((student, course.id, key, False))
+            if rng.random() < retry_ratio:
+                # Half the retries reuse the key (replay), half omit it (conflict path)
+                tasks.append((student, course.id, key if rng.random() < 0.5 else None, True))
+        rng.shuffle(tasks)
+        # Keep every retry after its original request
+        seen = set()
+        ordered, deferred = [], []
+        for task in tasks:
+            pair = (task[0].id, task[1])
+            if task[3] and pair not in seen:
+                deferred.append(task)
+            else:
+                ordered.append(task)
+                seen.add(pair)
+        return ordered + deferred
+
+    @staticmethod
+    def run(tasks, workers):
+        pending = queue.Queue()
+        for index, task in enumerate(tasks):
+            pending.put((index, task))
+        results = [None] * len(tasks)
+
+        def worker():
+            client = APIClient(SERVER_NAME='localhost')
+            try:
+                while True:
+                    try:
+                        index, (student, course_id, key, _) = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    client.force_authenticate(user=student)
+                    headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+                    response = client.post(f'/api/courses/{course_id}/enroll/', **headers)
+                    results[index] = (
+                        time.perf_counter(),
+                        response.status_code,
+                        response.get('Idempotent-Replayed') == 'true',
+                    )
+            finally:
+                connection.close()
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, time.perf_counter() - start
+
+    def report(self, results, elapsed, windows, max_degradation):
+        finished = sorted(r[0] for r in results)
+        self.stdout.write(f'Completed {len(finished)} requests in {elapsed:.2f}s '
+                          f'({len(finished) / elapsed:.0f} req/s)')
+
+        size = max(1, len(finished) // windows)
+        rates = []
+        for i in range(0, len(finished) - size + 1, size):
+            window = finished[i:i + size]
+            span = window[-1] - window[0]
+            if span > 0:
+                rates.append(len(window) / span)
+        if len(rates) < 2:
+            return
+
+        median = statistics.median(rates)
+        slowest = min(rates)
+        self.stdout.write(
+            f'Throughput per window: min {slowest:.0f}, median {median:.0f}, max {max(rates):.0f} req/s'
+        )
+        if slowest < median * (1 - max_degradation):
+            raise CommandError(
+                f'Throughput unstable: slowest window {slowest:.0f} req/s is below '
+                f'{(1 - max_degradation) * 100:.0f}% of the median ({median:.0f} req/s)'
+            )
+
+    def verify(self, prefix, tasks, results):
+        duplicates = (
+            Enrollment.all_objects
+            .filter(student__username__startswith=prefix)
+            .values('student_id', 'course_id')
+            .annotate(rows=Count('id'))
+            .filter(rows__gt=1)
+            .count()
+        )
+        expected = len({(task[0].id, task[1]) for task in tasks})
+        actual = Enrollment.all_objects.filter(student__username__startswith=prefix).count()
+
+        statuses = {}
+        for (student, course_id, key, is_retry), (_, code, replayed) in zip(tasks, results):
+            label = 'first' if not is_retry else ('replayed' if replayed else 'retry')
+            statuses.setdefault(label, {}).setdefault(code, 0)
+            statuses[label][code] += 1
+        for label, codes in sorted(statuses.items()):
+            self.stdout.write(f'  {label:<9} {dict(sorted(codes.items()))}')
+
+        if duplicates or actual != expected:
+            raise CommandError(
+                f'Enrollment check failed: {duplicates} duplicated pairs, {actual} rows for {expected} pairs'
+            )
+        if any(code != 201 for code in statuses.get('first', {})):
+            raise CommandError('Some first-attempt enrollments did not return 201')
+        self.stdout.write(self.style.SUCCESS(f'No duplicates: {actual} enrollments for {expected} pairs'))
+
+    def cleanup(self, prefix):
+        Enrollment.all_objects.filter(student__username__startswith=prefix).delete()
+        Course.all_objects.filter(title__startswith=prefix).delete()
+        User.objects.filter(username__startswith=prefix).delete()
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from learning import partitions
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the coming monthly QuizAttempt partitions on PostgreSQL (run it daily), '
+        'or convert the table to partitions / back with --convert / --revert.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead', type=int, default=partitions.DEFAULT_AHEAD,
+            help='Months to create past the current one'
+        )
+        parser.add_argument('--convert', action='store_true', help='Rebuild the table as monthly partitions')
+        parser.add_argument('--revert', action='store_true', help='Rebuild the table without partitions')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if connections[using].vendor != 'postgresql':
+            raise CommandError('Partitioning needs PostgreSQL')
+        if options['convert'] and options['revert']:
+            raise CommandError('Give --convert or --revert, not both')
+
+        if options['revert']:
+            done = partitions.revert(using=using)
+            self.stdout.write(self.style.SUCCESS('Reverted to a plain table' if done else 'Not partitioned'))
+            return
+        if options['convert']:
+            if partitions.convert(ahead=options['ahead'], using=using):
+                self.stdout.write(f'  converted into {len(partitions.partitions(using))} monthly partition(s)')
+        elif not partitions.is_partitioned(using):
+            raise CommandError('The table is not partitioned; run with --convert first')
+
+        for name in partitions.create_ahead(options['ahead'], using=using):
+            self.stdout.write(f'  created {name}')
+        months = list(partitions.partitions(using))
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(months)} monthly partition(s), {months[0]:%Y-%m} to {months[-1]:%Y-%m}'
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from learning import counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Correct the admin dashboard counters against exact COUNT(*)s. Writers are '
+        'never blocked; run it periodically (e.g. hourly) to undo drift from bulk writes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Counters to reconcile (default: all)')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        known = counters.definitions(using=options['database'])
+        unknown = sorted(set(options['names']) - set(known))
+        if unknown:
+            raise CommandError(f'Unknown counter(s): {", ".join(unknown)}')
+
+        results = counters.reconcile(options['names'], using=options['database'])
+        drifted = 0
+        for name, correction in results:
+            if correction:
+                drifted += 1
+                self.stdout.write(f'  {name:<24} corrected by {correction:+,}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciled {len(results)} counter(s), {drifted} had drifted'
+        ))
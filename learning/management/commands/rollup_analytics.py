@@ -0,0 +1,41 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from learning import rollups
+
+
+def _day(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f'Not a date (YYYY-MM-DD): {value}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Roll platform activity up into daily rows, starting from the last watermark. '
+        'Run it periodically; use --since to rebuild older days after backfills '
+        '(not days whose attempts were archived).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='First day to recompute (default: the watermark)')
+        parser.add_argument('--until', help='Last day to recompute (default: today)')
+
+    def handle(self, *args, **options):
+        since = _day(options['since']) if options['since'] else None
+        until = _day(options['until']) if options['until'] else None
+
+        try:
+            result = rollups.rollup(since, until)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        if result is None:
+            self.stdout.write('Nothing to roll up')
+            return
+        start, end, active_days = result
+        self.stdout.write(self.style.SUCCESS(
+            f'Rolled up {start} to {end} ({active_days} day(s) with activity); '
+            f'watermark is {rollups.watermark_day()}'
+        ))
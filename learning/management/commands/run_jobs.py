@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from learning import jobs
+from learning.models import BackgroundJob
+
+
+class Command(BaseCommand):
+    help = (
+        'Run pending background jobs; the web process never runs them. Jobs whose '
+        'worker died are re-queued once their lease expires.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new jobs')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            requeued, failed = jobs.requeue_stale()
+            if requeued or failed:
+                self.stdout.write(f'Re-queued {requeued} and failed {failed} job(s) lost with their worker')
+            pending = list(
+                BackgroundJob.objects.filter(status='PENDING').order_by('id').values_list('id', flat=True)
+            )
+            for job_id in pending:
+                job = jobs.run(job_id)
+                if job is not None:
+                    self.stdout.write(f'  {job}')
+            if not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'Ran {len(pending)} pending job(s)'))
+                return
+            time.sleep(options['interval'])
@@ -1,4 +1,8 @@
-from django.db import models
+import random
+
+from django.db import connections, models, transaction
+from django.db.models import Func, Max, Sum
+from django.utils import timezone
 
 class ActiveManager(models.Manager):
     """Default manager returning only is_active=True records."""
@@ -7,4 +11,176 @@ class ActiveManager(models.Manager):
 
 class AllObjectsManager(models.Manager):
     """Manager returning all records (including inactive)."""
-    pass
\ No newline at end of file
+    pass
+
+class LessonManager(ActiveManager):
+    """
+    Active lessons with the (large) content column deferred.
+    Only the lesson detail endpoint needs content; use with_content() there.
+    """
+    def get_queryset(self):
+        return super().get_queryset().defer("content")
+
+    def with_content(self):
+        return super().get_queryset()
+
+class LessonProgressManager(ActiveManager):
+    """Active progress rows plus the single-statement completion upsert."""
+    def complete(self, student_id, course_id, lesson_id, completed_at, previous_lesson_id=None):
+        """
+        Mark lesson_id completed for the student's active enrollment with one
+        INSERT ... ON CONFLICT DO UPDATE. The row is only written when the
+        student is enrolled and previous_lesson_id (if given) is completed.
+
+        Returns the LessonProgress id, or None if nothing was written.
+        """
+        progress_table = self.model._meta.db_table
+        enrollment_table = self.model._meta.get_field("enrollment").related_model._meta.db_table
+        sql = f"""
+            INSERT INTO {progress_table} (enrollment_id, lesson_id, is_active, completed_at)
+            SELECT e.id, %s, %s, %s
+            FROM {enrollment_table} e
+            WHERE e.student_id = %s
+              AND e.course_id = %s
+              AND e.is_active = %s
+              AND (%s OR EXISTS (
+                  SELECT 1 FROM {progress_table} p
+                  WHERE p.enrollment_id = e.id
+                    AND p.lesson_id = %s
+                    AND p.is_active = %s
+                    AND p.completed_at IS NOT NULL
+              ))
+            ON CONFLICT (enrollment_id, lesson_id)
+            DO UPDATE SET completed_at = EXCLUDED.completed_at, is_active = EXCLUDED.is_active
+            RETURNING id
+        """
+        connection = connections[self.db]
+        params = [
+            lesson_id, True, connection.ops.adapt_datetimefield_value(completed_at),
+            student_id, course_id, True,
+            previous_lesson_id is None, previous_lesson_id or 0, True,
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+class EnrollmentManager(ActiveManager):
+    """Active enrollments plus the conflict-ignoring enroll inserts."""
+    def enroll(self, student_id, course_id, enrolled_at):
+        """
+        Enroll a student with one INSERT ... ON CONFLICT statement.
+        A soft-deleted enrollment is reactivated; an active one is left alone.
+
+        Returns the enrollment id, or None if the student was already enrolled.
+        """
+        rows = self.enroll_many([student_id], course_id, enrolled_at)
+        return rows[0][0] if rows else None
+
+    def enroll_many(self, student_ids, course_id, enrolled_at):
+        """
+        Enroll many students in a course with one multi-row INSERT ... ON
+        CONFLICT statement, with the same rules as enroll().
+
+        Returns (enrollment id, student id) for every student actually
+        enrolled. The raw insert sends no signals, so the "enrollments"
+        platform counter is bumped here, in the same transaction.
+        """
+        if not student_ids:
+            return []
+        table = self.model._meta.db_table
+        connection = connections[self.db]
+        enrolled_at = connection.ops.adapt_datetimefield_value(enrolled_at)
+        values, params = [], []
+        for student_id in student_ids:
+            values.append("(%s, %s, %s, %s)")
+            params += [student_id, course_id, True, enrolled_at]
+        sql = f"""
+            INSERT INTO {table} (student_id, course_id, is_active, enrolled_at)
+            VALUES {", ".join(values)}
+            ON CONFLICT (student_id, course_id)
+            DO UPDATE SET is_active = EXCLUDED.is_active, enrolled_at = EXCLUDED.enrolled_at
+            WHERE {table}.is_active = %s
+            RETURNING id, student_id
+        """
+        params.append(False)
+        with transaction.atomic(using=self.db, savepoint=False):
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                rows = cursor.fetchall()
+            if rows:
+                counters = self.model._meta.apps.get_model("learning", "PlatformCounter")
+                counters.objects.db_manager(self.db).add({"enrollments": len(rows)})
+        return rows
+
+class PlatformCounterManager(models.Manager):
+    """Sharded counter rows: additive upserts and drift checks against exact counts."""
+    use_in_migrations = True
+
+    SHARDS = 8
+
+    def add(self, deltas, shard=None, reconciled_at=None):
+        """
+        Add {name: delta} to the counters with one INSERT ... ON CONFLICT
+        statement on the current connection, so it commits or rolls back
+        with the caller's transaction. Writers pick a random shard row and
+        rarely wait on each other's row locks.
+        """
+        deltas = {name: delta for name, delta in deltas.items() if delta or reconciled_at}
+        if not deltas:
+            return
+        table = self.model._meta.db_table
+        connection = connections[self.db]
+        shard = random.randrange(self.SHARDS) if shard is None else shard
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        reconciled_at = connection.ops.adapt_datetimefield_value(reconciled_at)
+        rows, params = [], []
+        # Sorted names keep the row lock order stable across transactions
+        for name in sorted(deltas):
+            rows.append("(%s, %s, %s, %s, %s)")
+            params += [name, shard, deltas[name], now, reconciled_at]
+        sql = f"""
+            INSERT INTO {table} (name, shard, value, updated_at, reconciled_at)
+            VALUES {", ".join(rows)}
+            ON CONFLICT (name, shard)
+            DO UPDATE SET value = {table}.value + EXCLUDED.value,
+                          updated_at = EXCLUDED.updated_at,
+                          reconciled_at = COALESCE(EXCLUDED.reconciled_at, {table}.reconciled_at)
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def drift(self, name, queryset):
+        """
+        Exact count of queryset minus the stored counter value.
+
+        Both are read by one statement, so they come from the same snapshot;
+        changes committed afterwards move both sides equally, which makes the
+        result safe to add() without locking out writers.
+        """
+        count_sql, count_params = (
+            queryset.order_by().values(n=Func("pk", function="COUNT"))
+            .query.get_compiler(using=self.db).as_sql()
+        )
+        sql = f"""
+            SELECT ({count_sql}) - COALESCE(
+                (SELECT SUM(value) FROM {self.model._meta.db_table} WHERE name = %s), 0
+            )
+        """
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(sql, [*count_params, name])
+            return cursor.fetchone()[0]
+
+    def totals(self):
+        """{name: {"value", "updated_at", "reconciled_at"}} in one query."""
+        rows = self.values("name").annotate(
+            total=Sum("value"), last_update=Max("updated_at"), last_reconcile=Max("reconciled_at"),
+        )
+        return {
+            row["name"]: {
+                "value": row["total"],
+                "updated_at": row["last_update"],
+                "reconciled_at": row["last_reconcile"],
+            }
+            for row in rows
+        }
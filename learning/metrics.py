@@ -0,0 +1,338 @@
+"""
+Prometheus metrics.
+
+Values live in per-thread shards: each thread only ever writes its own dict,
+so recording takes no locks, and a scrape merges all shards. Shards of exited
+threads are folded into one when a new thread starts recording or on a scrape,
+so memory follows the live threads rather than every thread ever seen. With
+METRICS["MULTIPROCESS_DIR"] set, every process also writes its snapshot to
+that directory (every FLUSH_INTERVAL seconds and on each scrape) and the
+endpoint merges all of them. A scrape folds the files of processes that no
+longer exist (the directory is per host) into one EXITED_FILE, keeping their
+counters and histograms and dropping their gauges; gauges of live processes
+that stopped flushing are skipped as well.
+"""
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+
+DEFAULTS = {
+    "ENABLED": False,
+    "TOKEN": None,
+    "MULTIPROCESS_DIR": None,
+    "FLUSH_INTERVAL": 5,
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SLOW_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+REGISTRY = {}
+
+EXITED_FILE = "metrics_exited.json"
+_PROCESS_FILE = re.compile(r"^metrics_(\d+)\.json$")
+
+_local = threading.local()
+_lock = threading.Lock()  # guards _shards and _retired, never taken when recording
+_shards = {}  # live thread -> its dict
+_retired = {}  # merged values of exited threads
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "METRICS", {})}
+
+
+def _shard():
+    shard = getattr(_local, "values", None)
+    if shard is None:
+        shard = _local.values = {}
+        with _lock:
+            _fold_exited()
+            _shards[threading.current_thread()] = shard
+    return shard
+
+
+def _fold_exited():
+    """Merge the shards of exited threads into _retired. Call with _lock held."""
+    for thread in [thread for thread in _shards if not thread.is_alive()]:
+        for key, value in _shards.pop(thread).items():
+            _merge(_retired, key, value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY[name] = self
+
+    def _key(self, labels):
+        return self.name, tuple(str(labels[label]) for label in self.labelnames)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        shard, key = _shard(), self._key(labels)
+        shard[key] = shard.get(key, 0) + amount
+
+
+class Gauge(Counter):
+    """Up/down value; each thread keeps its own delta and scrapes sum them."""
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        shard, key = _shard(), self._key(labels)
+        state = shard.get(key)
+        if state is None:
+            # Per-bucket (not cumulative) counts, the +Inf bucket, then the sum
+            state = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+# ---- application metrics ----
+
+HTTP_REQUESTS = Counter(
+    "learning_http_requests_total", "HTTP requests by view route, method and status",
+    ("view", "method", "status"),
+)
+HTTP_LATENCY = Histogram(
+    "learning_http_request_duration_seconds", "HTTP request latency by view route",
+    ("view", "method"),
+)
+DB_QUERIES = Histogram(
+    "learning_db_queries_per_request", "SQL statements executed per request",
+    ("view",), buckets=QUERY_COUNT_BUCKETS,
+)
+DB_DURATION = Histogram(
+    "learning_db_duration_seconds", "Time spent in SQL per request",
+    ("view",),
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "learning_websocket_connections", "Open NotificationConsumer websocket connections",
+)
+NOTIFICATIONS_SENT = Counter(
+    "learning_notifications_sent_total", "Notifications sent by type",
+    ("type",),
+)
+EXPORT_DURATION = Histogram(
+    "learning_export_duration_seconds", "Student result export duration by format",
+    ("format",), buckets=SLOW_BUCKETS,
+)
+CERTIFICATE_RENDER = Histogram(
+    "learning_certificate_render_seconds", "Certificate PDF render time",
+    buckets=SLOW_BUCKETS,
+)
+
+
+# ---- snapshots and exposition ----
+
+def snapshot():
+    """This process's values merged across threads: {(name, labels): value}."""
+    merged = {}
+    with _lock:
+        _fold_exited()
+        for shard in (_retired, *_shards.values()):
+            for key, value in list(shard.items()):
+                _merge(merged, key, list(value) if isinstance(value, list) else value)
+    return merged
+
+
+def _merge(merged, key, value):
+    current = merged.get(key)
+    if current is None:
+        merged[key] = value
+    elif isinstance(value, list):
+        merged[key] = [a + b for a, b in zip(current, value)]
+    else:
+        merged[key] = current + value
+
+
+def flush(directory=None):
+    """Write this process's snapshot to the multiprocess directory."""
+    directory = directory or get_config()["MULTIPROCESS_DIR"]
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"metrics_{os.getpid()}.json")
+    payload = {
+        "written_at": time.time(),
+        "values": [[name, list(labels), value] for (name, labels), value in snapshot().items()],
+    }
+    _write(path, payload)
+
+
+_flusher_started = False
+
+
+def start_flusher():
+    """Start the background flush thread once per process (multiprocess mode only)."""
+    global _flusher_started
+    config = get_config()
+    if _flusher_started or not config["MULTIPROCESS_DIR"]:
+        return
+    _flusher_started = True
+
+    def run():
+        while True:
+            time.sleep(config["FLUSH_INTERVAL"])
+            try:
+                flush(config["MULTIPROCESS_DIR"])
+            except OSError:
+                pass
+
+    threading.Thread(target=run, name="metrics-flusher", daemon=True).start()
+
+
+def _read(path):
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path, payload):
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as handle:
+        json.dump(payload, handle)
+    os.replace(temporary, path)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # exists, owned by someone else
+    return True
+
+
+def fold_exited_processes(directory):
+    """
+    Merge the counters and histograms of processes that no longer exist into
+    EXITED_FILE and delete their files, so they stop piling up and their
+    gauges stop counting. Returns the number of files folded.
+    """
+    import fcntl  # multiprocess mode is for POSIX servers
+
+    with open(os.path.join(directory, ".lock"), "w") as lock:
+        # Concurrent scrapes must not fold the same file twice
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        exited = [
+            name for name in os.listdir(directory)
+            if (match := _PROCESS_FILE.match(name)) and not _alive(int(match[1]))
+        ]
+        if not exited:
+            return 0
+        path = os.path.join(directory, EXITED_FILE)
+        totals = {}
+        for name in (EXITED_FILE, *exited):
+            payload = _read(os.path.join(directory, name)) or {"values": []}
+            for metric_name, labels, value in payload["values"]:
+                metric = REGISTRY.get(metric_name)
+                if metric is not None and metric.kind != "gauge":
+                    _merge(totals, (metric_name, tuple(labels)), value)
+        _write(path, {
+            "written_at": time.time(),
+            "values": [[name, list(labels), value] for (name, labels), value in totals.items()],
+        })
+        for name in exited:
+            os.remove(os.path.join(directory, name))
+    return len(exited)
+
+
+def collect():
+    """Values to expose: this process, or all processes in multiprocess mode."""
+    config = get_config()
+    directory = config["MULTIPROCESS_DIR"]
+    if not directory:
+        return snapshot()
+
+    flush(directory)
+    fold_exited_processes(directory)
+    stale_after = config["FLUSH_INTERVAL"] * 3
+    merged = {}
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        payload = _read(os.path.join(directory, name))
+        if payload is None:
+            continue
+        live = time.time() - payload["written_at"] <= stale_after
+        for metric_name, labels, value in payload["values"]:
+            metric = REGISTRY.get(metric_name)
+            if metric is None or (metric.kind == "gauge" and not live):
+                continue
+            _merge(merged, (metric_name, tuple(labels)), value)
+    return merged
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(value) if value != int(value) else str(int(value))
+    return str(value)
+
+
+def render(values=None):
+    """Prometheus text exposition format (version 0.0.4)."""
+    values = collect() if values is None else values
+    by_metric = {}
+    for (name, labels), value in values.items():
+        by_metric.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, metric in sorted(REGISTRY.items()):
+        lines.append(f"# HELP {name} {metric.documentation}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        for labels, value in sorted(by_metric.get(name, [])):
+            if metric.kind != "histogram":
+                lines.append(f"{name}{_labels(metric.labelnames, labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip((*metric.buckets, "+Inf"), value[:-1]):
+                cumulative += count
+                le = bound if bound == "+Inf" else _number(float(bound))
+                lines.append(f"{name}_bucket{_labels(metric.labelnames, labels, [('le', le)])} {cumulative}")
+            lines.append(f"{name}_sum{_labels(metric.labelnames, labels)} {_number(value[-1])}")
+            lines.append(f"{name}_count{_labels(metric.labelnames, labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
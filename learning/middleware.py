@@ -0,0 +1,165 @@
+"""
+Request middleware.
+"""
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from .instrumentation import get_config, instrument, log_if_slow, server_timing
+from . import metrics, profiling
+from .utils import nplusone
+
+
+class MetricsMiddleware:
+    """
+    Records per-route request counts, latency and per-request SQL count/time
+    into learning.metrics. Sync and async capable; dropped at startup when
+    METRICS["ENABLED"] is off.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not metrics.get_config()["ENABLED"]:
+            raise MiddlewareNotUsed
+        metrics.start_flusher()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with instrument() as block:
+            response = self.get_response(request)
+        self.record(request, response, block)
+        return response
+
+    async def __acall__(self, request):
+        with instrument() as block:
+            response = await self.get_response(request)
+        self.record(request, response, block)
+        return response
+
+    @staticmethod
+    def record(request, response, block):
+        match = getattr(request, "resolver_match", None)
+        view = match.route if match else "<unmatched>"
+        metrics.HTTP_REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        metrics.HTTP_LATENCY.observe(block.elapsed, view=view, method=request.method)
+        metrics.DB_QUERIES.observe(block.stats.count, view=view)
+        metrics.DB_DURATION.observe(block.stats.duration, view=view)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records query count, DB time and the slowest statement per request.
+
+    Adds a Server-Timing header (db, app, db-slowest) and logs a structured
+    line on learning.performance when the request crosses the configured
+    thresholds. Works as sync (WSGI) or async (ASGI) middleware. When
+    QUERY_INSTRUMENTATION["ENABLED"] is off Django drops it at startup.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.config = get_config()
+        if not self.config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with instrument() as block:
+            response = self.get_response(request)
+        return self.finish(request, response, block)
+
+    async def __acall__(self, request):
+        with instrument() as block:
+            response = await self.get_response(request)
+        return self.finish(request, response, block)
+
+    def finish(self, request, response, block):
+        if self.config["SERVER_TIMING"]:
+            response["Server-Timing"] = server_timing(block)
+        log_if_slow(
+            block, "request", request.path, self.config,
+            method=request.method, status=response.status_code,
+        )
+        return response
+
+
+class NPlusOneMiddleware:
+    """
+    Development/test middleware that reports repeated query templates per
+    request (see learning/utils/nplusone.py). Sync-only on purpose: under
+    ASGI Django runs it, and everything after it, in the view's thread, so a
+    plain connection.execute_wrapper sees the view's queries.
+    """
+    sync_capable = True
+    async_capable = False
+
+    def __init__(self, get_response):
+        self.config = nplusone.get_config()
+        if not self.config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        detector = nplusone.NPlusOneDetector(self.config["THRESHOLD"])
+        with connection.execute_wrapper(detector):
+            response = self.get_response(request)
+        detector.report(self.config["MODE"], label=f"{request.method} {request.path}")
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a request when an admin asks for it with X-Profile / ?_profile
+    (see learning/profiling.py). Sync-only so that under ASGI the profiler
+    runs in the same thread as the view. Other requests pay one header check.
+    """
+    sync_capable = True
+    async_capable = False
+
+    def __init__(self, get_response):
+        self.config = profiling.get_config()
+        if not self.config["ENABLED"]:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = profiling.requested_mode(request)
+        if mode is None or not profiling.is_admin(request):
+            return self.get_response(request)
+
+        if not profiling.take_slot(self.config):
+            return self.skipped(request, "rate-limited")
+        if not profiling.profiling_lock.acquire(blocking=False):
+            return self.skipped(request, "busy")
+        try:
+            start = time.perf_counter()
+            response, writer = profiling.run_profiled(mode, lambda: self.get_response(request), self.config)
+            duration_ms = (time.perf_counter() - start) * 1000
+        finally:
+            profiling.profiling_lock.release()
+
+        profile_id = profiling.save_profile(mode, writer, {
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "duration_ms": round(duration_ms, 2),
+        }, self.config)
+        response[profiling.PROFILE_ID_HEADER] = profile_id
+        return response
+
+    def skipped(self, request, reason):
+        response = self.get_response(request)
+        response[profiling.PROFILE_SKIPPED_HEADER] = reason
+        return response
@@ -0,0 +1,65 @@
+# Moves Lesson.content to a zlib-compressed binary column.
+
+from django.db import migrations, models
+
+import learning.fields
+
+BATCH_SIZE = 500
+
+
+def compress_content(apps, schema_editor):
+    Lesson = apps.get_model('learning', 'Lesson')
+    batch = []
+    for lesson in Lesson.objects.only('id', 'content').order_by('pk').iterator(chunk_size=BATCH_SIZE):
+        lesson.compressed_content = lesson.content
+        batch.append(lesson)
+        if len(batch) >= BATCH_SIZE:
+            Lesson.objects.bulk_update(batch, ['compressed_content'])
+            batch = []
+    if batch:
+        Lesson.objects.bulk_update(batch, ['compressed_content'])
+
+
+def decompress_content(apps, schema_editor):
+    Lesson = apps.get_model('learning', 'Lesson')
+    batch = []
+    for lesson in Lesson.objects.only('id', 'compressed_content').order_by('pk').iterator(chunk_size=BATCH_SIZE):
+        lesson.content = lesson.compressed_content
+        batch.append(lesson)
+        if len(batch) >= BATCH_SIZE:
+            Lesson.objects.bulk_update(batch, ['content'])
+            batch = []
+    if batch:
+        Lesson.objects.bulk_update(batch, ['content'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0007_lecturenote_wishlist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='compressed_content',
+            field=learning.fields.CompressedTextField(default=''),
+            preserve_default=False,
+        ),
+        migrations.RunPython(compress_content, decompress_content),
+        # Give the old column a default so the removal can be reversed
+        migrations.AlterField(
+            model_name='lesson',
+            name='content',
+            field=models.TextField(default=''),
+        ),
+        migrations.RemoveField(
+            model_name='lesson',
+            name='content',
+        ),
+        migrations.RenameField(
+            model_name='lesson',
+            old_name='compressed_content',
+            new_name='content',
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Collapses duplicate progress rows, then enforces one row per (enrollment, lesson).
+
+from django.db import migrations
+from django.db.models import Count, Max, Min
+
+
+def merge_duplicate_progress(apps, schema_editor):
+    LessonProgress = apps.get_model('learning', 'LessonProgress')
+    duplicates = (
+        LessonProgress.objects
+        .values('enrollment_id', 'lesson_id')
+        .annotate(rows=Count('id'), keep_id=Min('id'), completed_at=Max('completed_at'))
+        .filter(rows__gt=1)
+    )
+    for dup in duplicates.iterator():
+        LessonProgress.objects.filter(pk=dup['keep_id']).update(completed_at=dup['completed_at'])
+        LessonProgress.objects.filter(
+            enrollment_id=dup['enrollment_id'],
+            lesson_id=dup['lesson_id'],
+        ).exclude(pk=dup['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0008_compress_lesson_content'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_progress, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='lessonprogress',
+            unique_together={('enrollment', 'lesson')},
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Merges duplicate enrollments, then enforces one row per (student, course).
+
+from django.db import migrations
+from django.db.models import Case, Count, F, Min, When
+
+
+def merge_duplicate_enrollments(apps, schema_editor):
+    Enrollment = apps.get_model('learning', 'Enrollment')
+    LessonProgress = apps.get_model('learning', 'LessonProgress')
+    duplicates = (
+        Enrollment.objects
+        .values('student_id', 'course_id')
+        .annotate(rows=Count('id'), keep_id=Min('id'))
+        .filter(rows__gt=1)
+    )
+    for dup in duplicates.iterator():
+        keep_id = dup['keep_id']
+        others = Enrollment.objects.filter(
+            student_id=dup['student_id'],
+            course_id=dup['course_id'],
+        ).exclude(pk=keep_id)
+        other_ids = list(others.values_list('id', flat=True))
+
+        # One progress row per lesson survives: the earliest completion, else
+        # the kept enrollment's own row. Losers go first, as (enrollment,
+        # lesson) is already unique.
+        progress = LessonProgress.objects.filter(enrollment_id__in=[keep_id, *other_ids]).order_by(
+            F('completed_at').asc(nulls_last=True), Case(When(enrollment_id=keep_id, then=0), default=1), 'id'
+        )
+        best = {}
+        for row in progress:
+            best.setdefault(row.lesson_id, row)
+        kept_ids = [row.id for row in best.values()]
+        LessonProgress.objects.filter(enrollment_id__in=[keep_id, *other_ids]).exclude(id__in=kept_ids).delete()
+        LessonProgress.objects.filter(id__in=kept_ids).exclude(enrollment_id=keep_id).update(enrollment_id=keep_id)
+
+        if others.filter(is_active=True).exists():
+            Enrollment.objects.filter(pk=keep_id).update(is_active=True)
+        others.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0009_lessonprogress_unique_enrollment_lesson'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_enrollments, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='enrollment',
+            unique_together={('student', 'course')},
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Hot-path secondary indexes, built with CREATE INDEX CONCURRENTLY on PostgreSQL.
+
+from django.db import migrations, models
+
+from learning.utils.db_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('learning', '0010_enrollment_unique_student_course'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['course', 'lesson', 'parent', 'created_at'], name='comment_thread_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='enrollment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['course', 'enrolled_at'], name='enrollment_active_course_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lesson',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['course', 'lesson_order'], name='lesson_active_course_order_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lessonprogress',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['enrollment', 'completed_at'], name='progress_enroll_completed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='notification',
+            index=models.Index(fields=['user', 'is_read', 'created_at'], name='notif_user_read_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='quizattempt',
+            index=models.Index(fields=['student', 'quiz', 'is_passed'], name='attempt_student_quiz_pass_idx'),
+        ),
+    ]
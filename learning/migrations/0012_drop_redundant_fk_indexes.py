@@ -0,0 +1,40 @@
+# Drops single-column FK indexes now covered by the composite indexes in 0011,
+# with DROP INDEX CONCURRENTLY on PostgreSQL.
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from learning.utils.db_operations import RemoveFieldIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('learning', '0011_hot_path_indexes'),
+    ]
+
+    operations = [
+        RemoveFieldIndexConcurrently(
+            model_name='comment',
+            name='course',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='learning.course'),
+        ),
+        RemoveFieldIndexConcurrently(
+            model_name='lessonprogress',
+            name='enrollment',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, to='learning.enrollment'),
+        ),
+        RemoveFieldIndexConcurrently(
+            model_name='notification',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        RemoveFieldIndexConcurrently(
+            model_name='quizattempt',
+            name='student',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.PROTECT, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Fills the platform counters from exact counts. Separate from 0013 because
+# the (name, shard) unique index the upsert relies on is only created when
+# that migration finishes.
+
+from django.db import migrations
+
+
+def initial_reconcile(apps, schema_editor):
+    from learning.counters import reconcile
+
+    reconcile(apps=apps, using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0013_platform_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(initial_reconcile, migrations.RunPython.noop),
+    ]
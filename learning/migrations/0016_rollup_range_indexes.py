@@ -0,0 +1,30 @@
+# Event-time indexes for the rollup_analytics day-range scans, built with
+# CREATE INDEX CONCURRENTLY on PostgreSQL.
+
+from django.db import migrations, models
+
+from learning.utils.db_operations import AddIndexConcurrently
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('learning', '0015_daily_rollups'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='enrollment',
+            index=models.Index(fields=['enrolled_at'], name='enrollment_enrolled_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lessonprogress',
+            index=models.Index(fields=['completed_at'], name='progress_completed_at_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='quizattempt',
+            index=models.Index(fields=['attempted_at'], name='attempt_attempted_at_idx'),
+        ),
+    ]
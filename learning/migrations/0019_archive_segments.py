@@ -0,0 +1,32 @@
+# Archive tier for old quiz attempts and notifications (see learning/archive.py).
+
+import django.db.models.deletion
+import learning.fields
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0018_background_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('attempts', 'Quiz attempts'), ('notifications', 'Notifications')], max_length=20)),
+                ('first_at', models.DateTimeField()),
+                ('last_at', models.DateTimeField()),
+                ('row_count', models.PositiveIntegerField()),
+                ('rows', learning.fields.CompressedTextField(threshold=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'user', 'last_at'], name='archive_kind_user_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Optionally turns learning_quizattempt into monthly range partitions on
+# PostgreSQL (QUIZ_ATTEMPT_PARTITIONING, see learning/partitions.py).
+
+from django.conf import settings
+from django.db import migrations
+
+
+def partition_quiz_attempts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql' or not settings.QUIZ_ATTEMPT_PARTITIONING:
+        return
+    from learning import partitions
+    partitions.convert(using=schema_editor.connection.alias)
+
+
+def unpartition_quiz_attempts(apps, schema_editor):
+    from learning import partitions
+    partitions.revert(using=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('learning', '0019_archive_segments'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_quiz_attempts, unpartition_quiz_attempts),
+    ]
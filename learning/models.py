@@ -3,8 +3,18 @@ from django.conf import settings
 from django.utils import timezone
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.contrib.auth.base_user import BaseUserManager
-
-from .managers import ActiveManager, AllObjectsManager
+from django.contrib.postgres.indexes import OpClass
+from django.db.models.functions import Upper
+
+from .fields import CompressedTextField
+from .managers import (
+    ActiveManager,
+    AllObjectsManager,
+    EnrollmentManager,
+    LessonManager,
+    LessonProgressManager,
+    PlatformCounterManager,
+)
 
 # ---- Role / Permission ----
 class Role(models.Model):
@@ -68,6 +78,12 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = "username"
     REQUIRED_FIELDS = ["email"]
 
+    class Meta:
+        indexes = [
+            # Case-insensitive prefix search (username__istartswith) in the admin user list
+            models.Index(OpClass(Upper("username"), name="text_pattern_ops"), name="user_username_prefix_idx"),
+            models.Index(OpClass(Upper("email"), name="text_pattern_ops"), name="user_email_prefix_idx"),
+        ]
 
 
 class RolePermission(models.Model):
@@ -92,21 +108,31 @@ class Course(models.Model):
     all_objects = AllObjectsManager()
 
     def soft_delete(self):
-        self.is_active = False
-        self.save()
+        """Deactivate the course with its lessons and quizzes (see learning/retirement.py)."""
+        from .retirement import deactivate
+        return deactivate(self)
 
 class Lesson(models.Model):
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
     title = models.CharField(max_length=255)
-    content = models.TextField()
+    content = CompressedTextField()  # zlib-compressed at rest, deferred by default
     lesson_order = models.IntegerField()
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
-    objects = ActiveManager()
+    objects = LessonManager()
     all_objects = AllObjectsManager()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['course', 'lesson_order'],
+                condition=models.Q(is_active=True),
+                name='lesson_active_course_order_idx',
+            ),
+        ]
+
     def soft_delete(self):
         self.is_active = False
         self.save()
@@ -117,22 +143,47 @@ class Enrollment(models.Model):
     is_active = models.BooleanField(default=True)
     enrolled_at = models.DateTimeField(default=timezone.now)
 
-    objects = ActiveManager()
+    objects = EnrollmentManager()
     all_objects = AllObjectsManager()
 
+    class Meta:
+        unique_together = ("student", "course")
+        indexes = [
+            models.Index(
+                fields=['course', 'enrolled_at'],
+                condition=models.Q(is_active=True),
+                name='enrollment_active_course_idx',
+            ),
+            # Day-range scans by rollup_analytics (all enrollments, not just active ones)
+            models.Index(fields=['enrolled_at'], name='enrollment_enrolled_at_idx'),
+        ]
+
     def soft_delete(self):
         self.is_active = False
         self.save()
 
 class LessonProgress(models.Model):
-    enrollment = models.ForeignKey(Enrollment, on_delete=models.PROTECT)
+    # Indexed by unique_together (enrollment, lesson)
+    enrollment = models.ForeignKey(Enrollment, on_delete=models.PROTECT, db_index=False)
     lesson = models.ForeignKey(Lesson, on_delete=models.PROTECT)
     is_active = models.BooleanField(default=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
-    objects = ActiveManager()
+    objects = LessonProgressManager()
     all_objects = AllObjectsManager()
 
+    class Meta:
+        unique_together = ("enrollment", "lesson")
+        indexes = [
+            models.Index(
+                fields=['enrollment', 'completed_at'],
+                name='progress_enroll_completed_idx',
+                condition=models.Q(is_active=True),
+            ),
+            # Day-range scans by rollup_analytics
+            models.Index(fields=['completed_at'], name='progress_completed_at_idx'),
+        ]
+
     def soft_delete(self):
         self.is_active = False
         self.save()
@@ -170,13 +221,21 @@ class Question(models.Model):
         self.save()
 
 class QuizAttempt(models.Model):
-    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT)
+    # Indexed by attempt_student_quiz_pass_idx
+    student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT, db_index=False)
     quiz = models.ForeignKey(Quiz, on_delete=models.PROTECT)
     score = models.FloatField(null=True, blank=True)
     is_passed = models.BooleanField(default=False)
     attempted_at = models.DateTimeField(default=timezone.now)
 
     objects = models.Manager()        # ✅ DEFAULT MANAGER
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'quiz', 'is_passed'], name='attempt_student_quiz_pass_idx'),
+            # Day-range scans by rollup_analytics
+            models.Index(fields=['attempted_at'], name='attempt_attempted_at_idx'),
+        ]
 # learning/models.py
 
 class CourseRating(models.Model):
@@ -210,7 +269,8 @@ class Notification(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
-        related_name='notifications'
+        related_name='notifications',
+        db_index=False  # Indexed by notif_user_read_created_idx
     )
     notification_type = models.CharField(max_length=50, choices=NOTIFICATION_TYPES)
     message = models.TextField()
@@ -220,6 +280,9 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'is_read', 'created_at'], name='notif_user_read_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.notification_type} - {self.user.username}"
@@ -227,7 +290,7 @@ class Notification(models.Model):
 
 class Comment(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
-    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='comments')
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='comments', db_index=False)  # comment_thread_idx
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, null=True, blank=True, related_name='comments')
     text = models.TextField()
     parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.CASCADE, related_name='replies')
@@ -236,6 +299,9 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['course', 'lesson', 'parent', 'created_at'], name='comment_thread_idx'),
+        ]
 
     def __str__(self):
         return f"Comment by {self.user.username} on {self.course.title}"
@@ -279,3 +345,126 @@ class LectureNote(models.Model):
 
     def __str__(self):
         return f"Note by {self.student.username} for {self.lesson.title}"
+
+
+class PlatformCounter(models.Model):
+    """
+    Running totals for the admin dashboard, kept by learning/signals.py and
+    reconcile_counters (see learning/counters.py). A counter is the sum of
+    its shard rows.
+    """
+    name = models.CharField(max_length=100)
+    shard = models.PositiveSmallIntegerField(default=0)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    objects = PlatformCounterManager()
+
+    class Meta:
+        unique_together = ("name", "shard")
+
+    def __str__(self):
+        return f"{self.name}[{self.shard}] = {self.value}"
+
+
+# ---- Analytics rollups (written by rollup_analytics, see learning/rollups.py) ----
+
+class DailyActivity(models.Model):
+    """Platform activity totals for one day."""
+    day = models.DateField(unique=True)
+    enrollments = models.PositiveIntegerField(default=0)
+    lesson_completions = models.PositiveIntegerField(default=0)
+    quiz_attempts = models.PositiveIntegerField(default=0)
+    quiz_passes = models.PositiveIntegerField(default=0)
+    # Sums and counts rather than averages, so any bucket can be averaged exactly
+    score_total = models.FloatField(default=0)
+    scored_attempts = models.PositiveIntegerField(default=0)
+    ratings = models.PositiveIntegerField(default=0)
+    rating_total = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Activity on {self.day}"
+
+
+class DailyNewUsers(models.Model):
+    """Registrations per role for one day."""
+    day = models.DateField()
+    role = models.ForeignKey(Role, on_delete=models.CASCADE)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("day", "role")
+
+
+class RollupWatermark(models.Model):
+    """First day the next rollup run recomputes; earlier days are final."""
+    name = models.CharField(max_length=50, unique=True)
+    day = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} from {self.day}"
+
+
+class BackgroundJob(models.Model):
+    """
+    A long bulk operation run outside the request by the run_jobs worker
+    (see learning/jobs.py). Clients poll it for progress and the result.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=50)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name='+'
+    )
+    params = models.JSONField(default=dict)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(null=True)
+    result = models.JSONField(null=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+    # Lease of the worker running it; a stale one means the worker died
+    heartbeat_at = models.DateTimeField(null=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class ArchiveSegment(models.Model):
+    """
+    Rows moved out of a hot table (failed quiz attempts, notifications) for
+    one user, stored as compressed JSON lines (see learning/archive.py).
+    """
+    KIND_CHOICES = [
+        ('attempts', 'Quiz attempts'),
+        ('notifications', 'Notifications'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # Indexed by archive_kind_user_idx
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+', db_index=False
+    )
+    first_at = models.DateTimeField()
+    last_at = models.DateTimeField()
+    row_count = models.PositiveIntegerField()
+    rows = CompressedTextField(threshold=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'user', 'last_at'], name='archive_kind_user_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} of user {self.user_id} ({self.row_count} rows)"
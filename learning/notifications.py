@@ -1,6 +1,8 @@
 """
 Utility functions for sending real-time notifications.
 """
+import asyncio
+
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 
@@ -19,7 +21,8 @@ def send_notification(user_id, notification_type, message, data=None):
         The created Notification object
     """
     from learning.models import Notification
-    
+    from learning.metrics import NOTIFICATIONS_SENT
+
     # Save notification to database
     notification = Notification.objects.create(
         user_id=user_id,
@@ -28,6 +31,8 @@ def send_notification(user_id, notification_type, message, data=None):
         data=data or {}
     )
     
+    NOTIFICATIONS_SENT.inc(type=notification_type)
+
     # Send to WebSocket channel
     channel_layer = get_channel_layer()
     group_name = f'notifications_{user_id}'
@@ -48,3 +53,60 @@ def send_notification(user_id, notification_type, message, data=None):
     )
     
     return notification
+
+
+# group_send calls awaited together per round trip to the channel layer
+FAN_OUT_BATCH = 500
+
+
+def _payload(notification):
+    return {
+        'type': 'send_notification',
+        'notification': {
+            'id': notification.id,
+            'notification_type': notification.notification_type,
+            'message': notification.message,
+            'data': notification.data,
+            'is_read': False,
+            'created_at': notification.created_at.isoformat(),
+        }
+    }
+
+
+async def _fan_out(channel_layer, notifications):
+    for start in range(0, len(notifications), FAN_OUT_BATCH):
+        batch = notifications[start:start + FAN_OUT_BATCH]
+        await asyncio.gather(*(
+            channel_layer.group_send(f'notifications_{notification.user_id}', _payload(notification))
+            for notification in batch
+        ))
+
+
+def send_bulk_notifications(user_ids, notification_type, message, data=None):
+    """
+    Send the same notification to many users: one bulk INSERT, then a single
+    event loop pass that pushes to every user's WebSocket group in batches.
+
+    Returns:
+        The created Notification objects
+    """
+    from learning.models import Notification
+    from learning.metrics import NOTIFICATIONS_SENT
+
+    if not user_ids:
+        return []
+    notifications = Notification.objects.bulk_create([
+        Notification(
+            user_id=user_id,
+            notification_type=notification_type,
+            message=message,
+            data=data or {},
+        )
+        for user_id in user_ids
+    ])
+
+    NOTIFICATIONS_SENT.inc(len(notifications), type=notification_type)
+
+    # PostgreSQL returns the new ids from the bulk INSERT, so no re-read is needed
+    async_to_sync(_fan_out)(get_channel_layer(), notifications)
+    return notifications
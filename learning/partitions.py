@@ -0,0 +1,312 @@
+"""
+Monthly range partitions for QuizAttempt on PostgreSQL (optional).
+
+QuizAttempt is the largest table and nearly every read filters it by time,
+student or quiz. With QUIZ_ATTEMPT_PARTITIONING on, the table is declared
+PARTITION BY RANGE (attempted_at) with one partition per calendar month
+(UTC), so:
+
+    - reads bounded in time (rollups, exports and analytics given start /
+      end) only scan the months they cover;
+    - archive_old_rows detaches whole months instead of deleting row by row
+      (see archive.py);
+    - each month's indexes stay small.
+
+convert() rebuilds the existing table as a partitioned one: migration 0020
+runs it when the setting is on, `manage.py quiz_attempt_partitions --convert`
+does it later. It copies every row under an exclusive lock, so plan a
+maintenance window on large tables; revert() goes back. PostgreSQL requires
+the partition key in the primary key, which becomes (id, attempted_at);
+Django keeps addressing rows by id, which the sequence keeps unique.
+
+A DEFAULT partition catches rows outside the monthly ones. When a month is
+archived, its passed attempts move to a "<month>_passed" partition covering
+the same range, so they keep being pruned by time and the DEFAULT one stays
+empty. create_ahead(), run daily from cron through `quiz_attempt_partitions`,
+keeps the coming months ready.
+"""
+import re
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from .models import QuizAttempt
+
+TABLE = QuizAttempt._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+# Months created past the current one
+DEFAULT_AHEAD = 3
+
+_MONTH_NAME = re.compile(rf"^{TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+def month_of(moment):
+    """First day of the (UTC) month of a date or aware datetime."""
+    if isinstance(moment, datetime):
+        moment = moment.astimezone(dt_timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+def next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def passed_partition_name(month):
+    """Partition keeping the passed attempts of an archived month."""
+    return f"{partition_name(month)}_passed"
+
+
+def bounds(month):
+    """[start, end) of the month's partition as aware UTC datetimes."""
+    return (
+        datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc),
+        datetime.combine(next_month(month), datetime.min.time(), tzinfo=dt_timezone.utc),
+    )
+
+
+def _literal(moment):
+    # Partition bounds are DDL and cannot be query parameters
+    return f"'{moment.isoformat()}'"
+
+
+def is_partitioned(using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT EXISTS (
+                SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid
+                WHERE c.relname = %s AND pg_table_is_visible(c.oid)
+            )
+            """,
+            [TABLE],
+        )
+        return cursor.fetchone()[0]
+
+
+def partitions(using=DEFAULT_DB_ALIAS):
+    """{month: partition name} of the attached monthly partitions."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            """,
+            [TABLE],
+        )
+        names = [name for name, in cursor.fetchall()]
+    result = {}
+    for name in names:
+        match = _MONTH_NAME.match(name)
+        if match:
+            result[date(int(match[1]), int(match[2]), 1)] = name
+    return dict(sorted(result.items()))
+
+
+def child_indexes(index_name, using=DEFAULT_DB_ALIAS):
+    """Names of the per-partition indexes of a partitioned index."""
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            JOIN pg_class p ON p.oid = i.inhparent
+            WHERE p.relname = %s AND pg_table_is_visible(p.oid)
+            """,
+            [index_name],
+        )
+        return [name for name, in cursor.fetchall()]
+
+
+def _flush_deferred_checks(using):
+    # PostgreSQL refuses to ALTER a table with deferred foreign key checks
+    # still pending from earlier writes in the same transaction
+    connections[using].check_constraints()
+
+
+def _create_partition(cursor, month, name=None):
+    quote = cursor.db.ops.quote_name
+    table, default, name = quote(TABLE), quote(DEFAULT_PARTITION), quote(name or partition_name(month))
+    start, end = bounds(month)
+    values = f"FOR VALUES FROM ({_literal(start)}) TO ({_literal(end)})"
+    cursor.execute(
+        f"SELECT EXISTS (SELECT 1 FROM {default} WHERE attempted_at >= %s AND attempted_at < %s)", [start, end]
+    )
+    if not cursor.fetchone()[0]:
+        cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} {values}")
+        return
+    # PostgreSQL refuses a partition overlapping rows of the DEFAULT one: move them over
+    cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {default}")
+    cursor.execute(f"CREATE TABLE {name} PARTITION OF {table} {values}")
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {default} WHERE attempted_at >= %s AND attempted_at < %s RETURNING *) "
+        f"INSERT INTO {table} SELECT * FROM moved",
+        [start, end],
+    )
+    cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT")
+
+
+def create_ahead(ahead=DEFAULT_AHEAD, today=None, using=DEFAULT_DB_ALIAS):
+    """
+    Create the partitions of the current month and the next `ahead` months.
+
+    Returns the names of the partitions created.
+    """
+    if not is_partitioned(using):
+        return []
+    existing = partitions(using)
+    month = month_of(today or datetime.now(dt_timezone.utc))
+    created = []
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        _flush_deferred_checks(using)
+        for _ in range(ahead + 1):
+            if month not in existing:
+                _create_partition(cursor, month)
+                created.append(partition_name(month))
+            month = next_month(month)
+    return created
+
+
+def detach_before(cutoff, using=DEFAULT_DB_ALIAS):
+    """
+    Detach every monthly partition that ends at or before cutoff, one short
+    transaction each, moving its passed attempts into a new partition for
+    the month (passed_partition_name). The detached tables then hold only
+    failed attempts, for the caller to archive and drop.
+
+    Returns the names of all detached month tables, including any left by
+    an interrupted earlier run.
+    """
+    quote = connections[using].ops.quote_name
+    table = quote(TABLE)
+    for month, name in partitions(using).items():
+        if bounds(month)[1] > cutoff:
+            continue
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            _flush_deferred_checks(using)
+            cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {quote(name)}")
+            _create_partition(cursor, month, passed_partition_name(month))
+            cursor.execute(
+                f"WITH kept AS (DELETE FROM {quote(name)} WHERE is_passed RETURNING *) "
+                f"INSERT INTO {table} SELECT * FROM kept"
+            )
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname FROM pg_class c
+            WHERE c.relkind = 'r' AND c.relname LIKE %s AND pg_table_is_visible(c.oid)
+              AND NOT EXISTS (SELECT 1 FROM pg_inherits i WHERE i.inhrelid = c.oid)
+            ORDER BY c.relname
+            """,
+            [f"{TABLE}_y%"],
+        )
+        return [name for name, in cursor.fetchall() if _MONTH_NAME.match(name)]
+
+
+def _rebuild(cursor, partitioned, ahead=DEFAULT_AHEAD):
+    """
+    Recreate the table (partitioned or plain) with the same columns,
+    indexes and foreign keys, and copy every row over.
+    """
+    quote = cursor.db.ops.quote_name
+    table, old = quote(TABLE), quote(f"{TABLE}_old")
+    _flush_deferred_checks(cursor.db.alias)
+    cursor.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE")
+
+    cursor.execute(
+        """
+        SELECT i.relname, pg_get_indexdef(i.oid) FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = %s::regclass AND NOT x.indisprimary
+        """,
+        [TABLE],
+    )
+    indexes = cursor.fetchall()
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype IN ('f', 'p')",
+        [TABLE],
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        "SELECT attidentity FROM pg_attribute WHERE attrelid = %s::regclass AND attname = 'id'", [TABLE]
+    )
+    identity = cursor.fetchone()[0]
+    cursor.execute("SELECT pg_get_serial_sequence(%s, 'id')", [TABLE])
+    sequence = cursor.fetchone()[0]
+
+    # Free the index and constraint names for the new table
+    for name, _ in indexes:
+        cursor.execute(f"DROP INDEX {quote(name)}")
+    for name, kind, _ in constraints:
+        if kind == "f":
+            cursor.execute(f"ALTER TABLE {table} DROP CONSTRAINT {quote(name)}")
+        else:
+            cursor.execute(f"ALTER TABLE {table} RENAME CONSTRAINT {quote(name)} TO {quote(name + '_old')}")
+    cursor.execute(f"ALTER TABLE {table} RENAME TO {old}")
+
+    partition_by = " PARTITION BY RANGE (attempted_at)" if partitioned else ""
+    cursor.execute(
+        f"CREATE TABLE {table} (LIKE {old} INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING STORAGE){partition_by}"
+    )
+    if not identity:
+        # A serial column's sequence belongs to the old table; keep it alive
+        cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id")
+    primary_key = "id, attempted_at" if partitioned else "id"
+    cursor.execute(f"ALTER TABLE {table} ADD PRIMARY KEY ({primary_key})")
+
+    if partitioned:
+        cursor.execute(f"SELECT MIN(attempted_at), MAX(attempted_at) FROM {old}")
+        first, last = cursor.fetchone()
+        now = datetime.now(dt_timezone.utc)
+        month, last_month = month_of(first or now), month_of(max(last or now, now))
+        for _ in range(ahead):
+            last_month = next_month(last_month)
+        while month <= last_month:
+            start, end = bounds(month)
+            cursor.execute(
+                f"CREATE TABLE {quote(partition_name(month))} PARTITION OF {table} "
+                f"FOR VALUES FROM ({_literal(start)}) TO ({_literal(end)})"
+            )
+            month = next_month(month)
+        cursor.execute(f"CREATE TABLE {quote(DEFAULT_PARTITION)} PARTITION OF {table} DEFAULT")
+
+    cursor.execute(f"INSERT INTO {table} SELECT * FROM {old}")
+    for _, definition in indexes:
+        # Definitions read from a partitioned table say ON ONLY, which would skip the partitions
+        cursor.execute(definition.replace(" ON ONLY ", " ON ", 1))
+    for name, kind, definition in constraints:
+        if kind == "f":
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {quote(name)} {definition}")
+    cursor.execute(f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1)) FROM {table}", [TABLE])
+    cursor.execute(f"DROP TABLE {old}")
+    cursor.execute(f"ANALYZE {table}")
+
+
+def convert(ahead=DEFAULT_AHEAD, using=DEFAULT_DB_ALIAS):
+    """
+    Turn the table into monthly partitions. Returns False if there was
+    nothing to do (not PostgreSQL, or already partitioned).
+    """
+    if connections[using].vendor != "postgresql" or is_partitioned(using):
+        return False
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        _rebuild(cursor, partitioned=True, ahead=ahead)
+    return True
+
+
+def revert(using=DEFAULT_DB_ALIAS):
+    """Turn a partitioned table back into a plain one (archived months stay archived)."""
+    if not is_partitioned(using):
+        return False
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        _rebuild(cursor, partitioned=False)
+    return True
@@ -0,0 +1,207 @@
+"""
+On-demand request profiling for admins.
+
+An admin adds "X-Profile: 1" (or ?_profile=1) to a request and it runs under
+cProfile; "X-Profile: sample" uses a low-overhead stack sampler instead and
+stores collapsed stacks (flamegraph.pl / speedscope format). Profiles and a
+JSON sidecar with request metadata are written to PROFILING["DIR"], listed at
+/api/admin-api/profiles/. Only one request per process is profiled at a time
+and at most MAX_PER_MINUTE per cache, so the overhead stays bounded.
+"""
+import cProfile
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULTS = {
+    "ENABLED": False,
+    "DIR": "request_profiles",
+    "MAX_PER_MINUTE": 6,
+    "MAX_FILES": 200,
+    "SAMPLE_INTERVAL_MS": 5,
+}
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+PROFILE_SKIPPED_HEADER = "X-Profile-Skipped"
+QUERY_FLAG = "_profile"
+MODES = {"1": "cprofile", "cprofile": "cprofile", "sample": "sample"}
+EXTENSIONS = {"cprofile": ".prof", "sample": ".collapsed"}
+
+# Profile ids are generated here; anything else is rejected
+PROFILE_ID = re.compile(r"^\d{8}T\d{6}_[0-9a-f]{8}$")
+
+# cProfile cannot nest, and one profile at a time bounds the cost
+profiling_lock = threading.Lock()
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "PROFILING", {})}
+
+
+def profile_dir(config=None):
+    return os.path.abspath(str((config or get_config())["DIR"]))
+
+
+def requested_mode(request):
+    flag = request.headers.get(PROFILE_HEADER) or request.GET.get(QUERY_FLAG)
+    return MODES.get(flag.strip().lower()) if flag else None
+
+
+def is_admin(request):
+    """
+    Session users come from AuthenticationMiddleware; API clients send a JWT
+    that DRF would only read inside the view, so authenticate it here.
+    """
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        from rest_framework_simplejwt.authentication import JWTAuthentication
+        try:
+            result = JWTAuthentication().authenticate(request)
+        except Exception:
+            return False
+        if result is None:
+            return False
+        user = result[0]
+    return user.is_active and user.role.name == "ADMIN"
+
+
+def take_slot(config):
+    """True if this minute's profiling budget is not used up yet."""
+    key = f"profiling:minute:{int(time.time() // 60)}"
+    cache.add(key, 0, 120)
+    try:
+        used = cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, 120)
+        used = 1
+    return used <= config["MAX_PER_MINUTE"]
+
+
+class StackSampler:
+    """
+    Samples one thread's stack every interval seconds from a daemon thread
+    and counts identical stacks (collapsed-stack format).
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-stack-sampler", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                location = os.sep.join(code.co_filename.split(os.sep)[-2:])
+                stack.append(f"{code.co_name} ({location}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+def run_profiled(mode, func, config):
+    """
+    Call func() under the requested profiler.
+
+    Returns:
+        (result, writer) where writer(path) saves the profile
+    """
+    if mode == "sample":
+        with StackSampler(threading.get_ident(), config["SAMPLE_INTERVAL_MS"] / 1000) as sampler:
+            result = func()
+
+        def write(path):
+            with open(path, "w") as handle:
+                handle.write(sampler.collapsed())
+        return result, write
+
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func)
+    return result, profiler.dump_stats
+
+
+def save_profile(mode, writer, meta, config):
+    """Write the profile and its metadata sidecar; returns the profile id."""
+    directory = profile_dir(config)
+    os.makedirs(directory, exist_ok=True)
+    now = datetime.now(dt_timezone.utc)
+    profile_id = f"{now:%Y%m%dT%H%M%S}_{uuid.uuid4().hex[:8]}"
+    filename = profile_id + EXTENSIONS[mode]
+
+    writer(os.path.join(directory, filename))
+    meta = {**meta, "id": profile_id, "file": filename, "mode": mode, "created_at": now.isoformat()}
+    with open(os.path.join(directory, profile_id + ".json"), "w") as handle:
+        json.dump(meta, handle)
+
+    _prune(directory, config["MAX_FILES"])
+    return profile_id
+
+
+def _prune(directory, keep):
+    sidecars = sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+    for name in sidecars[:max(0, len(sidecars) - keep)]:
+        profile_id = name[:-len(".json")]
+        for extension in (".json", *EXTENSIONS.values()):
+            try:
+                os.remove(os.path.join(directory, profile_id + extension))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(limit=100):
+    """Metadata of the newest profiles, newest first."""
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    sidecars = sorted((name for name in os.listdir(directory) if name.endswith(".json")), reverse=True)
+    profiles = []
+    for name in sidecars[:limit]:
+        try:
+            with open(os.path.join(directory, name)) as handle:
+                meta = json.load(handle)
+        except (OSError, ValueError):
+            continue
+        try:
+            meta["size"] = os.path.getsize(os.path.join(directory, meta["file"]))
+        except OSError:
+            continue
+        profiles.append(meta)
+    return profiles
+
+
+def profile_file(profile_id):
+    """Path of a stored profile, or None if the id is unknown or invalid."""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    directory = profile_dir()
+    for extension in EXTENSIONS.values():
+        path = os.path.join(directory, profile_id + extension)
+        if os.path.isfile(path):
+            return path
+    return None
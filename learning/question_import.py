@@ -0,0 +1,280 @@
+"""
+Bulk question import and batch edit for a quiz.
+
+Questions can be given as CSV, JSON, Aiken or (multiple-choice) GIFT text.
+Every parser produces the same rows: the question, up to four options and the
+answer as written in the source. All answers are then normalized to a letter
+in one pass over the column, every row is validated, and only if the whole
+set is valid are the rows written: one bulk_update for rows that carry the id
+of an existing question of the quiz and one bulk_create for the rest, inside a
+single transaction that also bumps Quiz.updated_at once.
+
+CSV columns: id (optional, to edit), question_text, option_a..option_d,
+correct_option. JSON: a list of objects with the same keys, or
+{"questions": [...]}. Answers may be a letter (A-D, also "b)", "option_c"),
+a position counted from 1, or the text of the right option.
+"""
+import csv
+import io
+import json
+import re
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Question, Quiz
+
+FORMATS = ("csv", "json", "aiken", "gift")
+LETTERS = ("A", "B", "C", "D")
+OPTION_FIELDS = ("option_a", "option_b", "option_c", "option_d")
+MAX_QUESTIONS = 2000
+
+# Every accepted spelling of an answer key -> letter
+_ANSWER_KEYS = {}
+for _position, _letter in enumerate(LETTERS, start=1):
+    for _key in (_letter, f"{_letter})", f"{_letter}.", f"OPTION_{_letter}", str(_position)):
+        _ANSWER_KEYS[_key] = _letter
+
+
+class ParseError(ValueError):
+    """The source could not be read at all (as opposed to an invalid row)."""
+
+
+def guess_format(filename):
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    return {"csv": "csv", "json": "json", "gift": "gift", "txt": "aiken", "aiken": "aiken"}.get(extension)
+
+
+def _row(line, question_text, options, answer, question_id=None, keyed=False):
+    # keyed: the format only allows an answer key, never an option's text
+    return {
+        "line": line,
+        "id": question_id,
+        "question_text": (question_text or "").strip(),
+        "options": [(option or "").strip() for option in options],
+        "answer": "" if answer is None else str(answer).strip(),
+        "keyed": keyed,
+    }
+
+
+def _from_mapping(line, item):
+    if not isinstance(item, dict):
+        return _row(line, "", [], "") | {"error": "Expected an object"}
+    return _row(
+        line,
+        item.get("question_text") or item.get("question"),
+        [item.get(field) for field in OPTION_FIELDS],
+        item.get("correct_option", item.get("answer")),
+        item.get("id") or None,
+    )
+
+
+def parse_csv(text):
+    reader = csv.DictReader(io.StringIO(text))
+    if reader.fieldnames:
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    return [_from_mapping(index + 2, row) for index, row in enumerate(reader)]
+
+
+def parse_json(data):
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            raise ParseError("Not valid JSON")
+    if isinstance(data, dict):
+        data = data.get("questions")
+    if not isinstance(data, list):
+        raise ParseError('Expected a list of questions or {"questions": [...]}')
+    return [_from_mapping(index + 1, item) for index, item in enumerate(data)]
+
+
+def _blocks(text):
+    """(first line number, lines) for each blank-line separated block."""
+    block, start = [], None
+    for number, line in enumerate(text.splitlines(), start=1):
+        if line.strip():
+            if not block:
+                start = number
+            block.append(line.strip())
+        elif block:
+            yield start, block
+            block = []
+    if block:
+        yield start, block
+
+
+_AIKEN_OPTION = re.compile(r"^([A-Za-z])[.)]\s+(.*)$")
+_AIKEN_ANSWER = re.compile(r"^ANSWER:\s*(.*)$", re.IGNORECASE)
+
+
+def parse_aiken(text):
+    """
+    Aiken: the question, one "A. text" / "A) text" line per option and a
+    closing "ANSWER: B" line, with questions separated by blank lines.
+    """
+    rows = []
+    for line, block in _blocks(text):
+        question, options, answer = [], [], None
+        for entry in block:
+            option = _AIKEN_OPTION.match(entry)
+            closing = _AIKEN_ANSWER.match(entry)
+            if closing:
+                answer = closing.group(1)
+            elif option and (options or question):
+                options.append(option.group(2))
+            elif not options:
+                question.append(entry)
+        row = _row(line, " ".join(question), options, answer, keyed=True)
+        if answer is None:
+            row["error"] = "Missing ANSWER: line"
+        rows.append(row)
+    return rows
+
+
+_GIFT_ESCAPES = {"\\" + char: char for char in "~=#{}:"}
+_GIFT_ANSWER = re.compile(r"(?<!\\)([=~])")
+
+
+def _gift_text(value):
+    value = re.sub(r"(?<!\\)#.*", "", value, flags=re.DOTALL)  # answer feedback
+    for escaped, char in _GIFT_ESCAPES.items():
+        value = value.replace(escaped, char)
+    return value.strip()
+
+
+def parse_gift(text):
+    """
+    Multiple-choice GIFT: "::title:: question { =right ~wrong ~wrong }".
+    Comments (//) and titles are ignored; other GIFT question types are
+    reported as errors.
+    """
+    lines = [line for line in text.splitlines() if not line.lstrip().startswith("//")]
+    rows = []
+    for line, block in _blocks("\n".join(lines)):
+        source = " ".join(block)
+        match = re.match(r"^(?:::.*?::)?(.*?)(?<!\\)\{(.*)(?<!\\)\}(.*)$", source, flags=re.DOTALL)
+        if not match:
+            rows.append(_row(line, source, [], "") | {"error": "Expected question { =right ~wrong }"})
+            continue
+        question = _gift_text(match.group(1) + " " + match.group(3))
+        parts = _GIFT_ANSWER.split(match.group(2))
+        options, answer = [], None
+        # split() with a capture group alternates marker, text
+        for marker, value in zip(parts[1::2], parts[2::2]):
+            if marker == "=":
+                answer = str(len(options) + 1)
+            options.append(_gift_text(value))
+        row = _row(line, question, options, answer, keyed=True)
+        if answer is None:
+            row["error"] = "Only multiple-choice questions with one =right answer are supported"
+        rows.append(row)
+    return rows
+
+
+def parse(source, fmt):
+    """Rows from text (or already decoded JSON data) in the given format."""
+    if fmt == "json":
+        return parse_json(source)
+    return {"csv": parse_csv, "aiken": parse_aiken, "gift": parse_gift}[fmt](source)
+
+
+def normalize_answers(rows):
+    """
+    Resolve every row's answer to a letter: a key lookup, then (except for
+    keyed formats) a match against the row's own option texts. An answer
+    that is the key of one option and the text of another, like "4" with
+    options 2, 3, 4, 5, is not guessed at. Unresolved answers become None.
+    """
+    for row in rows:
+        answer = row["answer"]
+        letter = _ANSWER_KEYS.get(answer.upper().replace(" ", "_"))
+        if answer and not row["keyed"]:
+            texts = [option.casefold() for option in row["options"]]
+            matched = LETTERS[texts.index(answer.casefold())] if answer.casefold() in texts else None
+            if letter and matched and letter != matched:
+                row["ambiguous"] = (letter, matched)
+                letter = None
+            else:
+                letter = letter or matched
+        row["correct_option"] = letter
+    return rows
+
+
+def validate(rows, existing_ids):
+    """{line: [messages]} for every invalid row (empty when all are valid)."""
+    errors = {}
+    seen_ids = set()
+    for row in rows:
+        problems = [row["error"]] if row.get("error") else []
+        options = row["options"]
+        if not row["question_text"]:
+            problems.append("question_text is required")
+        if len(options) > len(LETTERS):
+            problems.append(f"At most {len(LETTERS)} options")
+        if len(options) < 2 or not options[0] or not options[1]:
+            problems.append("option_a and option_b are required")
+        if row.get("ambiguous"):
+            key, text = row["ambiguous"]
+            problems.append(
+                f"correct_option {row['answer']!r} is ambiguous: the key of option {key} "
+                f"and the text of option {text}; give the letter"
+            )
+        elif row["correct_option"] is None:
+            problems.append(f"correct_option {row['answer']!r} is not one of the options")
+        elif LETTERS.index(row["correct_option"]) >= len(options) or not options[LETTERS.index(row["correct_option"])]:
+            problems.append(f"correct_option {row['correct_option']} points to an empty option")
+        if row["id"] is not None:
+            if row["id"] not in existing_ids:
+                problems.append(f"Question {row['id']} is not in this quiz")
+            elif row["id"] in seen_ids:
+                problems.append(f"Question {row['id']} appears twice")
+            seen_ids.add(row["id"])
+        if problems:
+            errors[row["line"]] = problems
+    return errors
+
+
+def _apply(question, row):
+    question.question_text = row["question_text"]
+    options = row["options"] + [""] * (len(OPTION_FIELDS) - len(row["options"]))
+    for field, option in zip(OPTION_FIELDS, options):
+        # Optional options are stored as NULL, like the single-question endpoint
+        setattr(question, field, option or (None if field in ("option_c", "option_d") else ""))
+    question.correct_option = row["correct_option"]
+    return question
+
+
+def import_questions(quiz, rows):
+    """
+    Validate rows and, if all are valid, write them in one transaction.
+
+    Returns:
+        ({"created", "updated"}, None) on success, or (None, errors) where
+        errors is a list of {"line", "errors"}
+    """
+    for row in rows:
+        if row["id"] is not None:
+            try:
+                row["id"] = int(row["id"])
+            except (TypeError, ValueError):
+                row["error"] = f"id must be an integer, not {row['id']!r}"
+                row["id"] = None
+    normalize_answers(rows)
+    ids = [row["id"] for row in rows if row["id"] is not None]
+    existing = Question.objects.in_bulk(ids) if ids else {}
+    existing = {pk: question for pk, question in existing.items() if question.quiz_id == quiz.id}
+
+    errors = validate(rows, existing)
+    if errors:
+        return None, [{"line": line, "errors": messages} for line, messages in sorted(errors.items())]
+
+    updates = [_apply(existing[row["id"]], row) for row in rows if row["id"] is not None]
+    creates = [_apply(Question(quiz=quiz), row) for row in rows if row["id"] is None]
+    with transaction.atomic():
+        if updates:
+            Question.objects.bulk_update(updates, ["question_text", *OPTION_FIELDS, "correct_option"])
+        Question.objects.bulk_create(creates)
+        # One version bump for the whole batch so cached quiz lists are revalidated
+        Quiz.objects.filter(pk=quiz.pk).update(updated_at=timezone.now())
+    return {"created": len(creates), "updated": len(updates)}, None
@@ -0,0 +1,175 @@
+"""
+Retiring courses: cascading soft-delete, restore and the batched purge.
+
+deactivate() hides a course together with its lessons and quizzes in a few
+bulk UPDATEs (questions are only reached through their quiz). The children
+get the course's updated_at as their own, which is how restore() later tells
+them apart from lessons and quizzes that had been deleted on their own.
+
+purge() removes an inactive course for good. Enrollments and attempts are
+PROTECTed, so a plain delete either fails or deletes the whole course in one
+long transaction. Instead every dependent table is emptied bottom-up in
+primary-key-ordered batches of BATCH_SIZE rows, each batch in its own short
+transaction and starting past the last key of the one before (so no batch
+rescans the rows already deleted), and the course row goes last. It runs as a background job
+(see learning/jobs.py); a purge interrupted part way can simply be re-run.
+"""
+from django.db import connection, transaction
+from django.db.models import Q
+
+from . import counters, jobs
+from .models import (
+    Comment, Course, CourseRating, Enrollment, LectureNote, Lesson, LessonProgress,
+    PlatformCounter, Question, Quiz, QuizAttempt, Wishlist,
+)
+from .structure import invalidate_course_structure
+from .trends import invalidate_instructor_trends
+
+BATCH_SIZE = 1000
+
+
+def _invalidate_structure(course_id):
+    invalidate_course_structure(course_id)
+    # Again after commit, so a concurrent reader cannot re-cache the old rows
+    transaction.on_commit(lambda: invalidate_course_structure(course_id))
+
+
+def deactivate(course):
+    """
+    Soft-delete course with its active lessons and quizzes.
+
+    Returns:
+        {"lessons", "quizzes"}: rows deactivated along with the course
+    """
+    with transaction.atomic():
+        course.is_active = False
+        course.save()  # signals move the course counters
+        stamp = course.updated_at
+        lessons = Lesson.all_objects.filter(course=course, is_active=True).update(is_active=False, updated_at=stamp)
+        quizzes = Quiz.all_objects.filter(course=course, is_active=True).update(is_active=False, updated_at=stamp)
+        # QuerySet.update() sends no signals
+        PlatformCounter.objects.add({"quizzes": -quizzes})
+        _invalidate_structure(course.id)
+    return {"lessons": lessons, "quizzes": quizzes}
+
+
+def restore(course):
+    """
+    Reactivate a soft-deleted course and the lessons and quizzes deactivate()
+    took down with it.
+
+    Returns:
+        {"lessons", "quizzes"}: rows reactivated along with the course
+    """
+    with transaction.atomic():
+        stamp = Course.all_objects.filter(pk=course.pk).values_list("updated_at", flat=True).get()
+        course.is_active = True
+        course.save()
+        lessons = Lesson.all_objects.filter(course=course, is_active=False, updated_at=stamp).update(
+            is_active=True, updated_at=course.updated_at
+        )
+        quizzes = Quiz.all_objects.filter(course=course, is_active=False, updated_at=stamp).update(
+            is_active=True, updated_at=course.updated_at
+        )
+        PlatformCounter.objects.add({"quizzes": quizzes})
+        _invalidate_structure(course.id)
+    return {"lessons": lessons, "quizzes": quizzes}
+
+
+def _dependents(course_id):
+    """
+    (label, model, rows of the course, batch order) in deletion order:
+    every table before the tables it references. A label may take several
+    steps, each simple enough for one foreign key index.
+    """
+    return [
+        ("lesson_progress", LessonProgress, Q(enrollment__course_id=course_id), "pk"),
+        # Progress of other courses' enrollments on this course's lessons
+        ("lesson_progress", LessonProgress, Q(lesson__course_id=course_id), "pk"),
+        ("lecture_notes", LectureNote, Q(lesson__course_id=course_id), "pk"),
+        # Newest first, so replies go before the comments they answer
+        ("comments", Comment, Q(course_id=course_id) | Q(lesson__course_id=course_id), "-pk"),
+        ("ratings", CourseRating, Q(course_id=course_id), "pk"),
+        ("wishlists", Wishlist, Q(course_id=course_id), "pk"),
+        ("attempts", QuizAttempt, Q(quiz__course_id=course_id), "pk"),
+        ("questions", Question, Q(quiz__course_id=course_id), "pk"),
+        ("quizzes", Quiz, Q(course_id=course_id), "pk"),
+        ("lessons", Lesson, Q(course_id=course_id), "pk"),
+        ("enrollments", Enrollment, Q(course_id=course_id), "pk"),
+    ]
+
+
+def _delete_batch(model, condition, order, batch_size, after=None):
+    """
+    Delete the first batch_size matching rows past the key after (in
+    order) in one short transaction, moving the platform counters for them
+    (raw deletes send no signals).
+
+    Returns (rows deleted, last key deleted).
+    """
+    tracked = counters.TRACKED.get(model.__name__, ((), None))[0]
+    candidates = model._base_manager.filter(condition)
+    if after is not None:
+        candidates = candidates.filter(pk__lt=after) if order.startswith("-") else candidates.filter(pk__gt=after)
+    with transaction.atomic():
+        rows = list(candidates.order_by(order).values("pk", *tracked)[:batch_size])
+        if not rows:
+            return 0, after
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {quote(model._meta.db_table)} "
+                f"WHERE {quote(model._meta.pk.column)} IN ({', '.join(['%s'] * len(rows))})",
+                [row["pk"] for row in rows],
+            )
+        if tracked:
+            PlatformCounter.objects.add(counters.removed(model.__name__, rows))
+    return len(rows), rows[-1]["pk"]
+
+
+def purge(course, batch_size=BATCH_SIZE, job=None):
+    """
+    Permanently delete an inactive course and everything that belongs to it.
+
+    Raises:
+        ValueError: the course is still active
+
+    Returns:
+        {"course_id", "deleted": {label: rows}}
+    """
+    if course.is_active:
+        raise ValueError("Deactivate the course before purging it")
+    steps = _dependents(course.id)
+    total = done = 0
+    if job:
+        # Steps of one label may overlap; count each row once
+        tables = {}
+        for label, model, condition, _ in steps:
+            tables[label] = (model, tables[label][1] | condition if label in tables else condition)
+        total = sum(model._base_manager.filter(condition).count() for model, condition in tables.values())
+        jobs.progress(job, 0, total)
+
+    deleted = {}
+    for label, model, condition, order in steps:
+        deleted.setdefault(label, 0)
+        last = None
+        while True:
+            count, last = _delete_batch(model, condition, order, batch_size, after=last)
+            if not count:
+                break
+            deleted[label] += count
+            done += count
+            if job:
+                jobs.progress(job, done)
+
+    # Nothing references the course any more, so this is a single-row delete
+    Course.all_objects.filter(pk=course.pk).delete()
+    _invalidate_structure(course.id)
+    if deleted["enrollments"]:
+        invalidate_instructor_trends(course.instructor_id)
+    return {"course_id": course.id, "deleted": deleted}
+
+
+def run_purge_job(job):
+    course = Course.all_objects.get(id=job.params["course_id"])
+    return purge(course, job=job)
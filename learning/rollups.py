@@ -0,0 +1,160 @@
+"""
+Daily analytics rollups.
+
+rollup_analytics (run it from cron, e.g. every 15 minutes) recomputes the
+DailyActivity and DailyNewUsers rows for every day from the watermark up to
+today with one grouped query per source table, then moves the watermark to
+today. Today stays open, so it is recomputed by the next run; earlier days
+are final. Events written later with an older timestamp (imports, bulk
+seeding) need `rollup_analytics --since <day>`. Days whose failed attempts
+have been archived (learning/archive.py) cannot be recomputed from the live
+tables, so --since refuses them.
+
+Trend endpoints read the rollups, so their cost depends on the number of
+days in the range, not on the number of events.
+"""
+from django.db import transaction
+from datetime import timedelta
+
+from django.db.models import Count, Max, Min, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import (
+    ArchiveSegment, CourseRating, DailyActivity, DailyNewUsers, Enrollment, LessonProgress,
+    QuizAttempt, RollupWatermark, User,
+)
+from .utils import timeseries
+
+WATERMARK = "daily_activity"
+
+
+def _per_day(queryset, field, start, end, *group_by, **aggregates):
+    """Aggregates of queryset grouped by local day of field, for days [start, end]."""
+    return (
+        queryset
+        .filter(**timeseries.day_range(field, start, end))
+        .annotate(rollup_day=TruncDate(field))
+        .values("rollup_day", *group_by)
+        .annotate(**aggregates)
+        .order_by()
+    )
+
+
+def first_event_day():
+    """Earliest day with any rolled-up event, or None on an empty database."""
+    firsts = [
+        User.objects.aggregate(first=Min("created_at"))["first"],
+        Enrollment.all_objects.aggregate(first=Min("enrolled_at"))["first"],
+        LessonProgress.all_objects.aggregate(first=Min("completed_at"))["first"],
+        QuizAttempt.objects.aggregate(first=Min("attempted_at"))["first"],
+        CourseRating.objects.aggregate(first=Min("created_at"))["first"],
+    ]
+    firsts = [timezone.localdate(moment) for moment in firsts if moment]
+    return min(firsts) if firsts else None
+
+
+def first_recomputable_day():
+    """First day whose attempts are all still live, or None if none were archived."""
+    last = ArchiveSegment.objects.filter(kind="attempts").aggregate(last=Max("last_at"))["last"]
+    return timezone.localdate(last) + timedelta(days=1) if last else None
+
+
+def compute(start, end):
+    """
+    Build (but do not save) the rollup rows for days [start, end].
+
+    Returns:
+        (DailyActivity list, DailyNewUsers list)
+    """
+    days = {}
+
+    def row(day):
+        if day not in days:
+            days[day] = DailyActivity(day=day)
+        return days[day]
+
+    for item in _per_day(Enrollment.all_objects, "enrolled_at", start, end, n=Count("id")):
+        row(item["rollup_day"]).enrollments = item["n"]
+
+    progress = LessonProgress.all_objects.filter(completed_at__isnull=False)
+    for item in _per_day(progress, "completed_at", start, end, n=Count("id")):
+        row(item["rollup_day"]).lesson_completions = item["n"]
+
+    attempts = _per_day(
+        QuizAttempt.objects, "attempted_at", start, end,
+        n=Count("id"),
+        passes=Count("id", filter=Q(is_passed=True)),
+        score_total=Coalesce(Sum("score"), 0.0),
+        scored=Count("score"),
+    )
+    for item in attempts:
+        day = row(item["rollup_day"])
+        day.quiz_attempts = item["n"]
+        day.quiz_passes = item["passes"]
+        day.score_total = item["score_total"]
+        day.scored_attempts = item["scored"]
+
+    ratings = _per_day(
+        CourseRating.objects, "created_at", start, end,
+        n=Count("id"), total=Coalesce(Sum("rating"), 0),
+    )
+    for item in ratings:
+        day = row(item["rollup_day"])
+        day.ratings = item["n"]
+        day.rating_total = item["total"]
+
+    new_users = [
+        DailyNewUsers(day=item["rollup_day"], role_id=item["role_id"], count=item["n"])
+        for item in _per_day(User.objects, "created_at", start, end, "role_id", n=Count("id"))
+    ]
+    return sorted(days.values(), key=lambda day: day.day), new_users
+
+
+def rollup(since=None, until=None):
+    """
+    Recompute days [since, until] and advance the watermark.
+
+    Args:
+        since: first day to recompute (default: the watermark, or the first
+            event day on the first run)
+        until: last day to recompute (default: today)
+
+    Returns:
+        (first day, last day, days with activity), or None if there is nothing to do
+
+    Raises:
+        ValueError: since is a day with archived attempts
+    """
+    floor = first_recomputable_day() if since else None
+    if floor and since < floor:
+        raise ValueError(
+            f"Attempts up to {floor - timedelta(days=1)} are archived; "
+            f"recomputing them would drop those from the rollups (use --since {floor} or later)"
+        )
+    today = timezone.localdate()
+    until = min(until or today, today)
+    with transaction.atomic():
+        # The lock serialises concurrent runs
+        watermark = RollupWatermark.objects.select_for_update().filter(name=WATERMARK).first()
+        start = since or (watermark.day if watermark else first_event_day())
+        if start is None or start > until:
+            return None
+
+        activity, new_users = compute(start, until)
+        DailyActivity.objects.filter(day__gte=start, day__lte=until).delete()
+        DailyNewUsers.objects.filter(day__gte=start, day__lte=until).delete()
+        DailyActivity.objects.bulk_create(activity)
+        DailyNewUsers.objects.bulk_create(new_users)
+
+        # Only move forward; a backfill of old days leaves the watermark alone
+        if watermark is None:
+            RollupWatermark.objects.create(name=WATERMARK, day=until)
+        elif until > watermark.day:
+            watermark.day = until
+            watermark.save(update_fields=["day", "updated_at"])
+    return start, until, len(activity)
+
+
+def watermark_day():
+    return RollupWatermark.objects.filter(name=WATERMARK).values_list("day", flat=True).first()
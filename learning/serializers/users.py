@@ -1,4 +1,4 @@
-from django.db import models as django_models
+from django.db.models import Avg, Count, OuterRef, Q, Subquery, Sum
 from rest_framework import serializers
 
 from ..models import User, Enrollment, QuizAttempt, Course, Lesson, LessonProgress, CourseRating
@@ -24,6 +24,10 @@ class UserSerializer(serializers.ModelSerializer):
 class AdminUserDetailSerializer(UserSerializer):
     """
     Serializer for Admins to view full user details (Progress, Enrollments).
+
+    Everything is loaded up front by a fixed set of grouped queries (at most
+    4, plus 3 for an instructor), however many enrollments or courses the
+    user has. Pass the user with its role selected.
     """
     enrollments = serializers.SerializerMethodField()
     stats = serializers.SerializerMethodField()
@@ -33,58 +37,115 @@ class AdminUserDetailSerializer(UserSerializer):
         fields = UserSerializer.Meta.fields + ('enrollments', 'stats', 'created_courses')
         read_only_fields = fields
 
+    def to_representation(self, obj):
+        self._details = self._load(obj)
+        return super().to_representation(obj)
+
+    def _load(self, obj):
+        is_instructor = getattr(obj.role, "name", "") == "INSTRUCTOR"
+
+        # 1. Enrollments, each with its course's latest attempt by this student
+        latest = QuizAttempt.objects.filter(
+            student_id=OuterRef("student_id"), quiz__course_id=OuterRef("course_id")
+        ).order_by("-attempted_at", "-id")
+        enrollments = list(
+            Enrollment.objects.filter(student=obj)
+            .select_related("course")
+            .annotate(
+                last_score=Subquery(latest.values("score")[:1]),
+                last_passed=Subquery(latest.values("is_passed")[:1]),
+            )
+        )
+        course_ids = [env.course_id for env in enrollments]
+
+        # 2-3. Lesson totals per course and completed lessons per enrollment
+        total_lessons = dict(
+            Lesson.objects.filter(course_id__in=course_ids)
+            .values("course_id").annotate(n=Count("id")).values_list("course_id", "n")
+        ) if course_ids else {}
+        completed = dict(
+            LessonProgress.objects.filter(enrollment__in=enrollments, completed_at__isnull=False)
+            .values("enrollment_id").annotate(n=Count("id")).values_list("enrollment_id", "n")
+        ) if enrollments else {}
+
+        # 4. Attempt totals
+        attempts = QuizAttempt.objects.filter(student=obj).aggregate(
+            passed=Count("id", filter=Q(is_passed=True)), avg=Avg("score"),
+        )
+
+        details = {
+            "enrollments": enrollments,
+            "total_lessons": total_lessons,
+            "completed": completed,
+            "attempts": attempts,
+            "courses": None,
+        }
+        if is_instructor:
+            # 5-7. Courses, then students and ratings per course
+            courses = list(Course.objects.filter(instructor=obj).order_by('-created_at'))
+            students = dict(
+                Enrollment.objects.filter(course__in=courses)
+                .values("course_id").annotate(n=Count("id")).values_list("course_id", "n")
+            ) if courses else {}
+            ratings = {
+                row["course_id"]: row
+                for row in CourseRating.objects.filter(course__in=courses)
+                .values("course_id").annotate(n=Count("id"), total=Sum("rating"))
+            } if courses else {}
+            details.update(courses=courses, students=students, ratings=ratings)
+        return details
+
     def get_stats(self, obj):
+        details = self._details
         stats = {
-            "total_courses": Enrollment.objects.filter(student=obj).count(),
-            "quizzes_passed": QuizAttempt.objects.filter(student=obj, is_passed=True).count(),
-            "avg_quiz_score": QuizAttempt.objects.filter(student=obj).aggregate(avg=django_models.Avg('score'))['avg'] or 0
+            "total_courses": len(details["enrollments"]),
+            "quizzes_passed": details["attempts"]["passed"],
+            "avg_quiz_score": details["attempts"]["avg"] or 0
         }
 
         # Instructor Specific Stats
-        if getattr(obj.role, "name", "") == "INSTRUCTOR":
-            instructor_courses = Course.objects.filter(instructor=obj)
-            stats["instructor_courses_count"] = instructor_courses.count()
-            stats["instructor_total_students"] = Enrollment.objects.filter(course__in=instructor_courses).count()
-            stats["instructor_avg_rating"] = CourseRating.objects.filter(course__in=instructor_courses).aggregate(avg=django_models.Avg('rating'))['avg'] or 0
+        if details["courses"] is not None:
+            rating_count = sum(row["n"] for row in details["ratings"].values())
+            rating_total = sum(row["total"] for row in details["ratings"].values())
+            stats["instructor_courses_count"] = len(details["courses"])
+            stats["instructor_total_students"] = sum(details["students"].values())
+            stats["instructor_avg_rating"] = rating_total / rating_count if rating_count else 0
 
         return stats
 
     def get_created_courses(self, obj):
-        if getattr(obj.role, "name", "") != "INSTRUCTOR":
+        details = self._details
+        if details["courses"] is None:
             return None
-        
-        courses = Course.objects.filter(instructor=obj).order_by('-created_at')
+
         data = []
-        for c in courses:
-            students = Enrollment.objects.filter(course=c).count()
-            avg_rating = CourseRating.objects.filter(course=c).aggregate(avg=django_models.Avg('rating'))['avg'] or 0
-            
+        for c in details["courses"]:
+            rating = details["ratings"].get(c.id)
+            avg_rating = rating["total"] / rating["n"] if rating else 0
+
             data.append({
                 "id": c.id,
                 "title": c.title,
                 "is_published": c.is_published,
                 "is_active": c.is_active,
                 "created_at": c.created_at,
-                "total_students": students,
+                "total_students": details["students"].get(c.id, 0),
                 "average_rating": round(avg_rating, 1)
             })
         return data
 
     def get_enrollments(self, obj):
+        details = self._details
         data = []
-        enrollments = Enrollment.objects.filter(student=obj).select_related('course')
-        
-        for env in enrollments:
-            total_lessons = Lesson.objects.filter(course=env.course).count()
-            completed = LessonProgress.objects.filter(enrollment=env, completed_at__isnull=False).count()
-            
+        for env in details["enrollments"]:
+            total_lessons = details["total_lessons"].get(env.course_id, 0)
+            completed = details["completed"].get(env.id, 0)
+
             progress = (completed / total_lessons * 100) if total_lessons > 0 else 0
-            
-            # Get last quiz attempt for this course
-            last_attempt = QuizAttempt.objects.filter(quiz__course=env.course, student=obj).order_by('-attempted_at').first()
+
             quiz_status = "Not Attempted"
-            if last_attempt:
-                quiz_status = f"{last_attempt.score}% ({'Passed' if last_attempt.is_passed else 'Failed'})"
+            if env.last_passed is not None:
+                quiz_status = f"{env.last_score}% ({'Passed' if env.last_passed else 'Failed'})"
 
             data.append({
                 "id": env.id,
@@ -0,0 +1,95 @@
+"""
+Model signal handlers for the learning application.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import counters
+from .models import Course, Enrollment, Lesson, PlatformCounter, Quiz, QuizAttempt, User
+from .structure import invalidate_course_structure
+from .trends import invalidate_instructor_trends
+
+
+@receiver([post_save, post_delete], sender=Lesson)
+@receiver([post_save, post_delete], sender=Quiz)
+def invalidate_structure_on_change(sender, instance, **kwargs):
+    """Lesson create/reorder/soft-delete and quiz changes alter the course structure."""
+    course_id = instance.course_id
+    invalidate_course_structure(course_id)
+    # Invalidate again after commit so a concurrent reader cannot re-cache old rows
+    transaction.on_commit(lambda: invalidate_course_structure(course_id))
+
+
+def _invalidate_course_trends(course_id):
+    instructor_id = Course.all_objects.filter(pk=course_id).values_list("instructor_id", flat=True).first()
+    if instructor_id:
+        invalidate_instructor_trends(instructor_id)
+
+
+@receiver(post_save, sender=Enrollment)
+def invalidate_trends_on_enrollment(sender, instance, **kwargs):
+    """
+    New enrollments and status changes alter the instructor's trend series;
+    other saves leave it alone. The status before the save is the one
+    remember_counted_state read, so this must stay connected before
+    count_on_save, which clears it.
+    """
+    before = getattr(instance, "_counted_before", None)
+    if before is None or before == _counted(sender, _tracked_values(sender, instance)):
+        return
+    course_id = instance.course_id
+    transaction.on_commit(lambda: _invalidate_course_trends(course_id))
+
+
+def _counted(sender, values):
+    return counters.memberships(sender.__name__, values)
+
+
+def _tracked_values(sender, instance):
+    return {field: getattr(instance, field) for field in counters.TRACKED[sender.__name__][0]}
+
+
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=Course)
+@receiver(pre_save, sender=Enrollment)
+@receiver(pre_save, sender=Quiz)
+@receiver(pre_save, sender=QuizAttempt)
+def remember_counted_state(sender, instance, using, update_fields=None, **kwargs):
+    """Record which platform counters the row is in before it is saved."""
+    fields = counters.TRACKED[sender.__name__][0]
+    if instance._state.adding:
+        instance._counted_before = set()
+    elif update_fields is not None and not set(update_fields) & {*fields, *(f.removesuffix("_id") for f in fields)}:
+        # e.g. last_login updates cannot move the row between counters
+        instance._counted_before = None
+    else:
+        row = sender._base_manager.using(using).filter(pk=instance.pk).values(*fields).first()
+        instance._counted_before = _counted(sender, row) if row else set()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Enrollment)
+@receiver(post_save, sender=Quiz)
+@receiver(post_save, sender=QuizAttempt)
+def count_on_save(sender, instance, using, **kwargs):
+    """Move the row between platform counters in the saving transaction."""
+    before = getattr(instance, "_counted_before", None)
+    if before is None:
+        return
+    after = _counted(sender, _tracked_values(sender, instance))
+    deltas = {name: 1 for name in after - before}
+    deltas.update({name: -1 for name in before - after})
+    PlatformCounter.objects.db_manager(using).add(deltas)
+    instance._counted_before = None
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Course)
+@receiver(post_delete, sender=Enrollment)
+@receiver(post_delete, sender=Quiz)
+@receiver(post_delete, sender=QuizAttempt)
+def count_on_delete(sender, instance, using, **kwargs):
+    deltas = {name: -1 for name in _counted(sender, _tracked_values(sender, instance))}
+    PlatformCounter.objects.db_manager(using).add(deltas)
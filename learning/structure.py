@@ -0,0 +1,139 @@
+"""
+Cached course structure used for lesson/quiz progression checks.
+
+The structure is rebuilt from two small queries and cached under a per-course
+version key. Lesson and Quiz saves/deletes bump the version (see signals.py);
+code that changes lessons with QuerySet.update() or bulk_create() must call
+invalidate_course_structure() itself.
+
+A version bump only reaches other workers through a shared cache
+(REDIS_CACHE_URL). With the process-local default cache, entries expire after
+LOCAL_CACHE_TIMEOUT instead, so other processes see an edit within seconds.
+"""
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional, Tuple
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+CACHE_TIMEOUT = 60 * 60
+# Used when the cache is local to the process and misses other workers' bumps
+LOCAL_CACHE_TIMEOUT = 5
+
+_VERSION_KEY = "course_structure:version:{course_id}"
+_STRUCTURE_KEY = "course_structure:{course_id}:v{version}"
+
+
+@dataclass(frozen=True)
+class CourseStructure:
+    """
+    Immutable snapshot of a course's active lessons (in order) and quizzes.
+    """
+    course_id: int
+    lesson_ids: Tuple[int, ...]
+    order_index: Mapping[int, int]  # lesson_order -> lesson id
+    final_lesson_id: Optional[int]
+    quiz_ids: Tuple[int, ...]
+    _positions: Mapping[int, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        positions = {lesson_id: i for i, lesson_id in enumerate(self.lesson_ids)}
+        object.__setattr__(self, "_positions", MappingProxyType(positions))
+
+    @classmethod
+    def from_rows(cls, course_id, lesson_rows, quiz_ids):
+        """
+        Build a structure from (lesson_id, lesson_order) rows sorted by order.
+        """
+        lesson_ids = tuple(lesson_id for lesson_id, _ in lesson_rows)
+        order_index = MappingProxyType({order: lesson_id for lesson_id, order in lesson_rows})
+        return cls(
+            course_id=course_id,
+            lesson_ids=lesson_ids,
+            order_index=order_index,
+            final_lesson_id=lesson_ids[-1] if lesson_ids else None,
+            quiz_ids=tuple(quiz_ids),
+        )
+
+    def __contains__(self, lesson_id):
+        return lesson_id in self._positions
+
+    def previous_lesson_id(self, lesson_id):
+        """Id of the lesson before lesson_id, or None for the first lesson."""
+        position = self._positions.get(lesson_id)
+        if not position:
+            return None
+        return self.lesson_ids[position - 1]
+
+    def is_final(self, lesson_id):
+        return lesson_id == self.final_lesson_id
+
+    def locked_lesson_ids(self, completed_ids: Iterable[int]):
+        """
+        Lessons a student cannot open yet: everything after the first
+        lesson they have not completed.
+        """
+        completed = set(completed_ids)
+        for i, lesson_id in enumerate(self.lesson_ids):
+            if lesson_id not in completed:
+                return frozenset(self.lesson_ids[i + 1:])
+        return frozenset()
+
+
+def _current_version(course_id):
+    key = _VERSION_KEY.format(course_id=course_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed with a timestamp so an evicted counter never reuses an old key
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def cache_timeout():
+    """CACHE_TIMEOUT on a shared cache, LOCAL_CACHE_TIMEOUT on a per-process one."""
+    if isinstance(caches["default"], LocMemCache):
+        return LOCAL_CACHE_TIMEOUT
+    return CACHE_TIMEOUT
+
+
+def get_course_structure(course_id, lesson_id=None):
+    """
+    Return the cached CourseStructure for a course, building it on a miss.
+
+    lesson_id: an active lesson of the course the caller is about to check.
+    A cached structure without it predates its creation (the version bump
+    has not reached this cache yet), so it counts as a miss.
+    """
+    from .models import Lesson, Quiz
+
+    key = _STRUCTURE_KEY.format(course_id=course_id, version=_current_version(course_id))
+    payload = cache.get(key)
+    if payload is None or (lesson_id is not None and all(row[0] != lesson_id for row in payload[0])):
+        lesson_rows = tuple(
+            Lesson.objects
+            .filter(course_id=course_id)
+            .order_by("lesson_order", "id")
+            .values_list("id", "lesson_order")
+        )
+        quiz_ids = tuple(
+            Quiz.objects.filter(course_id=course_id).order_by("id").values_list("id", flat=True)
+        )
+        payload = (lesson_rows, quiz_ids)
+        cache.set(key, payload, cache_timeout())
+
+    lesson_rows, quiz_ids = payload
+    return CourseStructure.from_rows(course_id, lesson_rows, quiz_ids)
+
+
+def invalidate_course_structure(course_id):
+    """Bump the course's structure version so the next read rebuilds it."""
+    key = _VERSION_KEY.format(course_id=course_id)
+    cache.add(key, int(time.time() * 1000), None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr(); a fresh seed is just as good
+        cache.set(key, int(time.time() * 1000), None)
@@ -0,0 +1,203 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from learning.auth_tokens import blacklist_user_tokens
+from learning.models import Course, CourseRating, Enrollment, Lesson, LessonProgress, Quiz, QuizAttempt, Role, User
+
+
+class AdminUserListTest(APITestCase):
+    url = "/api/admin-api/users/"
+
+    def setUp(self):
+        cache.clear()
+        admin_role, _ = Role.objects.get_or_create(name="ADMIN")
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.admin = User.objects.create_user("boss", "boss@example.com", "password123", role=admin_role)
+        for i in range(7):
+            User.objects.create_user(f"Student{i}", f"learner{i}@example.com", "password123", role=student_role)
+        User.objects.filter(username="Student3").update(is_active=False)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def test_keyset_pages_cover_everyone_once(self):
+        seen, after = [], None
+        while True:
+            response = self.client.get(self.url, {"limit": 3, **({"after": after} if after else {})})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [row["id"] for row in response.data["results"]]
+            after = response.data["next_cursor"]
+            if after is None:
+                break
+        self.assertEqual(seen, sorted(User.objects.values_list("id", flat=True), reverse=True))
+
+    def test_page_is_one_projected_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"limit": 2})
+        self.assertEqual(set(response.data["results"][0]), {"id", "username", "email", "role", "is_active"})
+        self.assertNotIn("count", response.data)
+
+    def test_prefix_search_is_case_insensitive(self):
+        response = self.client.get(self.url, {"q": "student1"})
+        self.assertEqual([row["username"] for row in response.data["results"]], ["Student1"])
+        response = self.client.get(self.url, {"q": "LEARNER", "status": "INACTIVE", "count": "approx"})
+        self.assertEqual([row["username"] for row in response.data["results"]], ["Student3"])
+        # Planner estimates need PostgreSQL; elsewhere this is an exact count
+        self.assertEqual(response.data["count"], 1)
+
+    def test_counts(self):
+        response = self.client.get(self.url, {"role": "STUDENT", "count": "approx"})
+        self.assertEqual((response.data["count"], response.data["count_source"]), (7, "counter"))
+        response = self.client.get(self.url, {"count": "exact"})
+        self.assertEqual((response.data["count"], response.data["count_source"]), (8, "exact"))
+        self.assertEqual(self.client.get(self.url, {"count": "maybe"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"after": "x"}).status_code, 400)
+
+
+class AdminUserDetailTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        admin_role, _ = Role.objects.get_or_create(name="ADMIN")
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        self.student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.admin = User.objects.create_user("boss", "boss@example.com", "password123", role=admin_role)
+        self.instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.student = User.objects.create_user("learner", "learner@example.com", "password123", role=self.student_role)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def add_courses(self, count):
+        for i in range(count):
+            course = Course.objects.create(instructor=self.instructor, title=f"Course {i}", is_published=True)
+            lessons = [Lesson.objects.create(course=course, title=f"L{n}", lesson_order=n + 1) for n in range(2)]
+            quiz = Quiz.objects.create(course=course)
+            enrollment = Enrollment.objects.create(student=self.student, course=course)
+            LessonProgress.objects.create(enrollment=enrollment, lesson=lessons[0], completed_at=course.created_at)
+            QuizAttempt.objects.create(student=self.student, quiz=quiz, score=40, is_passed=False)
+            QuizAttempt.objects.create(student=self.student, quiz=quiz, score=90, is_passed=True)
+            CourseRating.objects.create(student=self.student, course=course, rating=4)
+
+    def detail(self, user, queries):
+        # user lookup + the serializer's fixed set
+        with self.assertNumQueries(queries):
+            response = self.client.get("/api/profile/", {"user_id": user.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_query_count_does_not_grow_with_enrollments(self):
+        self.add_courses(1)
+        self.detail(self.student, 5)
+        self.add_courses(4)
+        data = self.detail(self.student, 5)
+
+        self.assertEqual(data["stats"]["total_courses"], 5)
+        self.assertEqual(data["stats"]["quizzes_passed"], 5)
+        self.assertEqual(data["stats"]["avg_quiz_score"], 65)
+        enrollment = data["enrollments"][0]
+        self.assertEqual((enrollment["completed_lessons"], enrollment["total_lessons"]), (1, 2))
+        self.assertEqual(enrollment["progress_percent"], 50)
+        self.assertEqual(enrollment["quiz_status"], "90.0% (Passed)")
+        self.assertIsNone(data["created_courses"])
+
+    def test_query_count_does_not_grow_with_courses(self):
+        # The instructor has no enrollments of their own, so progress queries are skipped
+        self.add_courses(1)
+        self.detail(self.instructor, 6)
+        self.add_courses(4)
+        data = self.detail(self.instructor, 6)
+
+        self.assertEqual(data["stats"]["instructor_courses_count"], 5)
+        self.assertEqual(data["stats"]["instructor_total_students"], 5)
+        self.assertEqual(data["stats"]["instructor_avg_rating"], 4)
+        self.assertEqual(data["created_courses"][0]["total_students"], 1)
+        self.assertEqual(data["created_courses"][0]["average_rating"], 4.0)
+
+
+class AdminBulkUserStatusTest(APITestCase):
+    url = "/api/admin-api/users/bulk-status/"
+
+    def setUp(self):
+        cache.clear()
+        admin_role, _ = Role.objects.get_or_create(name="ADMIN")
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.admin = User.objects.create_user("boss", "boss@example.com", "password123", role=admin_role)
+        self.other_admin = User.objects.create_user("boss2", "boss2@example.com", "password123", role=admin_role)
+        self.instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.students = [
+            User.objects.create_user(f"student{i}", f"student{i}@example.com", "password123", role=student_role)
+            for i in range(4)
+        ]
+        course = Course.objects.create(title="Python", description="d", instructor=self.instructor)
+        for student in self.students[:2]:
+            Enrollment.objects.create(student=student, course=course)
+        self.course = course
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def test_deactivates_by_ids_and_never_admins(self):
+        ids = [self.other_admin.id, self.students[0].id, self.students[1].id]
+        response = self.client.post(self.url, {"action": "deactivate", "ids": ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {key: response.data[key] for key in ("matched", "skipped_admins", "updated", "unchanged")},
+            {"matched": 3, "skipped_admins": 1, "updated": 2, "unchanged": 0},
+        )
+        self.assertTrue(User.objects.get(id=self.other_admin.id).is_active)
+        self.assertEqual(set(User.objects.filter(is_active=False).values_list("id", flat=True)), set(ids[1:]))
+
+    def test_filters_combine(self):
+        response = self.client.post(
+            self.url, {"action": "deactivate", "course": self.course.id, "role": "STUDENT"}, format="json"
+        )
+        self.assertEqual(response.data["updated"], 2)
+        response = self.client.post(self.url, {"action": "activate", "role": "STUDENT"}, format="json")
+        self.assertEqual((response.data["updated"], response.data["unchanged"]), (2, 2))
+        self.assertFalse(User.objects.filter(is_active=False).exists())
+
+    def test_inactive_since_follows_issued_tokens(self):
+        long_ago = timezone.now() - timedelta(days=90)
+        User.objects.filter(id__in=[s.id for s in self.students]).update(created_at=long_ago)
+        # last_login is never written (password login only), so it must not decide
+        User.objects.filter(id__in=[s.id for s in self.students]).update(last_login=None)
+        # Student 0 refreshed lately; student 1 last signed in long ago
+        RefreshToken.for_user(self.students[0])
+        RefreshToken.for_user(self.students[1])
+        OutstandingToken.objects.filter(user=self.students[1]).update(created_at=long_ago)
+        since = (timezone.localdate() - timedelta(days=30)).isoformat()
+        response = self.client.post(self.url, {"action": "deactivate", "inactive_since": since}, format="json")
+        # students 1-3; staff created just now are recent
+        self.assertEqual(response.data["updated"], 3)
+        self.assertTrue(User.objects.get(id=self.students[0].id).is_active)
+        self.assertFalse(User.objects.get(id=self.students[1].id).is_active)
+
+    def test_deactivation_blacklists_refresh_tokens(self):
+        target, bystander = self.students[0], self.students[1]
+        for user in (target, target, bystander):
+            RefreshToken.for_user(user)
+        response = self.client.post(self.url, {"action": "deactivate", "ids": [target.id]}, format="json")
+        self.assertEqual(response.data["tokens_blacklisted"], 2)
+        self.assertEqual(BlacklistedToken.objects.filter(token__user=target).count(), 2)
+        self.assertFalse(BlacklistedToken.objects.filter(token__user=bystander).exists())
+        # Already blacklisted tokens are not counted again
+        self.assertEqual(blacklist_user_tokens([target.id], batch_size=1), 0)
+
+    def test_batches_cover_every_token(self):
+        for _ in range(5):
+            RefreshToken.for_user(self.students[2])
+        self.assertEqual(blacklist_user_tokens([self.students[2].id], batch_size=2), 5)
+
+    def test_rejects_bad_requests(self):
+        self.assertEqual(self.client.post(self.url, {"action": "delete", "ids": [1]}, format="json").status_code, 400)
+        # No target at all must not mean "everyone"
+        self.assertEqual(self.client.post(self.url, {"action": "deactivate"}, format="json").status_code, 400)
+        self.assertEqual(self.client.post(self.url, {"action": "deactivate", "ids": "1,2"}, format="json").status_code, 400)
+        self.assertEqual(
+            self.client.post(self.url, {"action": "deactivate", "inactive_since": "soon"}, format="json").status_code, 400
+        )
+        self.assertFalse(User.objects.filter(is_active=False).exists())
@@ -0,0 +1,119 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
+
+from learning import archive, counters, rollups
+from learning.admin_views import ExportStudentResultsView
+from learning.models import (
+    ArchiveSegment, Course, DailyActivity, Notification, Quiz, QuizAttempt, Role, User,
+)
+
+
+class ArchiveTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        admin_role, _ = Role.objects.get_or_create(name="ADMIN")
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.admin = User.objects.create_user("boss", "boss@example.com", "password123", role=admin_role)
+        instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.student = User.objects.create_user("learner", "learner@example.com", "password123", role=student_role)
+        self.course = Course.objects.create(title="Python", instructor=instructor, is_published=True)
+        self.quiz = Quiz.objects.create(course=self.course)
+        now = timezone.now()
+        for days, score, passed in [(500, 20, False), (450, 30, False), (420, 90, True), (10, 40, False)]:
+            QuizAttempt.objects.create(
+                student=self.student, quiz=self.quiz, score=score, is_passed=passed,
+                attempted_at=now - timedelta(days=days),
+            )
+        for days in (500, 5):
+            notification = Notification.objects.create(
+                user=self.student, notification_type="QUIZ_GRADED", message=f"{days} days ago", data={"days": days}
+            )
+            Notification.objects.filter(pk=notification.pk).update(created_at=now - timedelta(days=days))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.student)
+
+    def archive_all(self):
+        out = StringIO()
+        call_command("archive_old_rows", "--batch-size", "1", stdout=out)
+        return out.getvalue()
+
+    def test_attempts_wait_for_the_rollups(self):
+        self.assertIn("attempts       skipped", self.archive_all())
+        self.assertEqual(QuizAttempt.objects.count(), 4)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_failed_attempts_move_to_the_archive(self):
+        rollups.rollup()
+        self.archive_all()
+        # Passed and recent attempts stay in the hot table
+        self.assertEqual(sorted(QuizAttempt.objects.values_list("score", flat=True)), [40, 90])
+        self.assertEqual(ArchiveSegment.objects.filter(kind="attempts").count(), 2)
+        stored, _ = counters.read()
+        exact, _ = counters.read("exact")
+        self.assertEqual(stored["attempts"], exact["attempts"])
+
+        url = f"/api/quizzes/{self.quiz.id}/results/"
+        self.assertEqual([a["score"] for a in self.client.get(url).data], [40, 90])
+        response = self.client.get(url, {"include_archived": "true"})
+        self.assertEqual([a["score"] for a in response.data], [40, 90, 30, 20])
+        self.assertEqual(response.data[-1]["quiz_title"], "Python")
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get("/api/admin-api/export-results/", {"format": "excel", "include_archived": "1"})
+        self.assertEqual(response.content.decode().count("learner"), 4)
+
+    def test_rollups_refuse_to_recompute_archived_days(self):
+        rollups.rollup()
+        self.archive_all()
+        oldest = timezone.localdate(timezone.now() - timedelta(days=500))
+        floor = rollups.first_recomputable_day()
+        self.assertEqual(floor, timezone.localdate(timezone.now() - timedelta(days=450)) + timedelta(days=1))
+
+        with self.assertRaisesMessage(CommandError, "are archived"):
+            call_command("rollup_analytics", "--since", str(oldest), stdout=StringIO())
+        self.assertEqual(DailyActivity.objects.get(day=oldest).quiz_attempts, 1)
+        call_command("rollup_analytics", "--since", str(floor), stdout=StringIO())
+
+    def test_export_reads_archived_attempts_per_student_and_window(self):
+        other = User.objects.create_user("other", "other@example.com", "password123", role=self.student.role)
+        QuizAttempt.objects.create(
+            student=other, quiz=self.quiz, score=10, is_passed=False,
+            attempted_at=timezone.now() - timedelta(days=480),
+        )
+        rollups.rollup()
+        self.archive_all()
+        self.assertEqual(ArchiveSegment.objects.filter(kind="attempts").count(), 3)
+
+        self.client.force_authenticate(user=self.admin)
+        url = "/api/admin-api/export-results/"
+        with mock.patch.object(ExportStudentResultsView, "ARCHIVE_CHUNK", 1):
+            response = self.client.get(url, {"format": "excel", "include_archived": "1", "student": self.student.id})
+        rows = response.content.decode().splitlines()[1:]
+        self.assertEqual(sorted(row.split(",")[3] for row in rows), ["20.0", "30.0", "40.0", "90.0"])
+
+        start = timezone.localdate(timezone.now() - timedelta(days=490))
+        end = timezone.localdate(timezone.now() - timedelta(days=440))
+        response = self.client.get(
+            url, {"format": "excel", "include_archived": "1", "start": str(start), "end": str(end)}
+        )
+        rows = response.content.decode().splitlines()[1:]
+        self.assertEqual(sorted(row.split(",")[3] for row in rows), ["10.0", "30.0"])
+        self.assertEqual(self.client.get(url, {"format": "excel", "student": "me"}).status_code, 400)
+
+    def test_notifications_round_trip(self):
+        self.archive_all()
+        response = self.client.get("/api/notifications/", {"include_archived": "true"})
+        self.assertEqual([n["message"] for n in response.data], ["5 days ago", "500 days ago"])
+        self.assertEqual(response.data[1]["data"], {"days": 500})
+        self.assertEqual(len(self.client.get("/api/notifications/").data), 1)
+
+        self.client.delete("/api/notifications/clear/")
+        self.assertFalse(ArchiveSegment.objects.filter(user=self.student).exists())
+        self.assertEqual(list(archive.archived("notifications", user_id=self.student.id)), [])
@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from learning.management.commands.benchmark_endpoints import DEFAULT_BUDGETS
+
+
+class BenchmarkEndpointsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tmp = self.enterContext(tempfile.TemporaryDirectory())
+        self.output = os.path.join(self.tmp, "report.json")
+
+    def run_benchmark(self, budgets):
+        budgets_path = os.path.join(self.tmp, "budgets.json")
+        with open(budgets_path, "w") as handle:
+            json.dump(budgets, handle)
+        call_command(
+            "benchmark_endpoints", sizes="150", iterations=2, warmup=0, seed_workers=1,
+            output=self.output, budgets=budgets_path, stdout=StringIO(),
+        )
+
+    def test_report_covers_hot_endpoints(self):
+        self.run_benchmark({name: {"queries": 1000} for name in DEFAULT_BUDGETS})
+
+        with open(self.output) as handle:
+            report = json.load(handle)
+        endpoints = report["sizes"]["150"]["endpoints"]
+        self.assertEqual(set(endpoints), set(DEFAULT_BUDGETS))
+        for name, result in endpoints.items():
+            self.assertGreater(result["queries"], 0, name)
+            self.assertLessEqual(result["p50_ms"], result["p95_ms"], name)
+            self.assertTrue(all(int(code) < 400 for code in result["statuses"]), name)
+        self.assertEqual(report["violations"], [])
+
+    def test_fails_when_budget_exceeded(self):
+        with self.assertRaises(CommandError):
+            self.run_benchmark({"150": {"notifications": {"queries": 0}}})
+
+        with open(self.output) as handle:
+            report = json.load(handle)
+        self.assertTrue(any("notifications: queries" in v for v in report["violations"]))
@@ -0,0 +1,108 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from learning import cloning, counters, jobs
+from learning.models import Course, Lesson, Question, Quiz, Role, User
+from learning.structure import get_course_structure
+
+
+class CourseCloneTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        admin_role, _ = Role.objects.get_or_create(name="ADMIN")
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        self.admin = User.objects.create_user("boss", "boss@example.com", "password123", role=admin_role)
+        self.instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.other = User.objects.create_user("rival", "rival@example.com", "password123", role=instructor_role)
+        self.course = self.build("Python", lessons=3, quizzes=2, questions=4)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.instructor)
+
+    def build(self, title, lessons, quizzes, questions):
+        course = Course.objects.create(title=title, description="d", instructor=self.instructor, is_published=True)
+        for order in range(1, lessons + 1):
+            Lesson.objects.create(course=course, title=f"L{order}", content="body " * 200 * order, lesson_order=order)
+        Lesson.all_objects.create(course=course, title="Gone", content="x", lesson_order=99, is_active=False)
+        for number in range(quizzes):
+            quiz = Quiz.objects.create(course=course, total_marks=10 + number)
+            for index in range(questions):
+                Question.objects.create(
+                    quiz=quiz, question_text=f"Q{number}.{index}", option_a="x", option_b="y", correct_option="B"
+                )
+            Question.all_objects.create(
+                quiz=quiz, question_text="retired", option_a="x", option_b="y", correct_option="A", is_active=False
+            )
+        Quiz.all_objects.create(course=course, is_active=False)
+        return course
+
+    def test_clone_copies_active_rows_with_remapped_quizzes(self):
+        response = self.client.post(f"/api/courses/{self.course.id}/clone/", {"title": "Python, spring"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            {key: response.data[key] for key in ("lessons", "quizzes", "questions")},
+            {"lessons": 3, "quizzes": 2, "questions": 8},
+        )
+        copy = Course.objects.get(pk=response.data["course_id"])
+        self.assertEqual((copy.title, copy.is_published, copy.instructor), ("Python, spring", False, self.instructor))
+
+        self.assertEqual(
+            list(Lesson.objects.with_content().filter(course=copy).order_by("lesson_order").values_list("title", "content")),
+            list(Lesson.objects.with_content().filter(course=self.course).order_by("lesson_order").values_list("title", "content")),
+        )
+        copied_quizzes = Quiz.objects.filter(course=copy).order_by("id")
+        self.assertEqual([quiz.total_marks for quiz in copied_quizzes], [10, 11])
+        for quiz, number in zip(copied_quizzes, range(2)):
+            self.assertEqual(
+                sorted(Question.objects.filter(quiz=quiz).values_list("question_text", flat=True)),
+                [f"Q{number}.{index}" for index in range(4)],
+            )
+        self.assertEqual(len(get_course_structure(copy.id).lesson_ids), 3)
+        values, _ = counters.read()
+        self.assertEqual(values["quizzes"], Quiz.objects.count())
+        self.assertEqual(values["courses"], Course.objects.count())
+
+    def test_query_count_does_not_depend_on_course_size(self):
+        big = self.build("Big", lessons=12, quizzes=5, questions=20)
+        with CaptureQueriesContext(connection) as small_run:
+            cloning.clone_course(self.course)
+        with CaptureQueriesContext(connection) as big_run:
+            cloning.clone_course(big)
+        self.assertEqual(len(small_run), len(big_run))
+
+    def test_background_clone_reports_progress(self):
+        response = self.client.post(f"/api/courses/{self.course.id}/clone/", {"background": True}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = jobs.run(response.data["job"]["id"])
+        self.assertEqual(job.status, "DONE")
+        job.refresh_from_db()
+        self.assertEqual((job.progress_done, job.progress_total), (13, 13))
+        self.assertEqual(Course.objects.get(pk=job.result["course_id"]).title, "Python (copy)")
+
+    def test_failure_removes_the_partial_copy(self):
+        before = Course.all_objects.count()
+        original = cloning._copy_rows
+
+        def broken(model, *args):
+            if model is Question:
+                raise RuntimeError("disk full")
+            return original(model, *args)
+
+        with mock.patch.object(cloning, "_copy_rows", broken), self.assertRaises(RuntimeError):
+            cloning.clone_course(self.course)
+        self.assertEqual(Course.all_objects.count(), before)
+        values, _ = counters.read()
+        self.assertEqual(values["quizzes"], Quiz.objects.count())
+
+    def test_permissions(self):
+        url = f"/api/courses/{self.course.id}/clone/"
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.client.post(url, {}, format="json").status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(url, {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Course.objects.get(pk=response.data["course_id"]).instructor, self.instructor)
@@ -0,0 +1,120 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from learning import counters, jobs
+from learning.models import BackgroundJob, Course, Enrollment, Notification, Role, User
+
+
+class CohortEnrollTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        admin_role, _ = Role.objects.get_or_create(name="ADMIN")
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        self.student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.admin = User.objects.create_user("boss", "boss@example.com", "password123", role=admin_role)
+        self.instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.other = User.objects.create_user("rival", "rival@example.com", "password123", role=instructor_role)
+        self.course = Course.objects.create(title="Python", description="d", instructor=self.instructor)
+        self.url = f"/api/courses/{self.course.id}/enroll-cohort/"
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.instructor)
+
+    def students(self, count, start=0):
+        return [
+            User.objects.create_user(f"s{i}", f"s{i}@example.com", "password123", role=self.student_role)
+            for i in range(start, start + count)
+        ]
+
+    def test_enrolls_by_id_username_or_email(self):
+        a, b, c, d = self.students(4)
+        Enrollment.objects.create(student=c, course=self.course)
+        Enrollment.all_objects.create(student=d, course=self.course, is_active=False)
+        students = [a.id, "s1", "s2@example.com", d.username, "nobody", self.other.id, a.email]
+
+        response = self.client.post(self.url, {"students": students}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {key: response.data[key] for key in ("requested", "enrolled", "already_enrolled", "unknown")},
+            # d is reactivated; instructors are not students
+            {"requested": 7, "enrolled": 3, "already_enrolled": 1, "unknown": ["nobody", str(self.other.id)]},
+        )
+        self.assertEqual(
+            set(Enrollment.objects.filter(course=self.course).values_list("student_id", flat=True)),
+            {a.id, b.id, c.id, d.id},
+        )
+        self.assertEqual(
+            set(Notification.objects.filter(notification_type="ENROLLED").values_list("user_id", flat=True)),
+            {a.id, b.id, d.id},
+        )
+        values, _ = counters.read()
+        self.assertEqual(values["enrollments"], Enrollment.objects.count())
+
+    def test_notifications_reach_websocket_groups(self):
+        (student,) = self.students(1)
+        layer = get_channel_layer()
+        channel = async_to_sync(layer.new_channel)()
+        async_to_sync(layer.group_add)(f"notifications_{student.id}", channel)
+
+        self.client.post(self.url, {"students": [student.id]}, format="json")
+        message = async_to_sync(layer.receive)(channel)
+        self.assertEqual(message["notification"]["notification_type"], "ENROLLED")
+        self.assertEqual(message["notification"]["data"]["course_id"], self.course.id)
+
+    def test_query_count_does_not_grow_with_the_cohort(self):
+        small, large = self.students(2), self.students(20, start=2)
+        with CaptureQueriesContext(connection) as few:
+            self.client.post(self.url, {"students": [s.id for s in small]}, format="json")
+        with CaptureQueriesContext(connection) as many:
+            self.client.post(self.url, {"students": [s.id for s in large]}, format="json")
+        self.assertEqual(len(few), len(many))
+
+    def test_csv_upload(self):
+        self.students(2)
+        upload = SimpleUploadedFile("cohort.csv", b"username\ns0\ns1\n", content_type="text/csv")
+        response = self.client.post(self.url, {"file": upload}, format="multipart")
+        self.assertEqual(response.data["enrolled"], 2)
+
+    def test_background_job(self):
+        self.students(3)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.post(self.url, {"students": ["s0", "s1", "s2"], "background": True}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(callbacks, [])  # nothing runs in the web process
+        job_id = response.data["job"]["id"]
+        self.assertEqual(response.data["job"]["status"], "PENDING")
+        self.assertFalse(Enrollment.objects.exists())
+
+        self.assertEqual(BackgroundJob.objects.get(pk=job_id).status, "PENDING")
+        jobs.run(job_id)
+        self.assertIsNone(jobs.run(job_id))  # already claimed
+
+        data = self.client.get(f"/api/jobs/{job_id}/").data
+        self.assertEqual((data["status"], data["progress"]), ("DONE", {"done": 3, "total": 3}))
+        self.assertEqual(data["result"]["enrolled"], 3)
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.client.get(f"/api/jobs/{job_id}/").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_failed_job_records_the_error(self):
+        job = BackgroundJob.objects.create(kind="enroll_cohort", params={"course_id": 0, "students": []})
+        with self.assertLogs("learning.jobs", "ERROR"):
+            jobs.run(job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.status, "FAILED")
+        self.assertTrue(job.error)
+
+    def test_permissions(self):
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.client.post(self.url, {"students": []}, format="json").status_code, 404)
+        self.client.force_authenticate(user=self.admin)
+        self.assertEqual(self.client.post(self.url, {"students": []}, format="json").status_code, 200)
+        (student,) = self.students(1)
+        self.client.force_authenticate(user=student)
+        self.assertEqual(self.client.post(self.url, {"students": []}, format="json").status_code, 403)
+        self.client.force_authenticate(user=self.instructor)
+        self.assertEqual(self.client.post(self.url, {"students": "s0"}, format="json").status_code, 400)
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from learning.models import Role, User, Course, Lesson, Enrollment, Quiz
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.student = User.objects.create_user("learner", "learner@example.com", "password123", role=student_role)
+        self.course = Course.objects.create(instructor=self.instructor, title="Course", is_published=True)
+        self.lessons = [
+            Lesson.objects.create(course=self.course, title=f"Lesson {i}", content="Body", lesson_order=i)
+            for i in (1, 2)
+        ]
+        Enrollment.objects.create(student=self.student, course=self.course)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.student)
+
+    def assert_revalidates(self, url):
+        """GET url, then again with its ETag: 304 without a body. Returns the ETag."""
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        cached = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(cached["ETag"], etag)
+        self.assertEqual(cached.content, b"")
+        return etag
+
+    def assert_changed(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        return response
+
+    def test_course_detail(self):
+        url = f"/api/courses/{self.course.id}/"
+        etag = self.assert_revalidates(url)
+
+        self.course.title = "Renamed"
+        self.course.save()
+        etag = self.assert_changed(url, etag)["ETag"]
+
+        # The body carries the instructor's name
+        self.instructor.username = "professor"
+        self.instructor.save()
+        response = self.assert_changed(url, etag)
+        self.assertEqual(response.data["instructor_name"], "professor")
+
+    def test_lesson_detail(self):
+        url = f"/api/lessons/{self.lessons[0].id}/"
+        etag = self.assert_revalidates(url)
+
+        self.lessons[0].content = "New body"
+        self.lessons[0].save()
+        response = self.assert_changed(url, etag)
+        self.assertEqual(response.data["content"], "New body")
+
+    def test_lesson_list_follows_the_users_progress(self):
+        url = f"/api/courses/{self.course.id}/lessons/"
+        etag = self.assert_revalidates(url)
+        self.assertIn("Authorization", self.client.get(url)["Vary"])
+
+        response = self.client.post(f"/api/lessons/{self.lessons[0].id}/complete/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assert_changed(url, etag)
+
+    def test_quiz_list(self):
+        url = f"/api/courses/{self.course.id}/quizzes/"
+        etag = self.assert_revalidates(url)
+
+        Quiz.objects.create(course=self.course)
+        response = self.assert_changed(url, etag)
+        self.assertEqual(len(response.data), 1)
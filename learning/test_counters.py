@@ -0,0 +1,97 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from learning import counters
+from learning.models import Course, Enrollment, PlatformCounter, Quiz, QuizAttempt, Role, User
+
+
+class PlatformCounterTest(TestCase):
+    def setUp(self):
+        self.student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        self.instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.student = User.objects.create_user("learner", "learner@example.com", "password123", role=self.student_role)
+
+    def assertCountersExact(self):
+        stored, _ = counters.read()
+        exact, _ = counters.read("exact")
+        self.assertEqual({k: v for k, v in stored.items() if v}, {k: v for k, v in exact.items() if v})
+
+    def test_signals_follow_saves_and_soft_deletes(self):
+        course = Course.objects.create(instructor=self.instructor, title="Course")
+        course.is_published = True
+        course.save()
+        quiz = Quiz.objects.create(course=course)
+        Enrollment.objects.enroll(self.student.id, course.id, course.created_at)
+        QuizAttempt.objects.create(student=self.student, quiz=quiz, score=80, is_passed=True)
+        QuizAttempt.objects.create(student=self.student, quiz=quiz, score=20, is_passed=False)
+        self.assertCountersExact()
+
+        quiz.soft_delete()
+        course.soft_delete()
+        QuizAttempt.objects.filter(is_passed=False).first().delete()
+        self.assertCountersExact()
+
+        values, _ = counters.read()
+        self.assertEqual(values["attempts"], 1)
+        self.assertEqual(values["courses"], 0)
+        self.assertEqual(values[f"users.role.{self.student_role.id}"], 1)
+
+    def test_update_fields_outside_tracked_fields_skip_the_lookup(self):
+        with self.assertNumQueries(1):
+            self.student.save(update_fields=["last_login"])
+
+    def test_reconcile_fixes_bulk_write_drift(self):
+        course = Course.objects.create(instructor=self.instructor, title="Course")
+        quiz = Quiz.objects.create(course=course)
+        QuizAttempt.objects.bulk_create(
+            QuizAttempt(student=self.student, quiz=quiz, score=90, is_passed=True) for _ in range(3)
+        )
+        self.assertEqual(counters.read()[0].get("attempts", 0), 0)
+
+        results = dict(counters.reconcile())
+        self.assertEqual(results["attempts"], 3)
+        self.assertEqual(results["users"], 0)
+        self.assertCountersExact()
+        self.assertEqual(dict(counters.reconcile())["attempts"], 0)
+
+        call_command("reconcile_counters", "attempts", stdout=open("/dev/null", "w"))
+        self.assertIsNotNone(PlatformCounter.objects.totals()["attempts"]["reconciled_at"])
+
+
+class AdminCounterViewsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        admin_role, _ = Role.objects.get_or_create(name="ADMIN")
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.admin = User.objects.create_user("boss", "boss@example.com", "password123", role=admin_role)
+        User.objects.create_user("learner", "learner@example.com", "password123", role=student_role)
+        Course.objects.create(instructor=self.admin, title="Course", is_published=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def test_dashboard_reads_counters_with_freshness(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/admin-api/dashboard/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["users_count"], 2)
+        self.assertEqual(response.data["courses_count"], 1)
+        self.assertEqual(response.data["freshness"]["users"]["source"], "counter")
+
+        # reltuples is PostgreSQL-only; elsewhere approx falls back to the counters
+        response = self.client.get("/api/admin-api/dashboard/?mode=approx")
+        self.assertEqual(response.data["users_count"], 2)
+
+        response = self.client.get("/api/admin-api/dashboard/?mode=exact")
+        self.assertEqual(response.data["freshness"]["quizzes"]["source"], "exact")
+        self.assertEqual(self.client.get("/api/admin-api/dashboard/?mode=bogus").status_code, 400)
+
+    def test_analytics_keeps_response_shape(self):
+        response = self.client.get("/api/admin-api/analytics/")
+        self.assertEqual(response.data["users_by_role"], {"ADMIN": 1, "STUDENT": 1})
+        self.assertEqual(response.data["courses"], {"total": 1, "published": 1})
+        self.assertEqual(response.data["quiz_pass_rate_percent"], 0)
+        self.assertIn("users.role.STUDENT", response.data["freshness"])
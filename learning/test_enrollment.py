@@ -0,0 +1,86 @@
+import threading
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TransactionTestCase
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from learning.models import Role, User, Course, Enrollment
+
+
+class EnrollCourseTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.student = User.objects.create_user("learner", "learner@example.com", "password123", role=student_role)
+        self.course = Course.objects.create(instructor=instructor, title="Course", is_published=True)
+        self.url = f"/api/courses/{self.course.id}/enroll/"
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.student)
+
+    def test_enroll_once(self):
+        # course lookup + enroll insert + enrollments counter + notification insert
+        with self.assertNumQueries(4):
+            response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["course"], self.course.id)
+
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Enrollment.all_objects.count(), 1)
+
+    def test_soft_deleted_enrollment_is_reactivated(self):
+        Enrollment.objects.create(student=self.student, course=self.course, is_active=False)
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Enrollment.objects.count(), 1)
+        self.assertEqual(Enrollment.all_objects.count(), 1)
+
+    def test_idempotency_key_replays_response(self):
+        first = self.client.post(self.url, HTTP_IDEMPOTENCY_KEY="enroll-1")
+        retry = self.client.post(self.url, HTTP_IDEMPOTENCY_KEY="enroll-1")
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data, first.data)
+        self.assertEqual(retry["Idempotent-Replayed"], "true")
+
+        other = self.client.post(self.url, {"note": "changed"}, format="json", HTTP_IDEMPOTENCY_KEY="enroll-1")
+        self.assertEqual(other.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Enrollment.objects.count(), 1)
+
+
+class ConcurrentEnrollCourseTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.student = User.objects.create_user("learner", "learner@example.com", "password123", role=student_role)
+        self.course = Course.objects.create(instructor=instructor, title="Course", is_published=True)
+
+    def test_parallel_enrollments_create_one_row(self):
+        workers = 8
+        barrier = threading.Barrier(workers)
+        results = []
+
+        def enroll():
+            client = APIClient()
+            client.force_authenticate(user=self.student)
+            try:
+                barrier.wait()
+                results.append(client.post(f"/api/courses/{self.course.id}/enroll/").status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=enroll) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(status.HTTP_201_CREATED), 1)
+        self.assertEqual(results.count(status.HTTP_400_BAD_REQUEST), workers - 1)
+        self.assertEqual(Enrollment.all_objects.count(), 1)
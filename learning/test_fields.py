@@ -0,0 +1,88 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+
+from learning.fields import COMPRESSION_THRESHOLD, compress_text, decompress_text
+from learning.models import Role, User, Course, Lesson
+
+
+def stored_content(lesson_id):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT content FROM learning_lesson WHERE id = %s", [lesson_id])
+        return bytes(cursor.fetchone()[0])
+
+
+class CompressedTextFieldTest(TestCase):
+    def setUp(self):
+        role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=role)
+        self.course = Course.objects.create(instructor=instructor, title="Course")
+
+    def round_trip(self, content):
+        lesson = Lesson.objects.create(course=self.course, title="Lesson", content=content, lesson_order=1)
+        self.assertEqual(Lesson.objects.with_content().get(pk=lesson.pk).content, content)
+        return stored_content(lesson.pk)
+
+    def test_short_text_is_stored_raw(self):
+        stored = self.round_trip("Short body")
+        self.assertEqual(stored, b"rShort body")
+
+    def test_long_text_is_compressed(self):
+        content = "Lesson body. " * 200
+        stored = self.round_trip(content)
+        self.assertEqual(stored[:1], b"z")
+        self.assertLess(len(stored), len(content))
+
+    def test_unicode_text(self):
+        for content in ("Ünïcödé – 日本語 🎓", "Ünïcödé – 日本語 🎓 " * 100, ""):
+            self.round_trip(content)
+
+    def test_compression_only_when_it_pays(self):
+        self.assertEqual(compress_text("x" * 10, threshold=0)[:1], b"r")
+        self.assertEqual(compress_text("x" * 100, threshold=0)[:1], b"z")
+        self.assertEqual(compress_text("x" * (COMPRESSION_THRESHOLD - 1))[:1], b"r")
+        for value in ("x" * 10, "x" * 100):
+            self.assertEqual(decompress_text(compress_text(value, threshold=0)), value)
+
+
+class CompressContentMigrationTest(TransactionTestCase):
+    before = [("learning", "0007_lecturenote_wishlist")]
+    after = [("learning", "0008_compress_lesson_content")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_forward_and_backward(self):
+        apps = self.migrate(self.before)
+        Role = apps.get_model("learning", "Role")
+        User = apps.get_model("learning", "User")
+        Course = apps.get_model("learning", "Course")
+        Lesson = apps.get_model("learning", "Lesson")
+        instructor = User.objects.create(
+            username="teacher", email="teacher@example.com", role=Role.objects.create(name="INSTRUCTOR")
+        )
+        course = Course.objects.create(instructor=instructor, title="Course")
+        bodies = ["Short", "Long body. " * 100, "Ünïcödé 🎓 " * 60]
+        ids = [
+            Lesson.objects.create(course=course, title=f"Lesson {i}", content=body, lesson_order=i).pk
+            for i, body in enumerate(bodies)
+        ]
+
+        apps = self.migrate(self.after)
+        Lesson = apps.get_model("learning", "Lesson")
+        for pk, body in zip(ids, bodies):
+            self.assertEqual(Lesson.objects.get(pk=pk).content, body)
+            self.assertEqual(decompress_text(stored_content(pk)), body)
+        self.assertEqual(stored_content(ids[1])[:1], b"z")
+
+        apps = self.migrate(self.before)
+        Lesson = apps.get_model("learning", "Lesson")
+        for pk, body in zip(ids, bodies):
+            self.assertEqual(Lesson.objects.get(pk=pk).content, body)
@@ -0,0 +1,41 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from learning.management.commands import explain_hot_queries
+
+
+class ExplainHotQueriesTest(TestCase):
+    def test_every_hot_query_uses_its_index(self):
+        out = StringIO()
+        call_command("explain_hot_queries", stdout=out)
+        self.assertIn("All hot queries use their indexes.", out.getvalue())
+        self.assertNotIn("MISS", out.getvalue())
+        self.assertIn("progress_enroll_completed_idx", out.getvalue())
+
+    def test_fails_when_a_plan_misses_its_index(self):
+        name, queryset, _ = explain_hot_queries.hot_queries()[0]
+        with mock.patch.object(explain_hot_queries, "hot_queries", return_value=[(name, queryset, ("no_such_idx",))]):
+            with self.assertRaises(CommandError):
+                call_command("explain_hot_queries", stdout=StringIO())
+            out = StringIO()
+            call_command("explain_hot_queries", no_assert=True, stdout=out)
+        self.assertIn("MISS", out.getvalue())
+
+
+class RedundantIndexTest(TestCase):
+    def test_single_column_fk_indexes_are_dropped(self):
+        for table, column in (
+            ("learning_comment", "course_id"),
+            ("learning_lessonprogress", "enrollment_id"),
+            ("learning_notification", "user_id"),
+            ("learning_quizattempt", "student_id"),
+        ):
+            with connection.cursor() as cursor:
+                constraints = connection.introspection.get_constraints(cursor, table)
+            single = [name for name, info in constraints.items() if info["index"] and info["columns"] == [column]]
+            self.assertEqual(single, [], table)
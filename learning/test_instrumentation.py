@@ -0,0 +1,63 @@
+from channels.testing import WebsocketCommunicator
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from learning.consumers import NotificationConsumer
+from learning.models import Role, User, Notification
+
+ENABLED = {"ENABLED": True, "SERVER_TIMING": True, "LOG_THRESHOLD_MS": None, "LOG_QUERY_COUNT": 1}
+
+
+class QueryInstrumentationTest(TestCase):
+    def setUp(self):
+        role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.user = User.objects.create_user("learner", "learner@example.com", "password123", role=role)
+        Notification.objects.create(user=self.user, notification_type="ENROLLED", message="Hi")
+
+    @override_settings(QUERY_INSTRUMENTATION=ENABLED)
+    def test_server_timing_and_log(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        with self.assertLogs("learning.performance", "WARNING") as logs:
+            response = client.get("/api/notifications/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response["Server-Timing"], r'db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        self.assertIn("db-slowest", response["Server-Timing"])
+        payload = logs.records[0].query_stats
+        self.assertEqual(payload["name"], "/api/notifications/")
+        self.assertGreater(payload["queries"], 0)
+
+    def test_disabled_adds_nothing(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get("/api/notifications/")
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(QUERY_INSTRUMENTATION=ENABLED)
+    async def test_asgi_counts_queries_run_in_sync_views(self):
+        token = str(AccessToken.for_user(self.user))
+        response = await AsyncClient().get("/api/notifications/", headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response["Server-Timing"], r'desc="[1-9]\d* queries"')
+
+
+class ConsumerInstrumentationTest(TransactionTestCase):
+    # Channels closes old connections around each handler, so this needs a real transaction
+    def setUp(self):
+        role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.user = User.objects.create_user("learner", "learner@example.com", "password123", role=role)
+
+    @override_settings(QUERY_INSTRUMENTATION=ENABLED)
+    async def test_consumer_handlers_are_instrumented(self):
+        token = str(AccessToken.for_user(self.user))
+        communicator = WebsocketCommunicator(NotificationConsumer.as_asgi(), f"/ws/notifications/?token={token}")
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        with self.assertLogs("learning.performance", "WARNING") as logs:
+            await communicator.send_json_to({"action": "mark_all_read"})
+            await communicator.disconnect()
+
+        self.assertTrue(any("NotificationConsumer:websocket.receive" in r.getMessage() for r in logs.records))
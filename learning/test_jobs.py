@@ -0,0 +1,97 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from learning import jobs
+from learning.models import BackgroundJob, Course, Role, User
+
+TEST_HANDLERS = {"echo": "learning.test_jobs.echo", "superseded": "learning.test_jobs.superseded"}
+
+
+def echo(job):
+    jobs.progress(job, 1, 1)
+    return {"attempt": job.attempts}
+
+
+def superseded(job):
+    # Another worker re-queued and claimed the job meanwhile
+    BackgroundJob.objects.filter(pk=job.pk).update(attempts=job.attempts + 1)
+    return {"stale": True}
+
+
+@mock.patch.dict(jobs.HANDLERS, TEST_HANDLERS)
+class JobLeaseTest(TestCase):
+    def running(self, heartbeat_age, attempts=1, kind="echo"):
+        """A RUNNING job whose worker last renewed its lease heartbeat_age ago."""
+        now = timezone.now()
+        return BackgroundJob.objects.create(
+            kind=kind, params={}, status="RUNNING", attempts=attempts,
+            started_at=now - heartbeat_age, heartbeat_at=now - heartbeat_age,
+        )
+
+    def test_stale_job_is_requeued_and_rerun(self):
+        job = self.running(timedelta(seconds=jobs.LEASE_TIMEOUT + 1))
+        with self.assertLogs("learning.jobs", "WARNING"):
+            self.assertEqual(jobs.requeue_stale(), (1, 0))
+        job.refresh_from_db()
+        self.assertEqual(job.status, "PENDING")
+
+        job = jobs.run(job.id)
+        self.assertEqual((job.status, job.result), ("DONE", {"attempt": 2}))
+
+    def test_live_job_is_left_alone(self):
+        job = self.running(timedelta(seconds=jobs.HEARTBEAT_INTERVAL))
+        self.assertEqual(jobs.requeue_stale(), (0, 0))
+        job.refresh_from_db()
+        self.assertEqual(job.status, "RUNNING")
+
+    def test_job_fails_after_max_attempts(self):
+        job = self.running(timedelta(hours=1), attempts=jobs.MAX_ATTEMPTS)
+        with self.assertLogs("learning.jobs", "WARNING"):
+            self.assertEqual(jobs.requeue_stale(), (0, 1))
+        job.refresh_from_db()
+        self.assertEqual(job.status, "FAILED")
+        self.assertTrue(job.finished_at)
+
+    def test_progress_renews_the_lease(self):
+        job = self.running(timedelta(hours=1))
+        jobs.progress(job, 5)
+        self.assertEqual(jobs.requeue_stale(), (0, 0))
+
+    def test_superseded_runner_does_not_overwrite_the_outcome(self):
+        job = BackgroundJob.objects.create(kind="superseded", params={})
+        with self.assertLogs("learning.jobs", "WARNING"):
+            job = jobs.run(job.id)
+        self.assertEqual((job.status, job.result), ("RUNNING", None))
+
+    def test_worker_requeues_and_runs(self):
+        job = self.running(timedelta(hours=1))
+        out = StringIO()
+        with self.assertLogs("learning.jobs", "WARNING"):
+            call_command("run_jobs", stdout=out)
+        self.assertIn("Re-queued 1", out.getvalue())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ("DONE", 2))
+
+
+class CloneRetryTest(TestCase):
+    def test_rerun_removes_the_copy_of_a_dead_attempt(self):
+        role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=role)
+        course = Course.objects.create(instructor=instructor, title="Python")
+        leftover = Course.objects.create(instructor=instructor, title="Python (copy)")
+        job = BackgroundJob.objects.create(
+            kind="clone_course", params={"course_id": course.id, "instructor_id": instructor.id},
+            status="RUNNING", attempts=1, result={"course_id": leftover.id},
+        )
+        with self.assertLogs("learning.jobs", "WARNING"):
+            jobs.requeue_stale()
+
+        job = jobs.run(job.id)
+        self.assertEqual(job.status, "DONE")
+        self.assertFalse(Course.all_objects.filter(pk=leftover.pk).exists())
+        self.assertEqual(Course.objects.filter(title="Python (copy)").count(), 1)
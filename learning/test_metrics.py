@@ -0,0 +1,140 @@
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from learning import metrics
+from learning.models import Role, User
+from learning.notifications import send_notification
+
+METRICS = {"ENABLED": True, "TOKEN": "secret", "MULTIPROCESS_DIR": None, "FLUSH_INTERVAL": 5}
+
+
+def value(name, **labels):
+    metric = metrics.REGISTRY[name]
+    return metrics.snapshot().get(metric._key(labels), 0)
+
+
+class MetricsRegistryTest(TestCase):
+    def test_threads_record_without_losing_updates(self):
+        counter = metrics.REGISTRY["learning_notifications_sent_total"]
+        before = value("learning_notifications_sent_total", type="TEST_THREADS")
+
+        def work():
+            for _ in range(1000):
+                counter.inc(type="TEST_THREADS")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(value("learning_notifications_sent_total", type="TEST_THREADS") - before, 4000)
+
+    def test_exited_threads_are_folded(self):
+        counter = metrics.REGISTRY["learning_notifications_sent_total"]
+        before = value("learning_notifications_sent_total", type="TEST_EXITED")
+        for _ in range(3):
+            threads = [threading.Thread(target=counter.inc, kwargs={"type": "TEST_EXITED"}) for _ in range(10)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(value("learning_notifications_sent_total", type="TEST_EXITED") - before, 30)
+        self.assertTrue(all(thread.is_alive() for thread in metrics._shards))
+
+    def test_histogram_exposition_is_cumulative(self):
+        histogram = metrics.Histogram("test_render_seconds", "Test", ("kind",), buckets=(0.1, 1.0))
+        try:
+            for sample in (0.05, 0.5, 5):
+                histogram.observe(sample, kind="a")
+            text = metrics.render(metrics.snapshot())
+        finally:
+            metrics.REGISTRY.pop("test_render_seconds")
+
+        self.assertIn('# TYPE test_render_seconds histogram', text)
+        self.assertIn('test_render_seconds_bucket{kind="a",le="0.1"} 1', text)
+        self.assertIn('test_render_seconds_bucket{kind="a",le="1"} 2', text)
+        self.assertIn('test_render_seconds_bucket{kind="a",le="+Inf"} 3', text)
+        self.assertIn('test_render_seconds_count{kind="a"} 3', text)
+
+    def test_multiprocess_merge_skips_stale_gauges(self):
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        stale = {
+            "written_at": time.time() - 3600,
+            "values": [
+                ["learning_notifications_sent_total", ["TEST_MERGE"], 7],
+                ["learning_websocket_connections", [], 5],
+            ],
+        }
+        with open(os.path.join(directory, "metrics_999999.json"), "w") as handle:
+            json.dump(stale, handle)
+
+        with override_settings(METRICS={**METRICS, "MULTIPROCESS_DIR": directory}):
+            metrics.NOTIFICATIONS_SENT.inc(type="TEST_MERGE")
+            merged = metrics.collect()
+
+        self.assertEqual(merged[("learning_notifications_sent_total", ("TEST_MERGE",))], 8)
+        self.assertEqual(merged.get(("learning_websocket_connections", ()), 0), value("learning_websocket_connections"))
+        self.assertTrue(os.path.isfile(os.path.join(directory, f"metrics_{os.getpid()}.json")))
+
+    def test_exited_processes_are_folded(self):
+        directory = self.enterContext(tempfile.TemporaryDirectory())
+        child = subprocess.Popen(["true"])
+        child.wait()
+        # Flushed just before its process died
+        payload = {
+            "written_at": time.time(),
+            "values": [
+                ["learning_notifications_sent_total", ["TEST_EXITED"], 3],
+                ["learning_websocket_connections", [], 4],
+            ],
+        }
+        with open(os.path.join(directory, f"metrics_{child.pid}.json"), "w") as handle:
+            json.dump(payload, handle)
+
+        with override_settings(METRICS={**METRICS, "MULTIPROCESS_DIR": directory}):
+            for _ in range(2):
+                merged = metrics.collect()
+                self.assertEqual(merged[("learning_notifications_sent_total", ("TEST_EXITED",))], 3)
+                self.assertEqual(
+                    merged.get(("learning_websocket_connections", ()), 0), value("learning_websocket_connections")
+                )
+        self.assertEqual(
+            sorted(name for name in os.listdir(directory) if name.endswith(".json")),
+            sorted([metrics.EXITED_FILE, f"metrics_{os.getpid()}.json"]),
+        )
+
+
+@override_settings(METRICS=METRICS)
+class MetricsEndpointTest(TestCase):
+    def setUp(self):
+        role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.user = User.objects.create_user("learner", "learner@example.com", "password123", role=role)
+
+    def test_requests_and_notifications_are_exposed(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        client.get("/api/notifications/")
+        send_notification(self.user.id, "ENROLLED", "Hi")
+
+        response = self.client.get("/api/metrics/", HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        text = response.content.decode()
+        self.assertIn('learning_http_requests_total{view="api/notifications/",method="GET",status="200"}', text)
+        self.assertIn('learning_db_queries_per_request_count{view="api/notifications/"}', text)
+        self.assertIn('learning_notifications_sent_total{type="ENROLLED"}', text)
+
+    def test_token_required(self):
+        self.assertEqual(self.client.get("/api/metrics/").status_code, 403)
+        self.assertEqual(self.client.get("/api/metrics/", HTTP_AUTHORIZATION="Bearer wrong").status_code, 403)
+        with override_settings(METRICS={**METRICS, "TOKEN": None}):
+            self.assertEqual(self.client.get("/api/metrics/", HTTP_AUTHORIZATION="Bearer ").status_code, 403)
+        with override_settings(METRICS={**METRICS, "ENABLED": False}):
+            self.assertEqual(self.client.get("/api/metrics/", HTTP_AUTHORIZATION="Bearer secret").status_code, 404)
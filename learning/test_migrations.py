@@ -0,0 +1,60 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class MergeDuplicateEnrollmentsTest(TransactionTestCase):
+    before = [("learning", "0009_lessonprogress_unique_enrollment_lesson")]
+    after = [("learning", "0010_enrollment_unique_student_course")]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_completed_progress_survives_the_merge(self):
+        apps = self.migrate(self.before)
+        Role = apps.get_model("learning", "Role")
+        User = apps.get_model("learning", "User")
+        Course = apps.get_model("learning", "Course")
+        Lesson = apps.get_model("learning", "Lesson")
+        Enrollment = apps.get_model("learning", "Enrollment")
+        LessonProgress = apps.get_model("learning", "LessonProgress")
+        role = Role.objects.create(name="STUDENT")
+        student = User.objects.create(username="learner", email="learner@example.com", role=role)
+        course = Course.objects.create(instructor=student, title="Course")
+        lessons = [Lesson.objects.create(course=course, title=f"L{i}", lesson_order=i) for i in range(4)]
+        kept, first_dup, second_dup = [Enrollment.objects.create(student=student, course=course) for _ in range(3)]
+        early, late = datetime(2024, 1, 1, tzinfo=dt_timezone.utc), datetime(2024, 2, 1, tzinfo=dt_timezone.utc)
+        for enrollment, lesson, completed_at in [
+            # Kept row incomplete, a duplicate's complete
+            (kept, lessons[0], None), (first_dup, lessons[0], late),
+            # Earliest completion wins
+            (kept, lessons[1], late), (first_dup, lessons[1], early), (second_dup, lessons[1], None),
+            # Only on a duplicate
+            (second_dup, lessons[2], early),
+            # Neither complete: the kept one stays
+            (kept, lessons[3], None), (first_dup, lessons[3], None),
+        ]:
+            LessonProgress.objects.create(enrollment=enrollment, lesson=lesson, completed_at=completed_at)
+
+        apps = self.migrate(self.after)
+        Enrollment = apps.get_model("learning", "Enrollment")
+        LessonProgress = apps.get_model("learning", "LessonProgress")
+        self.assertEqual(list(Enrollment.objects.values_list("id", flat=True)), [kept.id])
+        self.assertEqual(
+            sorted(LessonProgress.objects.values_list("enrollment_id", "lesson_id", "completed_at")),
+            [
+                (kept.id, lessons[0].id, late),
+                (kept.id, lessons[1].id, early),
+                (kept.id, lessons[2].id, early),
+                (kept.id, lessons[3].id, None),
+            ],
+        )
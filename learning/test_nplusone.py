@@ -0,0 +1,105 @@
+import inspect
+import warnings
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from learning.models import Role, User, Course, Enrollment, Comment
+from learning.serializers.forum import CommentSerializer
+from learning.utils.nplusone import (
+    NPlusOneDetector, NPlusOneError, NPlusOneWarning, detect_n_plus_one, normalize_sql,
+)
+
+
+class NormalizeSqlTest(TestCase):
+    def test_literals_and_in_lists_collapse(self):
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x''y' LIMIT 21"),
+            "SELECT * FROM t WHERE id IN (?) AND name = ? LIMIT ?",
+        )
+        self.assertEqual(
+            normalize_sql('SELECT "t"."id" FROM "t" T4 WHERE "t"."x" = %s'),
+            'SELECT "t"."id" FROM "t" T4 WHERE "t"."x" = ?',
+        )
+
+
+class DetectNPlusOneTest(TestCase):
+    def setUp(self):
+        self.role, _ = Role.objects.get_or_create(name="STUDENT")
+
+    def test_raises_with_call_site(self):
+        with self.assertRaises(NPlusOneError) as caught:
+            with detect_n_plus_one(threshold=3):
+                for pk in range(5):
+                    User.objects.filter(pk=pk).first()
+
+        message = str(caught.exception)
+        self.assertIn("N+1 query: 5 x SELECT", message)
+        self.assertIn("learning/test_nplusone.py", message)
+        self.assertIn("test_raises_with_call_site", message)
+
+    def test_call_site_is_the_issuing_line(self):
+        detector = NPlusOneDetector(threshold=3)
+        with connection.execute_wrapper(detector):
+            for pk in range(5):
+                line = inspect.currentframe().f_lineno + 1
+                User.objects.filter(pk=pk).first()
+
+        [offender] = detector.offenders
+        filename, lineno, function = offender.call_site
+        self.assertTrue(filename.endswith("learning/test_nplusone.py"))
+        self.assertEqual((lineno, function), (line, "test_call_site_is_the_issuing_line"))
+
+    def test_serializer_relations_point_at_the_serializer(self):
+        instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=self.role)
+        course = Course.objects.create(instructor=instructor, title="Python")
+        for i in range(4):
+            user = User.objects.create_user(f"user{i}", f"user{i}@example.com", "password123", role=self.role)
+            Comment.objects.create(user=user, course=course, text="hi")
+
+        comments = list(Comment.objects.all())
+        detector = NPlusOneDetector(threshold=3)
+        with connection.execute_wrapper(detector):
+            CommentSerializer(comments, many=True).data
+
+        sites = {o.template.split(" FROM ")[1].split()[0]: o.call_site for o in detector.offenders}
+        filename, _, function = sites['"learning_user"']
+        self.assertTrue(filename.endswith("learning/serializers/forum.py"))
+        self.assertEqual(function, "CommentSerializer.to_representation")
+        filename, _, function = sites['"learning_comment"']
+        self.assertTrue(filename.endswith("learning/serializers/forum.py"))
+        self.assertEqual(function, "get_replies")
+
+    def test_same_template_from_different_lines_is_not_flagged(self):
+        with detect_n_plus_one(threshold=1) as detector:
+            User.objects.filter(pk=1).first()
+            User.objects.filter(pk=2).first()
+        self.assertEqual(detector.offenders, [])
+
+    def test_warn_mode(self):
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            with detect_n_plus_one(threshold=1, mode="warn"):
+                for pk in range(3):
+                    User.objects.filter(pk=pk).exists()
+        self.assertTrue(any(issubclass(w.category, NPlusOneWarning) for w in caught))
+
+
+class NPlusOneMiddlewareTest(TestCase):
+    @override_settings(N_PLUS_ONE_DETECTION={"ENABLED": True, "THRESHOLD": 2, "MODE": "raise"})
+    def test_flags_view_loop(self):
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        student = User.objects.create_user("learner", "learner@example.com", "password123", role=student_role)
+        for i in range(4):
+            course = Course.objects.create(instructor=instructor, title=f"Course {i}", is_published=True)
+            Enrollment.objects.create(student=student, course=course)
+
+        client = APIClient()
+        client.force_authenticate(user=student)
+        with self.assertRaises(NPlusOneError) as caught:
+            client.get("/api/my-courses/")
+        self.assertIn("GET /api/my-courses/", str(caught.exception))
+        self.assertIn("learning/views/courses.py", str(caught.exception))
@@ -0,0 +1,146 @@
+import unittest
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from learning import archive, counters, partitions, rollups
+from learning.models import ArchiveSegment, Course, Quiz, QuizAttempt, Role, User
+
+
+def rows_in(table):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {connection.ops.quote_name(table)}")
+        return cursor.fetchone()[0]
+
+
+class PartitionHelpersTest(TestCase):
+    def test_month_bounds(self):
+        self.assertEqual(partitions.next_month(date(2024, 12, 1)), date(2025, 1, 1))
+        self.assertEqual(partitions.partition_name(date(2024, 3, 1)), "learning_quizattempt_y2024m03")
+        # Months are cut in UTC
+        self.assertEqual(
+            partitions.month_of(datetime(2024, 4, 1, 1, tzinfo=dt_timezone(timedelta(hours=2)))), date(2024, 3, 1)
+        )
+        self.assertEqual(
+            partitions.bounds(date(2024, 2, 1)),
+            (datetime(2024, 2, 1, tzinfo=dt_timezone.utc), datetime(2024, 3, 1, tzinfo=dt_timezone.utc)),
+        )
+
+    @unittest.skipIf(connection.vendor == "postgresql", "checks the fallback on other databases")
+    def test_other_databases_are_left_alone(self):
+        self.assertFalse(partitions.is_partitioned())
+        self.assertFalse(partitions.convert())
+        self.assertEqual(partitions.create_ahead(), [])
+        with self.assertRaisesMessage(CommandError, "needs PostgreSQL"):
+            call_command("quiz_attempt_partitions", stdout=StringIO())
+
+
+class AttemptWindowTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        admin_role, _ = Role.objects.get_or_create(name="ADMIN")
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.admin = User.objects.create_user("boss", "boss@example.com", "password123", role=admin_role)
+        self.instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        student = User.objects.create_user("learner", "learner@example.com", "password123", role=student_role)
+        quiz = Quiz.objects.create(course=Course.objects.create(title="Python", instructor=self.instructor))
+        for day, score in ((date(2024, 1, 10), 40), (date(2024, 2, 10), 80)):
+            QuizAttempt.objects.create(
+                student=student, quiz=quiz, score=score, attempted_at=datetime(day.year, day.month, day.day, 12, tzinfo=dt_timezone.utc)
+            )
+        self.client = APIClient()
+
+    def test_export_and_analytics_take_a_window(self):
+        self.client.force_authenticate(user=self.admin)
+        url = "/api/admin-api/export-results/"
+        response = self.client.get(url, {"format": "excel", "start": "2024-02-01", "end": "2024-02-29"})
+        self.assertEqual(response.content.decode().count("learner"), 1)
+        self.assertEqual(response.content.decode().count("80.0"), 1)
+        self.assertEqual(response.content.decode().count("40.0"), 0)
+        self.assertEqual(self.client.get(url, {"format": "excel", "start": "soon"}).status_code, 400)
+
+        self.client.force_authenticate(user=self.instructor)
+        response = self.client.get("/api/instructor/analytics/", {"end": "2024-01-31"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["courses"][0]["average_score"], 40)
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "declarative partitioning is PostgreSQL-only")
+class QuizAttemptPartitioningTest(TestCase):
+    def setUp(self):
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.student = User.objects.create_user("learner", "learner@example.com", "password123", role=student_role)
+        self.quiz = Quiz.objects.create(course=Course.objects.create(title="Python", instructor=instructor))
+        self.now = timezone.now()
+        for days, passed in ((400, False), (400, True), (380, False), (1, False)):
+            QuizAttempt.objects.create(
+                student=self.student, quiz=self.quiz, score=50, is_passed=passed,
+                attempted_at=self.now - timedelta(days=days),
+            )
+
+    def test_convert_create_ahead_archive_and_revert(self):
+        self.assertTrue(partitions.convert(ahead=2))
+        self.assertTrue(partitions.is_partitioned())
+        self.assertFalse(partitions.convert())
+        months = list(partitions.partitions())
+        self.assertEqual(months[0], partitions.month_of(self.now - timedelta(days=400)))
+        self.assertEqual(QuizAttempt.objects.count(), 4)
+        self.assertTrue(partitions.child_indexes("attempt_attempted_at_idx"))
+
+        # New rows keep getting ids from the sequence
+        attempt = QuizAttempt.objects.create(student=self.student, quiz=self.quiz, score=90, is_passed=True)
+        self.assertGreater(attempt.id, max(QuizAttempt.objects.exclude(pk=attempt.pk).values_list("id", flat=True)))
+
+        far = partitions.month_of(self.now + timedelta(days=200))
+        self.assertIn(partitions.partition_name(far), partitions.create_ahead(ahead=7))
+
+        # Whole months before the cutoff are detached; their passed attempt
+        # moves to a partition of its own, not the DEFAULT one
+        rollups.rollup()
+        cutoff = self.now - timedelta(days=100)
+        self.assertEqual(archive.archive("attempts", cutoff), 2)
+        self.assertNotIn(months[0], partitions.partitions())
+        self.assertEqual(QuizAttempt.objects.filter(is_passed=True).count(), 2)
+        self.assertEqual(rows_in(partitions.passed_partition_name(months[0])), 1)
+        self.assertEqual(rows_in(partitions.DEFAULT_PARTITION), 0)
+        # The next run finds nothing left to detach
+        self.assertEqual(partitions.detach_before(cutoff), [])
+        self.assertEqual(sum(ArchiveSegment.objects.filter(kind="attempts").values_list("row_count", flat=True)), 2)
+        stored, _ = counters.read()
+        self.assertEqual(stored["attempts"], QuizAttempt.objects.count())
+
+        self.assertTrue(partitions.revert())
+        self.assertFalse(partitions.is_partitioned())
+        self.assertEqual(QuizAttempt.objects.count(), 3)
+
+    def test_create_ahead_moves_rows_out_of_the_default_partition(self):
+        partitions.convert(ahead=0)
+        later = self.now + timedelta(days=100)
+        QuizAttempt.objects.create(student=self.student, quiz=self.quiz, score=70, attempted_at=later)
+        self.assertEqual(rows_in(partitions.DEFAULT_PARTITION), 1)
+
+        name = partitions.partition_name(partitions.month_of(later))
+        self.assertIn(name, partitions.create_ahead(ahead=5))
+        self.assertEqual(rows_in(partitions.DEFAULT_PARTITION), 0)
+        self.assertEqual(rows_in(name), 1)
+        self.assertEqual(QuizAttempt.objects.count(), 5)
+
+    def test_command_converts_and_reverts(self):
+        out = StringIO()
+        call_command("quiz_attempt_partitions", "--convert", "--ahead", "1", stdout=out)
+        self.assertIn("converted into", out.getvalue())
+        self.assertTrue(partitions.is_partitioned())
+        call_command("quiz_attempt_partitions", "--revert", stdout=out)
+        self.assertIn("Reverted to a plain table", out.getvalue())
+        self.assertFalse(partitions.is_partitioned())
+        self.assertEqual(QuizAttempt.objects.count(), 4)
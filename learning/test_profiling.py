@@ -0,0 +1,79 @@
+import os
+import pstats
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from learning.models import Role, User
+
+PROFILE_DIR = tempfile.mkdtemp()
+PROFILING = {"ENABLED": True, "DIR": PROFILE_DIR, "MAX_PER_MINUTE": 5, "MAX_FILES": 3, "SAMPLE_INTERVAL_MS": 1}
+
+
+@override_settings(PROFILING=PROFILING)
+class RequestProfilingTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        shutil.rmtree(PROFILE_DIR, ignore_errors=True)
+        admin_role, _ = Role.objects.get_or_create(name="ADMIN")
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.admin = User.objects.create_user("boss", "boss@example.com", "password123", role=admin_role)
+        self.student = User.objects.create_user("learner", "learner@example.com", "password123", role=student_role)
+
+    def client_for(self, user):
+        # Real JWTs: the middleware runs before DRF, so force_authenticate is invisible to it
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+        return client
+
+    def test_admin_request_is_profiled_and_listed(self):
+        client = self.client_for(self.admin)
+        response = client.get("/api/admin-api/dashboard/", HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile_id = response["X-Profile-Id"]
+
+        stats = pstats.Stats(os.path.join(PROFILE_DIR, f"{profile_id}.prof"))
+        self.assertGreater(stats.total_calls, 0)
+
+        listing = client.get("/api/admin-api/profiles/")
+        self.assertEqual(listing.data["count"], 1)
+        self.assertEqual(listing.data["results"][0]["path"], "/api/admin-api/dashboard/")
+
+        download = client.get(f"/api/admin-api/profiles/{profile_id}/")
+        self.assertEqual(download.status_code, status.HTTP_200_OK)
+
+    def test_sample_mode_writes_collapsed_stacks(self):
+        response = self.client_for(self.admin).get("/api/admin-api/analytics/?_profile=sample")
+        path = os.path.join(PROFILE_DIR, f"{response['X-Profile-Id']}.collapsed")
+        self.assertTrue(os.path.isfile(path))
+
+    def test_non_admin_flag_is_ignored(self):
+        response = self.client_for(self.student).get("/api/notifications/", HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertFalse(os.path.isdir(PROFILE_DIR) and os.listdir(PROFILE_DIR))
+
+        listing = self.client_for(self.student).get("/api/admin-api/profiles/")
+        self.assertEqual(listing.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(PROFILING={**PROFILING, "MAX_PER_MINUTE": 1})
+    def test_rate_limited(self):
+        client = self.client_for(self.admin)
+        self.assertIn("X-Profile-Id", client.get("/api/admin-api/dashboard/", HTTP_X_PROFILE="1"))
+        response = client.get("/api/admin-api/dashboard/", HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Profile-Skipped"], "rate-limited")
+
+    def test_old_profiles_pruned_and_bad_ids_rejected(self):
+        client = self.client_for(self.admin)
+        for _ in range(5):
+            client.get("/api/admin-api/dashboard/", HTTP_X_PROFILE="1")
+        self.assertEqual(client.get("/api/admin-api/profiles/").data["count"], 3)
+
+        response = client.get("/api/admin-api/profiles/..%2F..%2Fmanage/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,152 @@
+import threading
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from learning import structure
+from learning.models import Role, User, Course, Lesson, Enrollment, LessonProgress, Quiz
+from learning.structure import get_course_structure, invalidate_course_structure
+
+
+def create_course_with_lessons(instructor, count=3):
+    course = Course.objects.create(instructor=instructor, title="Course", is_published=True)
+    lessons = [
+        Lesson.objects.create(course=course, title=f"Lesson {i}", content="Body", lesson_order=i)
+        for i in range(1, count + 1)
+    ]
+    return course, lessons
+
+
+class CompleteLessonTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.student = User.objects.create_user("learner", "learner@example.com", "password123", role=student_role)
+        self.course, self.lessons = create_course_with_lessons(instructor)
+        Enrollment.objects.create(student=self.student, course=self.course)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.student)
+
+    def complete(self, lesson):
+        return self.client.post(f"/api/lessons/{lesson.id}/complete/")
+
+    def test_requires_previous_lesson(self):
+        response = self.complete(self.lessons[1])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(LessonProgress.objects.exists())
+
+    def test_not_enrolled_returns_404(self):
+        Enrollment.objects.all().delete()
+        response = self.complete(self.lessons[0])
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_repeat_completion_keeps_one_row(self):
+        self.assertEqual(self.complete(self.lessons[0]).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.complete(self.lessons[0]).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.complete(self.lessons[1]).status_code, status.HTTP_200_OK)
+        self.assertEqual(LessonProgress.objects.count(), 2)
+
+    def test_query_count(self):
+        get_course_structure(self.course.id)  # warm the structure cache
+        self.complete(self.lessons[0])
+        # lesson lookup + completion upsert + notification insert
+        with self.assertNumQueries(3):
+            response = self.complete(self.lessons[1])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class CourseStructureCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=role)
+        self.course, self.lessons = create_course_with_lessons(instructor)
+
+    def test_edits_invalidate_the_cached_structure(self):
+        before = get_course_structure(self.course.id)
+        self.assertEqual(before.final_lesson_id, self.lessons[-1].id)
+        with self.assertNumQueries(0):
+            get_course_structure(self.course.id)
+
+        added = Lesson.objects.create(course=self.course, title="Lesson 4", content="Body", lesson_order=4)
+        self.assertEqual(get_course_structure(self.course.id).final_lesson_id, added.id)
+
+        self.lessons[0].lesson_order = 5
+        self.lessons[0].save()
+        after = get_course_structure(self.course.id)
+        self.assertEqual(after.lesson_ids[0], self.lessons[1].id)
+        self.assertEqual(after.locked_lesson_ids([]), frozenset(after.lesson_ids[1:]))
+
+        quiz = Quiz.objects.create(course=self.course)
+        self.assertEqual(get_course_structure(self.course.id).quiz_ids, (quiz.id,))
+
+        # Bulk writes send no signals; callers invalidate explicitly
+        Lesson.objects.filter(pk=added.pk).update(lesson_order=0)
+        invalidate_course_structure(self.course.id)
+        self.assertEqual(get_course_structure(self.course.id).lesson_ids[0], added.id)
+
+    def test_lesson_missing_from_a_stale_structure_rebuilds_it(self):
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        student = User.objects.create_user("learner", "learner@example.com", "password123", role=student_role)
+        Enrollment.objects.create(student=student, course=self.course)
+        get_course_structure(self.course.id)
+        # Added by another process whose version bump this cache has not seen
+        added = Lesson.objects.bulk_create(
+            [Lesson(course=self.course, title="Lesson 4", content="Body", lesson_order=4)]
+        )[0]
+        self.assertNotIn(added.id, get_course_structure(self.course.id))
+
+        # The predecessor check is not skipped for it
+        client = APIClient()
+        client.force_authenticate(user=student)
+        response = client.post(f"/api/lessons/{added.id}/complete/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        with self.assertNumQueries(0):
+            fresh = get_course_structure(self.course.id, added.id)
+        self.assertEqual(fresh.previous_lesson_id(added.id), self.lessons[-1].id)
+
+    def test_process_local_cache_uses_a_short_timeout(self):
+        self.assertEqual(structure.cache_timeout(), structure.LOCAL_CACHE_TIMEOUT)
+        shared = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": "/tmp"}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(structure.cache_timeout(), structure.CACHE_TIMEOUT)
+
+
+class ConcurrentCompleteLessonTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.student = User.objects.create_user("learner", "learner@example.com", "password123", role=student_role)
+        self.course, self.lessons = create_course_with_lessons(instructor, count=1)
+        Enrollment.objects.create(student=self.student, course=self.course)
+
+    def test_parallel_completions_create_one_row(self):
+        workers = 8
+        barrier = threading.Barrier(workers)
+        results = []
+
+        def complete():
+            client = APIClient()
+            client.force_authenticate(user=self.student)
+            try:
+                barrier.wait()
+                results.append(client.post(f"/api/lessons/{self.lessons[0].id}/complete/").status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=complete) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [status.HTTP_200_OK] * workers)
+        self.assertEqual(LessonProgress.objects.count(), 1)
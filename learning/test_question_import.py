@@ -0,0 +1,126 @@
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from learning import question_import
+from learning.models import Course, Question, Quiz, Role, User
+
+AIKEN = """What does HTTP stand for?
+A. HyperText Transfer Protocol
+B) High Transfer Text Protocol
+ANSWER: A
+
+Which keyword defines a function in Python?
+A. func
+B. def
+C. lambda
+ANSWER: B
+"""
+
+GIFT = """// a comment
+::Q1:: 2 + 2 equals { ~3 =4 ~5 }
+
+Pick the prime { ~4 ~6 =7 #seven is prime }
+
+What is 1 \\= 1? { =True ~False }
+"""
+
+
+class QuestionBulkImportTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        self.instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.other = User.objects.create_user("rival", "rival@example.com", "password123", role=instructor_role)
+        course = Course.objects.create(title="Python", description="d", instructor=self.instructor)
+        self.quiz = Quiz.objects.create(course=course)
+        self.url = f"/api/quizzes/{self.quiz.id}/questions/bulk/"
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.instructor)
+
+    def test_json_creates_with_normalized_answers(self):
+        questions = [
+            {"question_text": "Q1", "option_a": "x", "option_b": "y", "correct_option": " b) "},
+            {"question": "Q2", "option_a": "x", "option_b": "y", "option_c": "z", "answer": "Z"},
+            {"question_text": "Q3", "option_a": "x", "option_b": "y", "correct_option": 1},
+        ]
+        before = Quiz.objects.get(pk=self.quiz.pk).updated_at
+        response = self.client.post(self.url, {"questions": questions}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"created": 3, "updated": 0})
+        self.assertEqual(
+            list(Question.objects.filter(quiz=self.quiz).order_by("id").values_list("correct_option", "option_c")),
+            [("B", None), ("C", "z"), ("A", None)],
+        )
+        self.assertGreater(Quiz.objects.get(pk=self.quiz.pk).updated_at, before)
+
+    def test_csv_edits_and_creates_in_one_batch(self):
+        existing = Question.objects.create(
+            quiz=self.quiz, question_text="Old", option_a="x", option_b="y", correct_option="A"
+        )
+        content = (
+            "id,question_text,option_a,option_b,option_c,option_d,correct_option\n"
+            f"{existing.id},New,x,y,,,option_b\n"
+            ",Fresh,p,q,r,s,D\n"
+        )
+        upload = SimpleUploadedFile("bank.csv", content.encode(), content_type="text/csv")
+        # Ownership check, existing rows, one bulk UPDATE, one bulk INSERT, one version bump (+ savepoint)
+        with self.assertNumQueries(7):
+            response = self.client.post(self.url, {"file": upload}, format="multipart")
+        self.assertEqual(response.data, {"created": 1, "updated": 1})
+        existing.refresh_from_db()
+        self.assertEqual((existing.question_text, existing.correct_option), ("New", "B"))
+
+    def test_aiken_and_gift(self):
+        rows = question_import.normalize_answers(question_import.parse_aiken(AIKEN))
+        self.assertEqual([row["correct_option"] for row in rows], ["A", "B"])
+        self.assertEqual(rows[0]["options"][1], "High Transfer Text Protocol")
+
+        rows = question_import.normalize_answers(question_import.parse_gift(GIFT))
+        self.assertEqual(
+            [(row["question_text"], row["correct_option"]) for row in rows],
+            [("2 + 2 equals", "B"), ("Pick the prime", "C"), ("What is 1 = 1?", "A")],
+        )
+        self.assertEqual(rows[1]["options"], ["4", "6", "7"])
+
+        response = self.client.post(self.url, {"format": "gift", "text": GIFT}, format="json")
+        self.assertEqual(response.data["created"], 3)
+
+    def test_numeric_answers_that_are_also_option_texts(self):
+        rows = question_import.normalize_answers([
+            question_import._row(1, "2 + 2", ["2", "3", "4", "5"], "4"),
+            question_import._row(2, "1 + 1", ["1", "2", "3"], "2"),
+            question_import._row(3, "2 + 2", ["2", "3", "4", "5"], "C"),
+            question_import._row(4, "2 + 2", ["2", "3", "4", "5"], "option d"),
+        ])
+        self.assertEqual([row["correct_option"] for row in rows], [None, "B", "C", "D"])
+        self.assertEqual(
+            question_import.validate(rows[:1], set()),
+            {1: ["correct_option '4' is ambiguous: the key of option D and the text of option C; give the letter"]},
+        )
+
+        # GIFT answers are positions whatever the option texts say
+        rows = question_import.normalize_answers(question_import.parse_gift("Pick one { =2 ~1 }"))
+        self.assertEqual(rows[0]["correct_option"], "A")
+
+    def test_one_bad_row_saves_nothing(self):
+        questions = [
+            {"question_text": "Fine", "option_a": "x", "option_b": "y", "correct_option": "A"},
+            {"question_text": "", "option_a": "x", "option_b": "y", "correct_option": "A"},
+            {"question_text": "No C", "option_a": "x", "option_b": "y", "correct_option": "C"},
+            {"question_text": "Guess", "option_a": "x", "option_b": "y", "correct_option": "maybe"},
+            {"id": 999999, "question_text": "Elsewhere", "option_a": "x", "option_b": "y", "correct_option": "A"},
+        ]
+        response = self.client.post(self.url, {"questions": questions}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error["line"] for error in response.data["errors"]], [2, 3, 4, 5])
+        self.assertFalse(Question.objects.exists())
+
+    def test_only_the_quiz_owner(self):
+        self.client.force_authenticate(user=self.other)
+        response = self.client.post(self.url, {"format": "aiken", "text": AIKEN}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.client.force_authenticate(user=self.instructor)
+        self.assertEqual(self.client.post(self.url, {"format": "docx", "text": "x"}, format="json").status_code, 400)
+        self.assertEqual(self.client.post(self.url, {"format": "json", "text": "{"}, format="json").status_code, 400)
@@ -0,0 +1,140 @@
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from learning import counters, jobs, retirement
+from learning.models import (
+    Comment, Course, CourseRating, Enrollment, LectureNote, Lesson, LessonProgress,
+    Question, Quiz, QuizAttempt, Role, User, Wishlist,
+)
+from learning.structure import get_course_structure
+
+
+class CourseRetirementTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        admin_role, _ = Role.objects.get_or_create(name="ADMIN")
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.admin = User.objects.create_user("boss", "boss@example.com", "password123", role=admin_role)
+        self.instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.students = [
+            User.objects.create_user(f"learner{i}", f"learner{i}@example.com", "password123", role=student_role)
+            for i in range(3)
+        ]
+        self.course = Course.objects.create(title="Python", instructor=self.instructor, is_published=True)
+        self.lessons = [
+            Lesson.objects.create(course=self.course, title=f"L{order}", content="body", lesson_order=order)
+            for order in (1, 2)
+        ]
+        self.retired_lesson = Lesson.objects.create(course=self.course, title="Old", content="x", lesson_order=3)
+        self.retired_lesson.soft_delete()
+        self.quiz = Quiz.objects.create(course=self.course, total_marks=10)
+        Question.objects.create(quiz=self.quiz, question_text="Q", option_a="x", option_b="y", correct_option="A")
+        for student in self.students:
+            Enrollment.objects.enroll(student.id, self.course.id, self.course.created_at)
+            enrollment = Enrollment.objects.get(student=student, course=self.course)
+            LessonProgress.objects.create(enrollment=enrollment, lesson=self.lessons[0], completed_at=self.course.created_at)
+            QuizAttempt.objects.create(student=student, quiz=self.quiz, score=80, is_passed=True)
+            LectureNote.objects.create(student=student, lesson=self.lessons[0], content="note")
+            CourseRating.objects.create(student=student, course=self.course, rating=5)
+            Wishlist.objects.create(student=student, course=self.course)
+        thread = Comment.objects.create(user=self.students[0], course=self.course, text="Question?")
+        Comment.objects.create(user=self.instructor, course=self.course, lesson=self.lessons[1], text="Answer", parent=thread)
+        self.other = Course.objects.create(title="Other", instructor=self.instructor)
+        Quiz.objects.create(course=self.other)
+        self.client = APIClient()
+
+    def assertCountersExact(self):
+        stored, _ = counters.read()
+        exact, _ = counters.read("exact")
+        self.assertEqual({k: v for k, v in stored.items() if v}, {k: v for k, v in exact.items() if v})
+
+    def test_soft_delete_cascades_and_restore_leaves_earlier_deletions(self):
+        self.assertEqual(len(get_course_structure(self.course.id).lesson_ids), 2)
+        # Course lookup + save, lesson and quiz UPDATEs, two counter writes (+ savepoint)
+        with self.assertNumQueries(8):
+            self.assertEqual(self.course.soft_delete(), {"lessons": 2, "quizzes": 1})
+        self.assertFalse(Lesson.objects.filter(course=self.course).exists())
+        self.assertFalse(Quiz.objects.filter(course=self.course).exists())
+        self.assertEqual(get_course_structure(self.course.id).lesson_ids, ())
+        self.assertCountersExact()
+
+        self.client.force_authenticate(user=self.instructor)
+        response = self.client.patch(f"/api/admin-api/courses/{self.course.id}/toggle-status/")
+        self.assertEqual(response.data["new_status"], "Active")
+        self.assertEqual(
+            set(Lesson.objects.filter(course=self.course).values_list("id", flat=True)),
+            {lesson.id for lesson in self.lessons},
+        )
+        self.assertTrue(Quiz.objects.filter(pk=self.quiz.pk).exists())
+        self.assertEqual(len(get_course_structure(self.course.id).lesson_ids), 2)
+        self.assertCountersExact()
+
+    def test_delete_view_soft_deletes_then_purges_in_the_background(self):
+        self.client.force_authenticate(user=self.instructor)
+        response = self.client.delete(f"/api/courses/{self.course.id}/delete/")
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Course.objects.filter(pk=self.course.pk).exists())
+
+        job = jobs.run(response.data["job"]["id"])
+        self.assertEqual(job.status, "DONE")
+        self.assertEqual(job.result["deleted"]["enrollments"], 3)
+        self.assertEqual(job.result["deleted"]["comments"], 2)
+        job.refresh_from_db()
+        self.assertEqual(job.progress_done, job.progress_total)
+
+        self.assertFalse(Course.all_objects.filter(pk=self.course.pk).exists())
+        self.assertFalse(Enrollment.all_objects.filter(course_id=self.course.id).exists())
+        self.assertFalse(QuizAttempt.objects.exists())
+        self.assertFalse(Lesson.all_objects.filter(course_id=self.course.id).exists())
+        self.assertTrue(Quiz.objects.filter(course=self.other).exists())
+        self.assertCountersExact()
+
+    def test_purge_in_small_batches(self):
+        retirement.deactivate(self.course)
+        result = retirement.purge(self.course, batch_size=2)
+        self.assertEqual(
+            result["deleted"],
+            {
+                "lesson_progress": 3, "lecture_notes": 3, "comments": 2, "ratings": 3, "wishlists": 3,
+                "attempts": 3, "questions": 1, "quizzes": 1, "lessons": 3, "enrollments": 3,
+            },
+        )
+        self.assertFalse(Course.all_objects.filter(pk=self.course.pk).exists())
+        self.assertCountersExact()
+
+    def test_batches_continue_past_the_last_key(self):
+        retirement.deactivate(self.course)
+        condition = Q(course_id=self.course.id)
+        ids = sorted(CourseRating.objects.filter(condition).values_list("id", flat=True))
+        self.assertEqual(retirement._delete_batch(CourseRating, condition, "pk", 2), (2, ids[1]))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(retirement._delete_batch(CourseRating, condition, "pk", 2, after=ids[1]), (1, ids[2]))
+        select = next(query["sql"] for query in queries if query["sql"].startswith("SELECT"))
+        self.assertIn(f'"id" > {ids[1]}', select.replace('"learning_courserating".', ""))
+        self.assertEqual(retirement._delete_batch(CourseRating, condition, "pk", 2, after=ids[2]), (0, ids[2]))
+
+    def test_progress_of_other_enrollments_on_the_course_lessons(self):
+        other_enrollment = Enrollment.objects.create(student=self.students[0], course=self.other)
+        LessonProgress.objects.create(enrollment=other_enrollment, lesson=self.lessons[1])
+        retirement.deactivate(self.course)
+        self.assertEqual(retirement.purge(self.course, batch_size=2)["deleted"]["lesson_progress"], 4)
+        self.assertFalse(LessonProgress.all_objects.exists())
+
+    def test_admin_purge_requires_a_deactivated_course(self):
+        self.client.force_authenticate(user=self.admin)
+        url = f"/api/admin-api/courses/{self.course.id}/purge/"
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_400_BAD_REQUEST)
+        with self.assertRaises(ValueError):
+            retirement.purge(self.course)
+
+        response = self.client.patch(f"/api/admin-api/courses/{self.course.id}/deactivate/")
+        self.assertEqual(response.data["lessons"], 2)
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(jobs.run(response.data["job"]["id"]).status, "DONE")
+        self.assertFalse(Course.all_objects.filter(pk=self.course.pk).exists())
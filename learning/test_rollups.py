@@ -0,0 +1,97 @@
+from datetime import date, datetime, timezone as dt_timezone
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from learning import rollups
+from learning.models import (
+    Course, CourseRating, DailyActivity, DailyNewUsers, Enrollment, Quiz, QuizAttempt, Role, User,
+)
+
+
+def at(day, hour=12):
+    return datetime(day.year, day.month, day.day, hour, tzinfo=dt_timezone.utc)
+
+
+class RollupAnalyticsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        admin_role, _ = Role.objects.get_or_create(name="ADMIN")
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        self.student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.admin = User.objects.create_user("boss", "boss@example.com", "password123", role=admin_role)
+        self.instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        self.course = Course.objects.create(instructor=self.instructor, title="Course", is_published=True)
+        self.quiz = Quiz.objects.create(course=self.course)
+        User.objects.update(created_at=at(date(2024, 1, 1)))
+
+        # Monday 2024-01-08 and Wednesday 2024-01-10 fall in one week
+        for i, day in enumerate([date(2024, 1, 8), date(2024, 1, 10), date(2024, 1, 15)]):
+            student = User.objects.create_user(f"s{i}", f"s{i}@example.com", "password123", role=self.student_role)
+            User.objects.filter(pk=student.pk).update(created_at=at(day))
+            Enrollment.objects.create(student=student, course=self.course, enrolled_at=at(day))
+            QuizAttempt.objects.create(
+                student=student, quiz=self.quiz, score=40 + 20 * i, is_passed=i > 0, attempted_at=at(day, 23),
+            )
+            rating = CourseRating.objects.create(student=student, course=self.course, rating=3 + i)
+            CourseRating.objects.filter(pk=rating.pk).update(created_at=at(day))
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def rollup(self, *args):
+        call_command("rollup_analytics", *args, stdout=StringIO())
+
+    def test_rollup_groups_events_by_day(self):
+        self.rollup("--until", "2024-01-31")
+
+        day = DailyActivity.objects.get(day=date(2024, 1, 10))
+        self.assertEqual((day.enrollments, day.quiz_attempts, day.quiz_passes), (1, 1, 1))
+        self.assertEqual((day.score_total, day.scored_attempts, day.rating_total), (60, 1, 4))
+        # Jan 1 only has registrations, which live in DailyNewUsers
+        self.assertEqual(DailyActivity.objects.count(), 3)
+        self.assertEqual(DailyNewUsers.objects.get(day=date(2024, 1, 15)).count, 1)
+        self.assertEqual(rollups.watermark_day(), date(2024, 1, 31))
+
+    def test_incremental_run_starts_at_watermark(self):
+        self.rollup("--until", "2024-01-12")
+        self.assertFalse(DailyActivity.objects.filter(day=date(2024, 1, 15)).exists())
+
+        # A late event before the watermark is only picked up by --since
+        late = User.objects.get(username="s0")
+        QuizAttempt.objects.create(student=late, quiz=self.quiz, score=100, is_passed=True, attempted_at=at(date(2024, 1, 8)))
+        self.rollup("--until", "2024-01-20")
+        self.assertEqual(DailyActivity.objects.get(day=date(2024, 1, 15)).quiz_attempts, 1)
+        self.assertEqual(DailyActivity.objects.get(day=date(2024, 1, 8)).quiz_attempts, 1)
+
+        self.rollup("--since", "2024-01-01", "--until", "2024-01-20")
+        self.assertEqual(DailyActivity.objects.get(day=date(2024, 1, 8)).quiz_attempts, 2)
+        self.assertEqual(rollups.watermark_day(), date(2024, 1, 20))
+
+    def test_weekly_series_reads_rollups(self):
+        self.rollup("--until", "2024-01-31")
+
+        with self.assertNumQueries(3):  # activity, new users, watermark
+            response = self.client.get(
+                "/api/admin-api/analytics/timeseries/?bucket=week&start=2024-01-01&end=2024-01-21"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        series = response.data["series"]
+        self.assertEqual([row["period"] for row in series], [date(2024, 1, 1), date(2024, 1, 8), date(2024, 1, 15)])
+        self.assertEqual(series[1]["enrollments"], 2)
+        self.assertEqual(series[1]["quiz_passes"], 1)
+        self.assertEqual(series[1]["average_score"], 50)
+        self.assertEqual(series[1]["average_rating"], 3.5)
+        self.assertEqual(series[1]["new_users"], {"STUDENT": 2})
+        self.assertEqual(series[0]["new_users"], {"ADMIN": 1, "INSTRUCTOR": 1})
+        self.assertIsNone(series[0]["average_score"])
+
+    def test_bad_ranges_are_rejected(self):
+        url = "/api/admin-api/analytics/timeseries/"
+        self.assertEqual(self.client.get(url + "?bucket=year").status_code, 400)
+        self.assertEqual(self.client.get(url + "?start=2024-02-01&end=2024-01-01").status_code, 400)
+        self.assertEqual(self.client.get(url + "?start=2000-01-01&end=2024-01-01").status_code, 400)
+        self.assertEqual(len(self.client.get(url + "?bucket=month").data["series"]), 12)
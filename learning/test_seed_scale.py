@@ -0,0 +1,86 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from learning.models import Comment, CourseRating, Enrollment, Notification, QuizAttempt
+from seed.management.commands import seed_scale
+
+
+def run_chunks_backwards(command, name, items):
+    """Command.phase with chunks finishing in reverse order, as parallel workers may."""
+    chunks = [items[i:i + command.chunk_size] for i in range(0, len(items), command.chunk_size)]
+    seed_scale._init_worker(command.context)
+    for index in reversed(range(len(chunks))):
+        command.merge({}, seed_scale._run_chunk(name, index, chunks[index]))
+
+
+class SeedScaleTest(TestCase):
+    def seed(self, prefix):
+        call_command(
+            "seed_scale", users=120, courses=9, lessons_per_course=3, questions_per_quiz=2,
+            chunk_size=7, seed=7, prefix=prefix, stdout=StringIO(),
+        )
+
+    def snapshot(self, prefix):
+        """Generated rows with ids replaced by prefix-free usernames and titles."""
+        def name(value):
+            return value.replace(prefix, "", 1)
+
+        students = {"student__username__startswith": f"{prefix}_"}
+        return {
+            "enrollments": sorted(
+                (name(user), name(title), enrolled_at)
+                for user, title, enrolled_at in Enrollment.objects.filter(**students)
+                .values_list("student__username", "course__title", "enrolled_at")
+            ),
+            "attempts": sorted(
+                (name(user), name(title), score, attempted_at)
+                for user, title, score, attempted_at in QuizAttempt.objects.filter(**students)
+                .values_list("student__username", "quiz__course__title", "score", "attempted_at")
+            ),
+            "ratings": sorted(
+                (name(user), name(title), rating, created_at)
+                for user, title, rating, created_at in CourseRating.objects.filter(**students)
+                .values_list("student__username", "course__title", "rating", "created_at")
+            ),
+            "comments": sorted(
+                (name(user), name(title), parent is not None, created_at)
+                for user, title, parent, created_at in Comment.objects.filter(user__username__startswith=f"{prefix}_")
+                .values_list("user__username", "course__title", "parent_id", "created_at")
+            ),
+            "notifications": sorted(
+                (name(user), kind, created_at)
+                for user, kind, created_at in Notification.objects.filter(user__username__startswith=f"{prefix}_")
+                .values_list("user__username", "notification_type", "created_at")
+            ),
+        }
+
+    def test_same_seed_gives_the_same_data_whatever_the_chunk_order(self):
+        self.seed("first")
+        with mock.patch.object(seed_scale.Command, "phase", run_chunks_backwards):
+            self.seed("second")
+
+        first, second = self.snapshot("first"), self.snapshot("second")
+        for kind in first:
+            self.assertTrue(first[kind], kind)
+            self.assertEqual(first[kind], second[kind], kind)
+
+    def test_timestamps_follow_the_synthetic_timeline(self):
+        self.seed("spread")
+        for model in (Notification, Comment, CourseRating):
+            stamps = set(model.objects.values_list("created_at", flat=True))
+            self.assertGreater(len(stamps), 1, model.__name__)
+            self.assertTrue(all(stamp < timezone.now() - timedelta(days=30) for stamp in stamps), model.__name__)
+
+    def test_timestamps_are_written_by_the_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.seed("once")
+        tables = [model._meta.db_table for model in (Notification, Comment, CourseRating, QuizAttempt, Enrollment)]
+        second_pass = [q["sql"] for q in queries if q["sql"].startswith("UPDATE") and any(t in q["sql"] for t in tables)]
+        self.assertEqual(second_pass, [])
@@ -0,0 +1,108 @@
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from learning.models import Course, Enrollment, Quiz, QuizAttempt, Role, User
+
+
+def at(day, hour=12):
+    return datetime(day.year, day.month, day.day, hour, tzinfo=dt_timezone.utc)
+
+
+class InstructorTrendsTest(APITestCase):
+    url = "/api/instructor/analytics/timeseries/"
+
+    def setUp(self):
+        cache.clear()
+        instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        self.student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.instructor = User.objects.create_user("teacher", "teacher@example.com", "password123", role=instructor_role)
+        other = User.objects.create_user("other", "other@example.com", "password123", role=instructor_role)
+        self.course = Course.objects.create(instructor=self.instructor, title="Mine", is_published=True)
+        self.second = Course.objects.create(instructor=self.instructor, title="Also mine", is_published=True)
+        foreign = Course.objects.create(instructor=other, title="Theirs", is_published=True)
+        quiz = Quiz.objects.create(course=self.course)
+
+        days = [date(2024, 3, 4), date(2024, 3, 4), date(2024, 3, 6), date(2024, 3, 12)]
+        for i, day in enumerate(days):
+            student = self.student(f"s{i}")
+            Enrollment.objects.create(student=student, course=self.course, enrolled_at=at(day))
+            Enrollment.objects.create(student=student, course=foreign, enrolled_at=at(day))
+            QuizAttempt.objects.create(student=student, quiz=quiz, score=80, is_passed=i % 2 == 0, attempted_at=at(day))
+        # Previous period: one enrollment in February
+        Enrollment.objects.create(student=self.student("early"), course=self.second, enrolled_at=at(date(2024, 2, 27)))
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.instructor)
+
+    def student(self, username):
+        return User.objects.create_user(username, f"{username}@example.com", "password123", role=self.student_role)
+
+    def test_daily_and_weekly_series(self):
+        response = self.client.get(self.url + "?start=2024-03-04&end=2024-03-06")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["period"], row["enrollments"], row["completions"]) for row in response.data["series"]],
+            [(date(2024, 3, 4), 2, 1), (date(2024, 3, 5), 0, 0), (date(2024, 3, 6), 1, 1)],
+        )
+
+        response = self.client.get(self.url + "?bucket=week&start=2024-03-04&end=2024-03-17")
+        self.assertEqual([row["enrollments"] for row in response.data["series"]], [3, 1])
+        self.assertEqual(response.data["totals"], {"enrollments": 4, "completions": 2})
+
+    def test_course_filter_and_previous_period(self):
+        response = self.client.get(
+            self.url + f"?bucket=week&start=2024-03-04&end=2024-03-10&course={self.second.id}&compare=previous"
+        )
+        self.assertEqual(response.data["totals"]["enrollments"], 0)
+        self.assertEqual(response.data["compare"]["start"], date(2024, 2, 26))
+        self.assertEqual(response.data["compare"]["totals"]["enrollments"], 1)
+        self.assertEqual(response.data["compare"]["change_percent"]["enrollments"], -100.0)
+
+        response = self.client.get(
+            self.url + "?start=2024-03-04&end=2024-03-10&compare_start=2024-03-11&compare_end=2024-03-17"
+        )
+        self.assertEqual(response.data["compare"]["totals"], {"enrollments": 1, "completions": 0})
+
+    def test_cached_until_a_new_enrollment(self):
+        query = f"?bucket=month&start=2024-03-01&end={date.today()}"
+        first = self.client.get(self.url + query)
+        with self.assertNumQueries(0):
+            self.client.get(self.url + query)
+
+        newcomer = self.student("newcomer")
+        client = APIClient()
+        client.force_authenticate(user=newcomer)
+        self.assertEqual(client.post(f"/api/courses/{self.course.id}/enroll/").status_code, status.HTTP_201_CREATED)
+
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.data["totals"]["enrollments"], first.data["totals"]["enrollments"] + 1)
+
+    def test_only_new_enrollments_and_status_changes_invalidate(self):
+        enrollment = Enrollment.objects.get(student__username="s0", course=self.course)
+        with self.captureOnCommitCallbacks() as callbacks:
+            enrollment.save()
+        self.assertEqual(callbacks, [])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            enrollment.is_active = False
+            enrollment.save()
+        self.assertEqual(len(callbacks), 1)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            Enrollment.objects.create(student=self.student("late"), course=self.second)
+        self.assertEqual(len(callbacks), 1)
+
+        query = "?start=2024-03-04&end=2024-03-06"
+        self.client.get(self.url + query)
+        with self.captureOnCommitCallbacks(execute=True):
+            enrollment.is_active = True
+            enrollment.save()
+        with self.assertNumQueries(2):
+            self.client.get(self.url + query)
+
+    def test_bad_params(self):
+        self.assertEqual(self.client.get(self.url + "?course=abc").status_code, 400)
+        self.assertEqual(self.client.get(self.url + "?compare_start=nope").status_code, 400)
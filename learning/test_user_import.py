@@ -0,0 +1,118 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.hashers import check_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from learning import counters, jobs, user_import
+from learning.admin_views import AdminUserImportView
+from learning.models import Role, User
+
+CSV = """Username,Email,Password,Role
+ada,ada@example.com,secret-1,student
+grace,grace@example.com,secret-2,INSTRUCTOR
+,nobody@example.com,x,STUDENT
+taken,fresh@example.com,x,STUDENT
+ada,ada2@example.com,x,STUDENT
+alan,not-an-email,x,STUDENT
+barbara,barbara@example.com,,
+edsger,edsger@example.com,x,WIZARD
+"""
+
+
+class UserImportTest(APITestCase):
+    url = "/api/admin-api/users/import/"
+
+    def setUp(self):
+        cache.clear()
+        admin_role, _ = Role.objects.get_or_create(name="ADMIN")
+        self.student_role, _ = Role.objects.get_or_create(name="STUDENT")
+        self.instructor_role, _ = Role.objects.get_or_create(name="INSTRUCTOR")
+        self.admin = User.objects.create_user("boss", "boss@example.com", "password123", role=admin_role)
+        User.objects.create_user("taken", "taken@example.com", "password123", role=self.student_role)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    def upload(self, content, name="users.csv", **data):
+        upload = SimpleUploadedFile(name, content.encode(), content_type="text/plain")
+        return self.client.post(self.url, {"file": upload, **data}, format="multipart")
+
+    def test_csv_import_reports_bad_rows_and_creates_the_rest(self):
+        response = self.upload(CSV)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["total"], response.data["created"], response.data["failed"]), (8, 3, 5))
+        self.assertEqual(
+            {error["line"]: sorted(error["errors"]) for error in response.data["errors"]},
+            {4: ["username"], 5: ["username"], 6: ["username"], 7: ["email"], 9: ["role"]},
+        )
+
+        ada = User.objects.get(username="ada")
+        self.assertTrue(check_password("secret-1", ada.password))
+        self.assertEqual(ada.role, self.student_role)
+        self.assertEqual(User.objects.get(username="grace").role, self.instructor_role)
+        # No password: the account exists but cannot log in until reset
+        self.assertFalse(User.objects.get(username="barbara").has_usable_password())
+
+    def test_counters_follow_the_import(self):
+        self.upload(CSV)
+        values, _ = counters.read()
+        self.assertEqual(values["users"], User.objects.count())
+        self.assertEqual(values[f"users.role.{self.student_role.id}"], User.objects.filter(role=self.student_role).count())
+
+    def test_jsonl_and_default_role(self):
+        content = '{"username": "linus", "email": "linus@example.com", "password": "pw"}\nnot json\n\n[1]\n'
+        response = self.upload(content, name="users.jsonl", role="instructor")
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual([error["line"] for error in response.data["errors"]], [2, 4])
+        self.assertEqual(User.objects.get(username="linus").role, self.instructor_role)
+
+    def test_batches_check_existing_users_with_one_query_each(self):
+        rows = user_import.parse(
+            "\n".join(["username,email"] + [f"u{i},u{i}@example.com" for i in range(6)]), "csv"
+        )
+        # Roles once; per batch the existing-user check and a savepointed
+        # INSERT; one counter upsert at the end
+        with self.assertNumQueries(1 + 3 * 4 + 1):
+            importer = user_import.Importer(workers=1, batch_size=2)
+            summary = importer.run(rows)
+        self.assertEqual(summary["created"], 6)
+
+    def test_process_pool_hashes_in_order(self):
+        passwords = [f"pw-{i}" for i in range(user_import.POOL_THRESHOLD)] + [None]
+        hashes = user_import.hash_passwords(passwords, workers=2)
+        self.assertTrue(all(check_password(pw, hashed) for pw, hashed in zip(passwords[:-1], hashes)))
+        self.assertTrue(hashes[-1].startswith("!"))
+
+    def test_large_upload_runs_as_a_job(self):
+        rows = [f"u{i},u{i}@example.com,pw-{i}" for i in range(AdminUserImportView.SYNC_ROWS + 1)]
+        response = self.upload("\n".join(["username,email,password"] + rows))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(User.objects.filter(username="u0").exists())  # nothing hashed in the request
+
+        job = jobs.run(response.data["job"]["id"])
+        self.assertEqual((job.status, job.result["created"]), ("DONE", len(rows)))
+        job.refresh_from_db()
+        self.assertEqual((job.progress_done, job.progress_total), (len(rows), len(rows)))
+        self.assertTrue(check_password("pw-3", User.objects.get(username="u3").password))
+        # The passwords do not outlive the import
+        self.assertNotIn("text", job.params)
+
+    def test_rejects_bad_uploads(self):
+        self.assertEqual(self.client.post(self.url, {}, format="multipart").status_code, 400)
+        self.assertEqual(self.upload("a,b", name="users.txt").status_code, 400)
+        upload = SimpleUploadedFile("users.csv", b"\xff\xfe\x00", content_type="text/csv")
+        self.assertEqual(self.client.post(self.url, {"file": upload}, format="multipart").status_code, 400)
+
+    def test_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "cohort.csv"
+            path.write_text(CSV)
+            out, err = StringIO(), StringIO()
+            call_command("import_users", str(path), "--workers", "1", stdout=out, stderr=err)
+        self.assertIn("Created 3 of 8 user(s); 5 failed", out.getvalue())
+        self.assertIn("line 9: role: Unknown role WIZARD.", err.getvalue())
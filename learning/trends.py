@@ -0,0 +1,130 @@
+"""
+Enrollment and completion trends for instructors.
+
+Each metric is one grouped query that truncates the event time in the
+database (Trunc) and covers the requested period and the optional comparison
+period together. Results are cached per instructor for a few minutes under a
+version key; new enrollments bump the version (see signals.py and
+EnrollCourseView), completions only age out with the TTL. Without a shared
+cache (REDIS_CACHE_URL) a bump only reaches the worker that made it, so other
+workers may serve trends up to CACHE_TIMEOUT old; acceptable for a dashboard.
+"""
+import time
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Case, Count, DateField, IntegerField, Q, Value, When
+from django.db.models.functions import Trunc
+
+from .models import Enrollment, QuizAttempt
+from .utils import timeseries
+
+CACHE_TIMEOUT = 5 * 60
+
+_VERSION_KEY = "instructor_trends:version:{instructor_id}"
+_TRENDS_KEY = "instructor_trends:{instructor_id}:v{version}:{params}"
+
+# Metric -> (events, event time field, path to the course)
+METRICS = {
+    "enrollments": (Enrollment.objects, "enrolled_at", "course"),
+    "completions": (QuizAttempt.objects.filter(is_passed=True), "attempted_at", "quiz__course"),
+}
+
+
+def _current_version(instructor_id):
+    key = _VERSION_KEY.format(instructor_id=instructor_id)
+    version = cache.get(key)
+    if version is None:
+        # Seed with a timestamp so an evicted counter never reuses an old key
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_instructor_trends(instructor_id):
+    """Bump the instructor's trends version so the next read recomputes."""
+    key = _VERSION_KEY.format(instructor_id=instructor_id)
+    cache.add(key, int(time.time() * 1000), None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), None)
+
+
+def previous_period(start, end):
+    """The period of the same length ending the day before start."""
+    compare_end = start - timedelta(days=1)
+    return compare_end - (end - start), compare_end
+
+
+def _counts(metric, instructor_id, bucket, periods, course_ids):
+    """{period index: {bucket start: count}} for one metric, in one query."""
+    events, field, course = METRICS[metric]
+    ranges = [Q(**timeseries.day_range(field, start, end)) for start, end in periods]
+    # Label each event with its period so a bucket straddling both is split correctly
+    which = Case(*(When(in_range, then=Value(i)) for i, in_range in enumerate(ranges)), output_field=IntegerField())
+    in_periods = Q()
+    for in_range in ranges:
+        in_periods |= in_range
+
+    queryset = events.filter(in_periods, **{f"{course}__instructor_id": instructor_id})
+    if course_ids:
+        queryset = queryset.filter(**{f"{course}__in": course_ids})
+    rows = (
+        queryset
+        .annotate(which=which, bucket=Trunc(field, bucket, output_field=DateField()))
+        .values("which", "bucket")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    counts = {}
+    for row in rows:
+        counts.setdefault(row["which"], {})[row["bucket"]] = row["n"]
+    return counts
+
+
+def _change(current, previous):
+    return round((current - previous) / previous * 100, 2) if previous else None
+
+
+def _compute(instructor_id, bucket, period, compare, course_ids):
+    periods = [period] + ([compare] if compare else [])
+    counts = {metric: _counts(metric, instructor_id, bucket, periods, course_ids) for metric in METRICS}
+
+    results = []
+    for i, (start, end) in enumerate(periods):
+        series = [
+            {"period": bucket_start, **{metric: counts[metric].get(i, {}).get(bucket_start, 0) for metric in METRICS}}
+            for bucket_start in timeseries.periods(start, end, bucket)
+        ]
+        totals = {metric: sum(counts[metric].get(i, {}).values()) for metric in METRICS}
+        results.append({"start": start, "end": end, "series": series, "totals": totals})
+
+    data = {"bucket": bucket, "courses": course_ids or None, **results[0]}
+    if compare:
+        data["compare"] = {
+            **results[1],
+            "change_percent": {
+                metric: _change(results[0]["totals"][metric], results[1]["totals"][metric]) for metric in METRICS
+            },
+        }
+    return data
+
+
+def instructor_trends(instructor_id, bucket, period, compare=None, course_ids=None):
+    """
+    Cached enrollment and completion series for an instructor's courses.
+
+    Args:
+        period: (start, end) days, inclusive
+        compare: optional second (start, end) to compare against
+        course_ids: restrict to these courses (others of the instructor are ignored)
+    """
+    compare_key = f"{compare[0]}:{compare[1]}" if compare else "-"
+    params = f"{bucket}:{period[0]}:{period[1]}:{compare_key}:{','.join(map(str, sorted(course_ids or ())))}"
+    key = _TRENDS_KEY.format(instructor_id=instructor_id, version=_current_version(instructor_id), params=params)
+    data = cache.get(key)
+    if data is None:
+        data = _compute(instructor_id, bucket, period, compare, course_ids)
+        cache.set(key, data, CACHE_TIMEOUT)
+    return data
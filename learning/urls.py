@@ -12,15 +12,19 @@ from .views import (
     CourseDetailView,
     PublishUnpublishCourseView,
     EnrollCourseView,
+    CohortEnrollView,
+    CourseCloneView,
     MyCoursesView,
     LessonListCreateView,
     LessonDetailView,
     CompleteLessonView,
     QuizListCreateView,
     QuestionListCreateView,
+    QuestionBulkImportView,
     AttemptQuizView,
     QuizResultsView,
     InstructorAnalyticsView, 
+    InstructorTrendsView,
     InstructorStudentListView,
     CourseToggleStatusView,
     GenerateCertificateView,
@@ -34,17 +38,25 @@ from .views import (
     WishlistListCreateView,
     WishlistDeleteView,
     LectureNoteListCreateView,
-    LectureNoteUpdateDeleteView
+    LectureNoteUpdateDeleteView,
+    JobStatusView,
+    metrics_view
 )
 from .admin_views import (
     AdminDashboardView,
     AdminAnalyticsView,
+    AdminAnalyticsTimeSeriesView,
     ExportStudentResultsView,
     AdminUserDeactivateView,
     AdminReactivateUserView,
     AdminToggleUserStatusView,
     AdminCourseDeactivateView,
-    AdminUserListView
+    AdminCoursePurgeView,
+    AdminUserListView,
+    AdminBulkUserStatusView,
+    AdminUserImportView,
+    AdminProfileListView,
+    AdminProfileDownloadView
 )
 
 urlpatterns = [
@@ -52,13 +64,17 @@ urlpatterns = [
     path("login/", LoginView.as_view()),
     path("profile/", UserProfileView.as_view()),
     path("admin-api/analytics/", AdminAnalyticsView.as_view(), name="admin-analytics"),
+    path("admin-api/analytics/timeseries/", AdminAnalyticsTimeSeriesView.as_view(), name="admin-analytics-timeseries"),
     path("instructor/analytics/", InstructorAnalyticsView.as_view(), name="instructor-analytics"),
+    path("instructor/analytics/timeseries/", InstructorTrendsView.as_view(), name="instructor-analytics-timeseries"),
     path("instructor/students/", InstructorStudentListView.as_view(), name="instructor-students"),
     path("courses/", CreateCourseView.as_view()),
     path("courses/<int:pk>/", CourseDetailView.as_view()),
     path("courses/<int:pk>/delete/", DeleteCourseView.as_view()),
     path("courses/<int:course_id>/publish/", PublishUnpublishCourseView.as_view()),
     path("courses/<int:course_id>/enroll/", EnrollCourseView.as_view()),
+    path("courses/<int:course_id>/enroll-cohort/", CohortEnrollView.as_view(), name="course-enroll-cohort"),
+    path("courses/<int:course_id>/clone/", CourseCloneView.as_view(), name="course-clone"),
     path("my-courses/", MyCoursesView.as_view()),
     path("courses/<int:course_id>/rate/", CourseRatingCreateView.as_view(), name="course-rate"),
     path("courses/<int:course_id>/ratings/", CourseRatingsListView.as_view(), name="course-ratings"),
@@ -69,6 +85,7 @@ urlpatterns = [
     path("courses/<int:course_id>/quizzes/", QuizListCreateView.as_view()),
     path("courses/<int:course_id>/quizzes/", QuizListCreateView.as_view()),
     path("quizzes/<int:quiz_id>/questions/", QuestionListCreateView.as_view()),
+    path("quizzes/<int:quiz_id>/questions/bulk/", QuestionBulkImportView.as_view(), name="question-bulk-import"),
     path("quizzes/<int:quiz_id>/attempt/", AttemptQuizView.as_view()),
     path("quizzes/<int:quiz_id>/results/", QuizResultsView.as_view()),
     
@@ -79,6 +96,10 @@ urlpatterns = [
     path("admin-api/dashboard/", AdminDashboardView.as_view()),
     path("admin-api/export-results/", ExportStudentResultsView.as_view()),
     path("admin-api/users/", AdminUserListView.as_view(), name="admin-user-list"),
+    path("admin-api/users/bulk-status/", AdminBulkUserStatusView.as_view(), name="admin-user-bulk-status"),
+    path("admin-api/users/import/", AdminUserImportView.as_view(), name="admin-user-import"),
+    path("admin-api/profiles/", AdminProfileListView.as_view(), name="admin-profile-list"),
+    path("admin-api/profiles/<str:profile_id>/", AdminProfileDownloadView.as_view(), name="admin-profile-download"),
 
     
     # Soft Delete
@@ -86,6 +107,7 @@ urlpatterns = [
     path("admin-api/users/<int:user_id>/reactivate/", AdminReactivateUserView.as_view()),
     path("admin-api/users/<int:user_id>/toggle-status/", AdminToggleUserStatusView.as_view()),
     path("admin-api/courses/<int:course_id>/deactivate/", AdminCourseDeactivateView.as_view()),
+    path("admin-api/courses/<int:course_id>/purge/", AdminCoursePurgeView.as_view(), name="admin-course-purge"),
     path("admin-api/courses/<int:course_id>/toggle-status/", CourseToggleStatusView.as_view()),
     
     # Notifications
@@ -104,4 +126,10 @@ urlpatterns = [
     path("wishlist/<int:wishlist_id>/", WishlistDeleteView.as_view(), name="wishlist-delete"),
     path("notes/", LectureNoteListCreateView.as_view(), name="notes-list-create"),
     path("notes/<int:note_id>/", LectureNoteUpdateDeleteView.as_view(), name="notes-update-delete"),
+
+    # Background jobs
+    path("jobs/<int:job_id>/", JobStatusView.as_view(), name="job-status"),
+
+    # Monitoring
+    path("metrics/", metrics_view, name="metrics"),
 ]
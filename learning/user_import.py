@@ -0,0 +1,241 @@
+"""
+Bulk user import from CSV or JSON lines.
+
+Each row needs username and email; password and role are optional (no
+password means an unusable one, to be set through a reset; role defaults to
+STUDENT). Rows are validated against each other and against the database a
+batch at a time, passwords are hashed across a process pool (PBKDF2 is
+CPU-bound, so threads would not help), and valid rows are inserted with one
+bulk_create per batch. A bad row is reported with its line number and never
+stops the rest of the import.
+
+The pool is for the import_users command and the run_jobs worker; the
+upload endpoint imports small files serially and hands the rest to a job.
+
+bulk_create sends no signals, so the platform counters are updated here.
+"""
+import csv
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from . import counters, jobs
+from .models import BackgroundJob, PlatformCounter, Role, User
+
+FORMATS = ("csv", "jsonl")
+FIELDS = ("username", "email", "password", "role")
+DEFAULT_ROLE = "STUDENT"
+BATCH_SIZE = 500
+
+# Below this many passwords a pool costs more than it saves
+POOL_THRESHOLD = 16
+
+
+def _init_worker():
+    import django
+    from django.apps import apps
+    if not apps.ready:  # spawn start method (Windows/macOS) re-imports everything
+        django.setup()
+
+
+def guess_format(filename):
+    """csv or jsonl from a file name, or None."""
+    extension = os.path.splitext(filename or "")[1].lower()
+    return {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl"}.get(extension)
+
+
+def parse(text, fmt):
+    """
+    Rows of an upload as (line number, dict) pairs; a line that cannot be
+    parsed becomes (line number, error message) instead.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        if reader.fieldnames:
+            reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+        # Line numbers count the header, like a spreadsheet
+        return [(index + 2, row) for index, row in enumerate(reader)]
+
+    rows = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            rows.append((line_number, "Not valid JSON"))
+            continue
+        rows.append((line_number, row if isinstance(row, dict) else "Expected a JSON object"))
+    return rows
+
+
+def hash_passwords(passwords, workers=None):
+    """make_password for every item (None gives an unusable password), in order."""
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(passwords) < POOL_THRESHOLD:
+        return [make_password(password) for password in passwords]
+    # Workers only hash, so the parent's open connection (and any transaction
+    # the caller is in) is left alone
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(make_password, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+class Importer:
+    """
+    Usage:
+        summary = Importer(workers=4).run(parse(text, "csv"))
+    """
+
+    def __init__(self, workers=None, batch_size=BATCH_SIZE, default_role=DEFAULT_ROLE, job=None):
+        self.workers = workers
+        self.job = job
+        self.batch_size = batch_size
+        self.default_role = default_role
+        self.roles = dict(Role.objects.values_list("name", "id"))  # resolved once
+        self.seen_usernames = set()
+        self.seen_emails = set()
+        self.errors = []
+        self.created = 0
+        self.deltas = {}
+
+    def run(self, rows):
+        """
+        Import parsed rows.
+
+        Returns:
+            {"total", "created", "failed", "errors": [{"line", "username", "errors"}]}
+        """
+        valid = []
+        for line, row in rows:
+            if isinstance(row, str):
+                self.error(line, None, {"row": [row]})
+                continue
+            cleaned = self.clean(line, row)
+            if cleaned:
+                valid.append(cleaned)
+
+        if self.job:
+            jobs.progress(self.job, 0, len(valid))
+        for start in range(0, len(valid), self.batch_size):
+            self.insert(valid[start:start + self.batch_size])
+            if self.job:
+                jobs.progress(self.job, min(start + self.batch_size, len(valid)))
+
+        PlatformCounter.objects.add(self.deltas)
+        self.errors.sort(key=lambda error: error["line"])
+        return {
+            "total": len(rows),
+            "created": self.created,
+            "failed": len(self.errors),
+            "errors": self.errors,
+        }
+
+    def error(self, line, username, errors):
+        self.errors.append({"line": line, "username": username, "errors": errors})
+
+    def clean(self, line, row):
+        """(line, values) for a row that passes the checks that need no query, else None."""
+        values = {field: str(row.get(field) or "").strip() for field in FIELDS}
+        values["password"] = row.get("password") or None  # passwords are taken verbatim
+        values["email"] = User.objects.normalize_email(values["email"])
+        errors = {}
+
+        if not values["username"]:
+            errors["username"] = ["This field is required."]
+        elif len(values["username"]) > User._meta.get_field("username").max_length:
+            errors["username"] = ["Too long."]
+        elif values["username"] in self.seen_usernames:
+            errors["username"] = ["Duplicate username in this file."]
+        try:
+            validate_email(values["email"])
+        except ValidationError:
+            errors["email"] = ["Enter a valid email address."]
+        else:
+            if values["email"].lower() in self.seen_emails:
+                errors["email"] = ["Duplicate email in this file."]
+        role = (values["role"] or self.default_role).upper()
+        if role not in self.roles:
+            errors["role"] = [f"Unknown role {role}."]
+        if values["password"] is not None and not isinstance(values["password"], str):
+            errors["password"] = ["Must be a string."]
+
+        if errors:
+            self.error(line, values["username"] or None, errors)
+            return None
+        self.seen_usernames.add(values["username"])
+        self.seen_emails.add(values["email"].lower())
+        values["role_id"] = self.roles[role]
+        return line, values
+
+    def insert(self, batch):
+        """Check one batch against existing users, hash its passwords and insert it."""
+        usernames = [values["username"] for _, values in batch]
+        emails = [values["email"] for _, values in batch]
+        taken_usernames, taken_emails = set(), set()
+        for username, email in User.objects.filter(
+            Q(username__in=usernames) | Q(email__in=emails)
+        ).values_list("username", "email"):
+            taken_usernames.add(username)
+            taken_emails.add(email)
+
+        fresh = []
+        for line, values in batch:
+            errors = {}
+            if values["username"] in taken_usernames:
+                errors["username"] = ["A user with that username already exists."]
+            if values["email"] in taken_emails:
+                errors["email"] = ["A user with that email already exists."]
+            if errors:
+                self.error(line, values["username"], errors)
+            else:
+                fresh.append((line, values))
+        if not fresh:
+            return
+
+        hashes = hash_passwords([values["password"] for _, values in fresh], self.workers)
+        users = [
+            (line, User(
+                username=values["username"],
+                email=values["email"],
+                password=hashed,
+                role_id=values["role_id"],
+            ))
+            for (line, values), hashed in zip(fresh, hashes)
+        ]
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create([user for _, user in users])
+        except IntegrityError:
+            # Someone registered one of these names since the check; insert one
+            # by one (save() sends the signals that count these rows)
+            for line, user in users:
+                try:
+                    with transaction.atomic():
+                        user.save(force_insert=True)
+                except IntegrityError:
+                    self.error(line, user.username, {"username": ["A user with that username or email already exists."]})
+                else:
+                    self.created += 1
+            return
+
+        for _, user in users:
+            for name in counters.memberships("User", {"role_id": user.role_id}):
+                self.deltas[name] = self.deltas.get(name, 0) + 1
+        self.created += len(users)
+
+
+def run_import_job(job):
+    params = job.params
+    try:
+        importer = Importer(default_role=params["role"], job=job)
+        return importer.run(parse(params["text"], params["format"]))
+    finally:
+        # The upload holds passwords; keep it no longer than the import needs
+        BackgroundJob.objects.filter(pk=job.pk).update(params={"format": params["format"], "role": params["role"]})
@@ -0,0 +1,58 @@
+"""
+Conditional GET Helpers
+Cheap ETag / Last-Modified validators so unchanged resources can answer 304.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+def build_etag(*parts):
+    """
+    Build a quoted ETag from version parts (ids, timestamps, counts).
+
+    Args:
+        *parts: Values that change whenever the representation changes
+
+    Returns:
+        Quoted ETag string
+    """
+    raw = ":".join("" if part is None else str(part) for part in parts)
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def not_modified(request, etag, last_modified=None, per_user=False):
+    """
+    Evaluate If-None-Match / If-Modified-Since against the given validators.
+
+    Args:
+        request: Incoming request
+        etag: Quoted ETag for the current representation
+        last_modified: datetime of the last change (optional)
+        per_user: True if the representation depends on the requesting user
+
+    Returns:
+        A 304 response carrying the validators, or None if the body must be sent
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified, per_user=per_user)
+    return response
+
+
+def set_validators(response, etag, last_modified=None, per_user=False):
+    """
+    Attach ETag / Last-Modified headers to a response.
+
+    Per-user representations are marked private and vary on the credentials
+    so shared caches never serve one user's lock status to another.
+    """
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    if per_user:
+        response["Cache-Control"] = "private, no-cache"
+        patch_vary_headers(response, ("Authorization", "Cookie"))
+    return response
@@ -0,0 +1,116 @@
+"""
+Custom Migration Operations
+Backend-aware schema operations for large, busy tables.
+"""
+from django.contrib.postgres.indexes import OpClass
+from django.db import NotSupportedError
+from django.db.migrations.operations import AddIndex, AlterField
+from django.db.models import Index
+
+
+def portable_index(index):
+    """
+    The index without PostgreSQL operator classes, for other backends.
+    """
+    if not any(isinstance(expression, OpClass) for expression in index.expressions):
+        return index
+    expressions = [
+        expression.get_source_expressions()[0] if isinstance(expression, OpClass) else expression
+        for expression in index.expressions
+    ]
+    return Index(*expressions, name=index.name, condition=index.condition)
+
+
+class AddIndexConcurrently(AddIndex):
+    """
+    Create an index without blocking writes.
+
+    On PostgreSQL this runs CREATE INDEX CONCURRENTLY (the migration must set
+    ``atomic = False``); other backends fall back to a plain CREATE INDEX so
+    development and test databases migrate the same way. Operator classes
+    (e.g. text_pattern_ops for LIKE 'abc%') only exist on PostgreSQL and are
+    dropped elsewhere.
+    """
+
+    def describe(self):
+        return "Concurrently create index %s on %s of model %s" % (
+            self.index.name,
+            "field(s) " + ", ".join(self.index.fields) if self.index.fields else "expression(s)",
+            self.model_name,
+        )
+
+    def _add_index(self, schema_editor, model, index):
+        if schema_editor.connection.vendor != "postgresql":
+            schema_editor.add_index(model, portable_index(index))
+            return
+        if schema_editor.connection.in_atomic_block:
+            raise NotSupportedError(
+                "CREATE INDEX CONCURRENTLY cannot run inside a transaction. "
+                "Set atomic = False on the migration."
+            )
+        schema_editor.add_index(model, index, concurrently=True)
+
+    def _remove_index(self, schema_editor, model, index):
+        if schema_editor.connection.vendor != "postgresql":
+            schema_editor.remove_index(model, portable_index(index))
+            return
+        schema_editor.remove_index(model, index, concurrently=True)
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            self._add_index(schema_editor, model, self.index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if self.allow_migrate_model(schema_editor.connection.alias, model):
+            self._remove_index(schema_editor, model, self.index)
+
+
+class RemoveFieldIndexConcurrently(AlterField):
+    """
+    AlterField that drops a field's own index (db_index=True -> False)
+    without blocking writes.
+
+    Django's RemoveIndexConcurrently only handles named Meta indexes; this
+    covers the implicit index of a ForeignKey. On PostgreSQL it runs DROP
+    INDEX CONCURRENTLY (the migration must set ``atomic = False``) and the
+    reverse rebuilds the index concurrently; other backends run a plain
+    AlterField.
+    """
+
+    def describe(self):
+        return "Concurrently drop the index of field %s on %s" % (self.name, self.model_name)
+
+    def _concurrently(self, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return False
+        if schema_editor.connection.in_atomic_block:
+            raise NotSupportedError(
+                "DROP INDEX CONCURRENTLY cannot run inside a transaction. "
+                "Set atomic = False on the migration."
+            )
+        return True
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if not self._concurrently(schema_editor):
+            return super().database_forwards(app_label, schema_editor, from_state, to_state)
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        column = model._meta.get_field(self.name).column
+        names = schema_editor._constraint_names(
+            model, [column], index=True, type_=Index.suffix,
+            exclude={index.name for index in model._meta.indexes},
+        )
+        for name in names:
+            schema_editor.execute(schema_editor._delete_index_sql(model, name, concurrently=True))
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if not self._concurrently(schema_editor):
+            return super().database_backwards(app_label, schema_editor, from_state, to_state)
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        field = model._meta.get_field(self.name)
+        schema_editor.execute(schema_editor._create_index_sql(model, fields=[field], concurrently=True))
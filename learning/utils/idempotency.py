@@ -0,0 +1,98 @@
+"""
+Idempotency-Key Support
+Replays the stored response when a client retries a POST with the same key.
+"""
+import functools
+import hashlib
+import json
+
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# How long a finished response is replayable, and how long an in-flight
+# request holds its key before a retry may run it again.
+RESPONSE_TTL = 60 * 60 * 24
+LOCK_TTL = 60
+
+_IN_PROGRESS = "__in_progress__"
+
+
+def _cache_key(request, key):
+    raw = f"{request.user.pk}:{request.method}:{request.path}:{key}"
+    return "idempotency:" + hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _fingerprint(request):
+    payload = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def idempotent(view_method):
+    """
+    Decorator for APIView handlers (post/put/patch).
+
+    Without an Idempotency-Key header the handler runs normally. With one, the
+    first request runs and its non-5xx response is stored per user, path and
+    key. Retries get the stored response back with Idempotent-Replayed: true.
+    A retry that arrives while the first request is still running gets 409.
+    Reusing a key with a different body gets 422.
+    """
+    @functools.wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view_method(self, request, *args, **kwargs)
+
+        if len(key) > 255:
+            return Response(
+                {"error": f"{IDEMPOTENCY_HEADER} must be at most 255 characters"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        cache_key = _cache_key(request, key)
+        fingerprint = _fingerprint(request)
+
+        if not cache.add(cache_key, _IN_PROGRESS, LOCK_TTL):
+            stored = cache.get(cache_key)
+            if stored == _IN_PROGRESS:
+                return Response(
+                    {"error": "A request with this Idempotency-Key is already in progress"},
+                    status=status.HTTP_409_CONFLICT
+                )
+            if stored is not None:
+                if stored["fingerprint"] != fingerprint:
+                    return Response(
+                        {"error": "Idempotency-Key was already used with a different request body"},
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                    )
+                response = Response(stored["data"], status=stored["status"])
+                response[REPLAYED_HEADER] = "true"
+                return response
+            # The entry expired between add() and get(); claim it again
+            cache.add(cache_key, _IN_PROGRESS, LOCK_TTL)
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            cache.delete(cache_key)
+            raise
+
+        if response.status_code >= 500:
+            cache.delete(cache_key)
+        else:
+            cache.set(
+                cache_key,
+                {
+                    "fingerprint": fingerprint,
+                    "status": response.status_code,
+                    "data": getattr(response, "data", None),
+                },
+                RESPONSE_TTL
+            )
+        return response
+
+    return wrapper
@@ -0,0 +1,205 @@
+"""
+N+1 Query Detection
+Fingerprints statements by normalized SQL template plus the project line that
+issued them, and flags templates that repeat more than a threshold.
+"""
+import inspect
+import logging
+import os
+import re
+import sys
+import warnings
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger("learning.performance")
+
+DEFAULTS = {
+    "ENABLED": False,
+    "THRESHOLD": 5,
+    "MODE": "warn",  # warn | log | raise
+}
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+# Execute-wrapper and middleware plumbing; never the line that issued the query
+_WRAPPER_FILES = frozenset(
+    os.path.abspath(path) for path in (
+        __file__,
+        os.path.join(os.path.dirname(__file__), "query_stats.py"),
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), "instrumentation.py"),
+        os.path.join(os.path.dirname(os.path.dirname(__file__)), "middleware.py"),
+    )
+)
+_ORM_DIR = f"{os.sep}django{os.sep}db{os.sep}"
+
+
+class NPlusOneError(AssertionError):
+    """Raised in "raise" mode; an AssertionError so tests fail, not error."""
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, "N_PLUS_ONE_DETECTION", {})}
+
+
+def normalize_sql(sql):
+    """
+    Reduce a statement to its template: literals and placeholders become ?,
+    IN lists of any length collapse to (?), whitespace is squeezed.
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def _project_root():
+    return os.path.abspath(str(getattr(settings, "BASE_DIR", os.getcwd())))
+
+
+def _is_project_frame(filename, root):
+    return (
+        filename.startswith(root)
+        and filename not in _WRAPPER_FILES
+        and "site-packages" not in filename
+    )
+
+
+@lru_cache(maxsize=None)
+def _class_site(cls, root):
+    """(file, line, name) of a class defined in the project, else None."""
+    filename = getattr(sys.modules.get(cls.__module__), "__file__", None)
+    if not filename or not _is_project_frame(os.path.abspath(filename), root):
+        return None
+    try:
+        lineno = inspect.getsourcelines(cls)[1]
+    except (OSError, TypeError):
+        lineno = 0
+    return os.path.abspath(filename), lineno, cls.__name__
+
+
+class Offender:
+    __slots__ = ("template", "call_site", "count", "stack")
+
+    def __init__(self, template, call_site, stack):
+        self.template = template
+        self.call_site = call_site
+        self.count = 0
+        self.stack = stack
+
+    def describe(self):
+        filename, lineno, function = self.call_site
+        lines = [
+            f"N+1 query: {self.count} x {self.template[:200]}",
+            f"  from {os.path.relpath(filename, _project_root())}:{lineno} in {function}",
+        ]
+        lines += [f"    {frame}" for frame in self.stack]
+        return "\n".join(lines)
+
+
+class NPlusOneDetector:
+    """
+    execute_wrapper that groups statements by (template, call site).
+
+    The call site is the innermost frame inside the project (not Django, DRF
+    or other installed packages, nor the middleware); its project stack is
+    kept the first time a fingerprint is seen. Library code running on a
+    project object, such as DRF rendering a project serializer for a generic
+    view, counts as that object's class, so each serializer keeps its own
+    call site.
+    """
+
+    def __init__(self, threshold=None):
+        self.threshold = get_config()["THRESHOLD"] if threshold is None else threshold
+        self.fingerprints = {}
+        self._root = _project_root()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.record(sql)
+        return execute(sql, params, many, context)
+
+    def record(self, sql):
+        call_site, frame = self._call_site(sys._getframe(1))
+        key = (normalize_sql(sql), call_site)
+        offender = self.fingerprints.get(key)
+        if offender is None:
+            offender = self.fingerprints[key] = Offender(key[0], call_site, self._stack(frame))
+        offender.count += 1
+
+    def _call_site(self, frame):
+        while frame:
+            filename = frame.f_code.co_filename
+            if _is_project_frame(filename, self._root):
+                return (filename, frame.f_lineno, frame.f_code.co_name), frame
+            if filename not in _WRAPPER_FILES and _ORM_DIR not in filename:
+                owner = frame.f_locals.get("self")
+                site = owner is not None and _class_site(type(owner), self._root)
+                if site:
+                    return (site[0], site[1], f"{site[2]}.{frame.f_code.co_name}"), frame
+            frame = frame.f_back
+        return ("<unknown>", 0, "<unknown>"), None
+
+    def _stack(self, frame):
+        stack = []
+        while frame:
+            filename = frame.f_code.co_filename
+            if _is_project_frame(filename, self._root):
+                relative = os.path.relpath(filename, self._root)
+                stack.append(f"{relative}:{frame.f_lineno} in {frame.f_code.co_name}")
+            frame = frame.f_back
+        return stack
+
+    @property
+    def offenders(self):
+        return sorted(
+            (o for o in self.fingerprints.values() if o.count > self.threshold),
+            key=lambda o: -o.count,
+        )
+
+    def report(self, mode=None, label=""):
+        """Warn, log or raise for every offender according to mode."""
+        offenders = self.offenders
+        if not offenders:
+            return offenders
+        mode = mode or get_config()["MODE"]
+        message = "\n".join(o.describe() for o in offenders)
+        if label:
+            message = f"{label}\n{message}"
+        if mode == "raise":
+            raise NPlusOneError(message)
+        if mode == "warn":
+            warnings.warn(message, NPlusOneWarning, stacklevel=2)
+            return offenders
+        logger.warning(message, extra={"n_plus_one": [
+            {"template": o.template, "call_site": f"{o.call_site[0]}:{o.call_site[1]}", "count": o.count}
+            for o in offenders
+        ]})
+        return offenders
+
+
+@contextmanager
+def detect_n_plus_one(threshold=None, mode="raise", using=None):
+    """
+    Fail (or warn) if the enclosed block repeats a query template from the
+    same line more than threshold times.
+
+    Usage:
+        with detect_n_plus_one(threshold=3):
+            self.client.get("/api/my-courses/")
+    """
+    detector = NPlusOneDetector(threshold)
+    with connections[using or DEFAULT_DB_ALIAS].execute_wrapper(detector):
+        yield detector
+    detector.report(mode)
@@ -0,0 +1,69 @@
+"""
+Query Statistics
+Counts, times and sizes the SQL a block of code runs via connection.execute_wrapper.
+"""
+import time
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class QueryStats:
+    """
+    execute_wrapper callable that accumulates per-block query statistics.
+
+    Attributes:
+        count: Statements executed
+        duration: Total seconds spent in the database
+        rows: Rows returned/affected, as reported by the driver cursor.
+            SQLite does not report rowcount for SELECTs, so there this only
+            covers writes; rows_reported is False when nothing was reported.
+        slowest: (seconds, sql) of the slowest statement
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.rows = 0
+        self.rows_reported = False
+        self.slowest = (0.0, None)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, time.perf_counter() - start, getattr(context.get("cursor"), "rowcount", -1))
+
+    def record(self, sql, elapsed, rowcount=-1):
+        self.count += 1
+        self.duration += elapsed
+        if elapsed > self.slowest[0]:
+            self.slowest = (elapsed, sql)
+        if rowcount is not None and rowcount >= 0:
+            self.rows += rowcount
+            self.rows_reported = True
+
+    def as_dict(self):
+        return {
+            "queries": self.count,
+            "db_ms": round(self.duration * 1000, 2),
+            "rows": self.rows if self.rows_reported else None,
+            "slowest_ms": round(self.slowest[0] * 1000, 2),
+            "slowest_sql": self.slowest[1],
+        }
+
+
+@contextmanager
+def capture_query_stats(using=None):
+    """
+    Collect QueryStats for the enclosed block.
+
+    Usage:
+        with capture_query_stats() as stats:
+            client.get(url)
+        stats.count, stats.duration
+    """
+    stats = QueryStats()
+    with connections[using or DEFAULT_DB_ALIAS].execute_wrapper(stats):
+        yield stats
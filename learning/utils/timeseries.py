@@ -0,0 +1,110 @@
+"""
+Time-Series Helpers
+Bucket names, date-range parsing and gap filling shared by the trend endpoints.
+"""
+from datetime import date, datetime, time, timedelta
+
+from django.utils import timezone
+
+BUCKETS = ("day", "week", "month")
+
+# Range shown when the client gives no start date
+DEFAULT_PERIODS = {"day": 30, "week": 26, "month": 12}
+
+# Longest series a single request may ask for
+MAX_PERIODS = 750
+
+
+def day_start(day):
+    """Aware datetime at the start of day in the current time zone."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def day_range(field, start, end):
+    """Filter kwargs for field falling on days [start, end]."""
+    return {f"{field}__gte": day_start(start), f"{field}__lt": day_start(end + timedelta(days=1))}
+
+
+def window(params, field):
+    """
+    Filter kwargs for field within the optional start / end query params
+    (ISO dates, inclusive); {} when neither is given. Constant bounds let
+    PostgreSQL prune time-partitioned tables.
+
+    Raises:
+        ValueError: with a message suitable for a 400 response
+    """
+    try:
+        start = date.fromisoformat(params["start"]) if params.get("start") else None
+        end = date.fromisoformat(params["end"]) if params.get("end") else None
+    except ValueError:
+        raise ValueError("start and end must be dates (YYYY-MM-DD)")
+    if start and end and start > end:
+        raise ValueError("start must not be after end")
+    bounds = {}
+    if start:
+        bounds[f"{field}__gte"] = day_start(start)
+    if end:
+        bounds[f"{field}__lt"] = day_start(end + timedelta(days=1))
+    return bounds
+
+
+def bucket_start(day, bucket):
+    """First day of the bucket containing day (weeks start on Monday, like Trunc)."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(day, bucket):
+    if bucket == "week":
+        return day + timedelta(days=7)
+    if bucket == "month":
+        return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return day + timedelta(days=1)
+
+
+def periods(start, end, bucket):
+    """Start dates of every bucket overlapping [start, end]."""
+    result = []
+    current = bucket_start(start, bucket)
+    while current <= end:
+        result.append(current)
+        current = next_bucket(current, bucket)
+    return result
+
+
+def parse_range(params, prefix=""):
+    """
+    Read bucket, start and end (ISO dates, inclusive) from query params.
+
+    Args:
+        params: request.query_params
+        prefix: key prefix, e.g. "compare_" for a second period
+
+    Returns:
+        (bucket, start, end)
+
+    Raises:
+        ValueError: with a message suitable for a 400 response
+    """
+    bucket = params.get("bucket", "day")
+    if bucket not in BUCKETS:
+        raise ValueError(f"bucket must be one of: {', '.join(BUCKETS)}")
+    try:
+        end = date.fromisoformat(params[f"{prefix}end"]) if params.get(f"{prefix}end") else timezone.localdate()
+        if params.get(f"{prefix}start"):
+            start = date.fromisoformat(params[f"{prefix}start"])
+        else:
+            start = periods(end, end, bucket)[0]
+            for _ in range(DEFAULT_PERIODS[bucket] - 1):
+                start = bucket_start(start - timedelta(days=1), bucket)
+    except ValueError:
+        raise ValueError(f"{prefix}start and {prefix}end must be dates (YYYY-MM-DD)")
+    if start > end:
+        raise ValueError(f"{prefix}start must not be after {prefix}end")
+    if (end - start).days // {"day": 1, "week": 7, "month": 28}[bucket] > MAX_PERIODS:
+        raise ValueError(f"at most {MAX_PERIODS} {bucket} buckets per request; use a larger bucket")
+    return bucket, start, end
@@ -13,6 +13,8 @@ from .courses import (
     CourseDetailView,
     PublishUnpublishCourseView,
     EnrollCourseView,
+    CohortEnrollView,
+    CourseCloneView,
     MyCoursesView,
     CourseToggleStatusView
 )
@@ -24,11 +26,13 @@ from .lessons import (
 from .quizzes import (
     QuizListCreateView,
     QuestionListCreateView,
+    QuestionBulkImportView,
     AttemptQuizView,
     QuizResultsView
 )
 from .analytics import (
     InstructorAnalyticsView,
+    InstructorTrendsView,
     InstructorStudentListView
 )
 from .ratings import (
@@ -55,6 +59,8 @@ from .interactions import (
     LectureNoteListCreateView,
     LectureNoteUpdateDeleteView
 )
+from .jobs import JobStatusView
+from .metrics import metrics_view
 
 __all__ = [
     # Authentication
@@ -70,6 +76,8 @@ __all__ = [
     'CourseDetailView',
     'PublishUnpublishCourseView',
     'EnrollCourseView',
+    'CohortEnrollView',
+    'CourseCloneView',
     'MyCoursesView',
     'CourseToggleStatusView',
     
@@ -81,11 +89,13 @@ __all__ = [
     # Quiz Management
     'QuizListCreateView',
     'QuestionListCreateView',
+    'QuestionBulkImportView',
     'AttemptQuizView',
     'QuizResultsView',
     
     # Analytics
     'InstructorAnalyticsView',
+    'InstructorTrendsView',
     'InstructorStudentListView',
     
     # Ratings
@@ -112,4 +122,10 @@ __all__ = [
     'WishlistDeleteView',
     'LectureNoteListCreateView',
     'LectureNoteUpdateDeleteView',
+
+    # Background jobs
+    'JobStatusView',
+
+    # Monitoring
+    'metrics_view',
 ]
@@ -6,12 +6,22 @@ from rest_framework.permissions import IsAuthenticated
 
 from ..models import Course, Enrollment, Lesson, LessonProgress, QuizAttempt
 from ..permissions import IsInstructor
+from ..trends import instructor_trends, previous_period
+from ..utils import timeseries
 
 
 class InstructorAnalyticsView(APIView):
+    """
+    Enrollment, completion and score summary per course of the instructor.
+    ?start / ?end (dates, inclusive) limit the quiz attempts counted.
+    """
     permission_classes = [IsAuthenticated, IsInstructor]
 
     def get(self, request):
+        try:
+            window = timeseries.window(request.query_params, "attempted_at")
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         instructor = request.user
         courses = Course.objects.filter(instructor=instructor)
 
@@ -21,7 +31,7 @@ class InstructorAnalyticsView(APIView):
             enrollments = Enrollment.objects.filter(course=course).count()
 
             attempts = QuizAttempt.objects.filter(
-                quiz__course=course
+                quiz__course=course, **window
             )
 
             completed = attempts.filter(is_passed=True).count()
@@ -47,6 +57,41 @@ class InstructorAnalyticsView(APIView):
         })
 
 
+class InstructorTrendsView(APIView):
+    """
+    Enrollments and completions (passed quiz attempts) over time for the
+    instructor's courses.
+
+    Query params:
+        bucket: day | week | month (default day)
+        start, end: ISO dates, inclusive (default: the last 30 days / 26 weeks / 12 months)
+        course: comma-separated course ids to restrict to
+        compare: "previous" for the preceding period of the same length, or
+        compare_start / compare_end for any other period
+    """
+    permission_classes = [IsAuthenticated, IsInstructor]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            bucket, start, end = timeseries.parse_range(params)
+            compare = None
+            if params.get("compare") == "previous":
+                compare = previous_period(start, end)
+            elif params.get("compare_start"):
+                _, compare_start, compare_end = timeseries.parse_range(params, prefix="compare_")
+                compare = (compare_start, compare_end)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            course_ids = sorted({int(value) for value in params.get("course", "").split(",") if value.strip()})
+        except ValueError:
+            return Response({"error": "course must be comma-separated ids"}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = instructor_trends(request.user.id, bucket, (start, end), compare, course_ids)
+        return Response(data)
+
+
 class InstructorStudentListView(APIView):
     """
     List all students enrolled in the instructor's courses with progress.
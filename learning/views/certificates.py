@@ -8,6 +8,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
+from ..metrics import CERTIFICATE_RENDER
 from ..models import Course, QuizAttempt
 from ..utils.certificate_generator import generate_certificate_pdf
 
@@ -38,11 +39,12 @@ class GenerateCertificateView(APIView):
 
         # 2. Generate PDF certificate
         try:
-            pdf_buffer = generate_certificate_pdf(
-                student=user,
-                course=course,
-                completion_date=passed_attempt.attempted_at
-            )
+            with CERTIFICATE_RENDER.time():
+                pdf_buffer = generate_certificate_pdf(
+                    student=user,
+                    course=course,
+                    completion_date=passed_attempt.attempted_at
+                )
 
             # 3. Create HTTP response with PDF
             response = HttpResponse(pdf_buffer, content_type='application/pdf')
@@ -1,16 +1,22 @@
 from typing import List, Any
 from django.db.models import QuerySet
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, BasePermission
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.request import Request
 from rest_framework.serializers import BaseSerializer
 
+from .. import cloning, cohorts, jobs, retirement
 from ..models import Course, Enrollment, QuizAttempt
 from ..serializers import CourseSerializer, EnrollmentSerializer
-from ..permissions import IsInstructor, IsStudent
+from ..permissions import IsAdmin, IsInstructor, IsStudent
+from ..trends import invalidate_instructor_trends
+from ..utils.conditional import build_etag, not_modified, set_validators
+from ..utils.idempotency import idempotent
 
 
 class CreateCourseView(generics.ListCreateAPIView):
@@ -41,6 +47,10 @@ class CreateCourseView(generics.ListCreateAPIView):
 class DeleteCourseView(generics.DestroyAPIView):
     """
     Delete a course (Instructor only).
+
+    The course, its lessons and quizzes are soft-deleted at once; enrollments,
+    attempts and the rest are purged by a background job (202 with the job
+    to poll), so large courses go without long locks.
     """
     permission_classes = [IsAuthenticated, IsInstructor]
     queryset = Course.objects.all()
@@ -48,6 +58,12 @@ class DeleteCourseView(generics.DestroyAPIView):
     def get_queryset(self) -> QuerySet[Course]:
         return Course.objects.filter(instructor=self.request.user)
 
+    def destroy(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        course = self.get_object()
+        retirement.deactivate(course)
+        job = jobs.submit('purge_course', {'course_id': course.id}, user=request.user)
+        return Response({'job': jobs.describe(job)}, status=status.HTTP_202_ACCEPTED)
+
 
 class PublishUnpublishCourseView(APIView):
     """
@@ -86,17 +102,35 @@ class PublishUnpublishCourseView(APIView):
 class EnrollCourseView(APIView):
     """
     Student enrolls in a course.
+    Retries with the same Idempotency-Key header replay the first response.
     """
     permission_classes = [IsAuthenticated, IsStudent]
 
+    @idempotent
     def post(self, request: Request, course_id: int) -> Response:
-        course = get_object_or_404(Course, pk=course_id, is_published=True)  # Students can only enroll if published
+        course = get_object_or_404(
+            Course.objects.select_related('instructor'),
+            pk=course_id,
+            is_published=True  # Students can only enroll if published
+        )
         user = request.user
-        
-        if Enrollment.objects.filter(student=user, course=course).exists():
-            return Response({'error': 'Already enrolled'}, status=status.HTTP_400_BAD_REQUEST)
 
-        enrollment = Enrollment.objects.create(student=user, course=course)
+        # Single conflict-ignoring insert; the unique (student, course) pair
+        # makes concurrent enrollments safe
+        enrolled_at = timezone.now()
+        enrollment_id = Enrollment.objects.enroll(user.id, course.id, enrolled_at)
+        if enrollment_id is None:
+            return Response({'error': 'Already enrolled'}, status=status.HTTP_400_BAD_REQUEST)
+        # The raw insert sends no post_save, so refresh the instructor's trends here
+        invalidate_instructor_trends(course.instructor_id)
+
+        enrollment = Enrollment(
+            id=enrollment_id,
+            student=user,
+            course=course,
+            is_active=True,
+            enrolled_at=enrolled_at
+        )
         
         # Send real-time notification
         from ..notifications import send_notification
@@ -114,14 +148,117 @@ class EnrollCourseView(APIView):
         return Response(EnrollmentSerializer(enrollment).data, status=status.HTTP_201_CREATED)
 
 
+class CohortEnrollView(APIView):
+    """
+    Instructor (own courses) or admin enrolls a list of students at once.
+
+    Body: "students": ids, usernames or emails, or a multipart "file" with
+    one per line (CSV, first column). "background": true runs it as a job
+    and answers 202 with the job to poll; larger cohorts always do.
+    """
+    permission_classes = [IsAuthenticated, IsInstructor | IsAdmin]
+    parser_classes = (JSONParser, MultiPartParser, FormParser)
+
+    MAX_STUDENTS = 100000
+    # Above this many students the request never waits for the enrollment
+    BACKGROUND_THRESHOLD = 2000
+
+    def post(self, request: Request, course_id: int) -> Response:
+        courses = Course.objects.select_related('instructor')
+        if request.user.role.name != "ADMIN":
+            courses = courses.filter(instructor=request.user)
+        course = get_object_or_404(courses, pk=course_id)
+
+        upload = request.FILES.get('file')
+        if upload is not None:
+            try:
+                students = cohorts.parse_csv(upload.read().decode('utf-8-sig'))
+            except UnicodeDecodeError:
+                return Response({'error': 'The file must be UTF-8 encoded'}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            students = request.data.get('students')
+            if not isinstance(students, list):
+                return Response(
+                    {'error': "Give 'students' as a list of ids, usernames or emails, or upload a 'file'"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            students = [str(student) for student in students]
+        if len(students) > self.MAX_STUDENTS:
+            return Response(
+                {'error': f'At most {self.MAX_STUDENTS} students per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        background = str(request.data.get('background', '')).lower() in ('1', 'true')
+        if background or len(students) > self.BACKGROUND_THRESHOLD:
+            job = jobs.submit('enroll_cohort', {'course_id': course.id, 'students': students}, user=request.user)
+            return Response({'job': jobs.describe(job)}, status=status.HTTP_202_ACCEPTED)
+        return Response(cohorts.enroll_cohort(course, students), status=status.HTTP_200_OK)
+
+
+class CourseCloneView(APIView):
+    """
+    Copy a course with its lessons, quizzes and questions into a new,
+    unpublished course (see learning/cloning.py).
+
+    Instructors clone their own courses; an admin's copy stays with the
+    original instructor. Body: optional "title"; "background": true runs
+    it as a job and answers 202, as do courses above BACKGROUND_THRESHOLD rows.
+    """
+    permission_classes = [IsAuthenticated, IsInstructor | IsAdmin]
+
+    BACKGROUND_THRESHOLD = 5000
+
+    def post(self, request: Request, course_id: int) -> Response:
+        courses = Course.objects.select_related('instructor')
+        if request.user.role.name != "ADMIN":
+            courses = courses.filter(instructor=request.user)
+        course = get_object_or_404(courses, pk=course_id)
+
+        title = str(request.data.get('title') or '').strip() or None
+        background = str(request.data.get('background', '')).lower() in ('1', 'true')
+        if not background:
+            background = sum(cloning.course_size(course).values()) > self.BACKGROUND_THRESHOLD
+        if background:
+            job = jobs.submit(
+                'clone_course',
+                {'course_id': course.id, 'title': title, 'instructor_id': course.instructor_id},
+                user=request.user,
+            )
+            return Response({'job': jobs.describe(job)}, status=status.HTTP_202_ACCEPTED)
+
+        result = cloning.clone_course(course, title=title, instructor=course.instructor)
+        copy = Course.objects.get(pk=result['course_id'])
+        return Response({**result, 'course': CourseSerializer(copy).data}, status=status.HTTP_201_CREATED)
+
+
 class CourseDetailView(generics.RetrieveAPIView):
     """
     Get course details.
+    Supports conditional GET (ETag / Last-Modified) from the course's and its
+    instructor's updated_at, since the body carries the instructor's name.
     """
     queryset = Course.objects.filter(is_active=True)
     serializer_class = CourseSerializer
     permission_classes = [IsAuthenticated]
 
+    def retrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        # Validators come from a single indexed lookup, before the row is loaded
+        pk = kwargs.get("pk")
+        stamps = self.get_queryset().filter(pk=pk).values_list("updated_at", "instructor__updated_at").first()
+        if stamps is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        course_updated_at, instructor_updated_at = stamps
+        updated_at = max(course_updated_at, instructor_updated_at)
+        etag = build_etag("course", pk, course_updated_at.isoformat(), instructor_updated_at.isoformat())
+        cached = not_modified(request, etag, updated_at)
+        if cached is not None:
+            return cached
+
+        response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, updated_at)
+
 
 class MyCoursesView(APIView):
     """
@@ -183,11 +320,13 @@ class CourseToggleStatusView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        # Toggle Logic
+        # Toggle Logic; lessons and quizzes follow the course
         previous_status = "Active" if course.is_active else "Inactive"
-        course.is_active = not course.is_active
-        course.save()
-        
+        if course.is_active:
+            retirement.deactivate(course)
+        else:
+            retirement.restore(course)
+
         new_status = "Active" if course.is_active else "Inactive"
         action = "activated" if course.is_active else "deactivated"
 
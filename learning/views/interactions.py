@@ -75,7 +75,12 @@ class LectureNoteListCreateView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        notes = LectureNote.objects.filter(student=request.user, lesson_id=lesson_id)
+        notes = (
+            LectureNote.objects
+            .filter(student=request.user, lesson_id=lesson_id)
+            .select_related('lesson')
+            .defer('lesson__content')
+        )
         serializer = LectureNoteSerializer(notes, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
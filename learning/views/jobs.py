@@ -0,0 +1,23 @@
+from django.shortcuts import get_object_or_404
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .. import jobs
+from ..models import BackgroundJob
+
+
+class JobStatusView(APIView):
+    """
+    Progress and result of a background job (see learning/jobs.py).
+    Visible to the user who started it and to admins.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        queryset = BackgroundJob.objects.all()
+        if request.user.role.name != "ADMIN":
+            queryset = queryset.filter(created_by=request.user)
+        job = get_object_or_404(queryset, id=job_id)
+        return Response(jobs.describe(job), status=status.HTTP_200_OK)
@@ -1,3 +1,5 @@
+from django.db.models import Count, Max
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 from rest_framework import generics, status
@@ -8,6 +10,8 @@ from rest_framework.permissions import IsAuthenticated
 from ..models import Course, Lesson, Enrollment, LessonProgress
 from ..serializers import LessonSerializer
 from ..permissions import IsInstructor, IsStudent
+from ..structure import get_course_structure
+from ..utils.conditional import build_etag, not_modified, set_validators
 
 
 class LessonListCreateView(generics.ListCreateAPIView):
@@ -23,10 +27,37 @@ class LessonListCreateView(generics.ListCreateAPIView):
         return [IsAuthenticated()]
 
     def list(self, request, course_id):
-        lessons = Lesson.objects.filter(course_id=course_id).order_by('lesson_order')
+        user = request.user
+
+        # Lock status is per-user, so the validator includes the user's progress version
+        lesson_version = Lesson.objects.filter(course_id=course_id).aggregate(
+            count=Count('id'), last=Max('updated_at')
+        )
+        progress_version = LessonProgress.objects.filter(
+            enrollment__student=user,
+            enrollment__course_id=course_id,
+            completed_at__isnull=False
+        ).aggregate(count=Count('id'), last=Max('completed_at'))
+        etag = build_etag(
+            "lessons", course_id, lesson_version['count'], lesson_version['last'],
+            user.id, progress_version['count'], progress_version['last']
+        )
+        last_modified = max(
+            (ts for ts in (lesson_version['last'], progress_version['last']) if ts),
+            default=None
+        )
+        cached = not_modified(request, etag, last_modified, per_user=True)
+        if cached is not None:
+            return cached
+
+        lessons = (
+            Lesson.objects
+            .filter(course_id=course_id)
+            .only('id', 'title', 'lesson_order')
+            .order_by('lesson_order', 'id')
+        )
         
         # Get progress if enrolled
-        user = request.user
         progress_ids = set()
         
         # Optimize: get enrollment and progress in minimal queries
@@ -39,28 +70,22 @@ class LessonListCreateView(generics.ListCreateAPIView):
                  ).values_list('lesson_id', flat=True)
              )
 
+        # Locking is decided against the cached course structure
+        structure = get_course_structure(course_id)
+        locked_ids = structure.locked_lesson_ids(progress_ids)
+
         data = []
-        prev_completed = True
-        total_lessons = len(lessons)
-
-        for i, lesson in enumerate(lessons):
-            is_completed = lesson.id in progress_ids
-            is_locked = not prev_completed
-            is_final = (i == total_lessons - 1)
-            
+        for lesson in lessons:
             data.append({
                 "id": lesson.id,
                 "title": lesson.title,
                 "lesson_order": lesson.lesson_order,
-                "is_completed": is_completed,
-                "is_locked": is_locked,
-                "is_final": is_final
+                "is_completed": lesson.id in progress_ids,
+                "is_locked": lesson.id in locked_ids,
+                "is_final": structure.is_final(lesson.id)
             })
-            
-            if not is_completed:
-                prev_completed = False
 
-        return Response(data)
+        return set_validators(Response(data), etag, last_modified, per_user=True)
 
     def perform_create(self, serializer):
         course_id = self.kwargs.get('course_id')
@@ -71,51 +96,59 @@ class LessonListCreateView(generics.ListCreateAPIView):
 class LessonDetailView(generics.RetrieveAPIView):
     """
     Get lesson content.
+    Supports conditional GET so unchanged content is not re-sent.
+    This is the only endpoint that loads Lesson.content.
     """
-    queryset = Lesson.objects.all()
+    queryset = Lesson.objects.with_content()
     serializer_class = LessonSerializer
     permission_classes = [IsAuthenticated]
 
+    def retrieve(self, request, *args, **kwargs):
+        # Validators come from (id, updated_at) without loading content
+        pk = kwargs.get('pk')
+        updated_at = Lesson.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = build_etag("lesson", pk, updated_at.isoformat())
+        cached = not_modified(request, etag, updated_at)
+        if cached is not None:
+            return cached
+
+        response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, etag, updated_at)
+
 
 class CompleteLessonView(APIView):
     permission_classes = [IsAuthenticated, IsStudent]
 
     def post(self, request, lesson_id):
         user = request.user
-        lesson = get_object_or_404(Lesson, pk=lesson_id)
-
-        enrollment = get_object_or_404(
-            Enrollment,
-            student=user,
-            course=lesson.course
+        lesson = get_object_or_404(
+            Lesson.objects.only('id', 'title', 'course_id'),
+            pk=lesson_id
         )
 
-        # Enforce lesson order ONLY
-        prev_lesson = Lesson.objects.filter(
-            course=lesson.course,
-            lesson_order=lesson.lesson_order - 1
-        ).first()
-
-        if prev_lesson:
-            completed = LessonProgress.objects.filter(
-                enrollment=enrollment,
-                lesson=prev_lesson,
-                completed_at__isnull=False
-            ).exists()
-
-            if not completed:
-                return Response(
-                    {"error": "Complete previous lesson first."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-
-        # Mark lesson completed
-        progress, _ = LessonProgress.objects.get_or_create(
-            enrollment=enrollment,
-            lesson=lesson
+        # Enforce lesson order ONLY (against the cached structure, so gaps in
+        # lesson_order do not skip the check). The enrollment check, the
+        # predecessor check and the write are a single upsert statement.
+        prev_lesson_id = get_course_structure(lesson.course_id, lesson.id).previous_lesson_id(lesson.id)
+        progress_id = LessonProgress.objects.complete(
+            student_id=user.id,
+            course_id=lesson.course_id,
+            lesson_id=lesson.id,
+            completed_at=timezone.now(),
+            previous_lesson_id=prev_lesson_id
         )
-        progress.completed_at = timezone.now()
-        progress.save()
+
+        if progress_id is None:
+            # Nothing written: work out why (rare path, not on the hot path)
+            if not Enrollment.objects.filter(student=user, course_id=lesson.course_id).exists():
+                raise Http404("No Enrollment matches the given query.")
+            return Response(
+                {"error": "Complete previous lesson first."},
+                status=status.HTTP_403_FORBIDDEN
+            )
 
         # Send notification
         from ..notifications import send_notification
@@ -123,7 +156,7 @@ class CompleteLessonView(APIView):
             user_id=user.id,
             notification_type='LESSON_COMPLETE',
             message=f'You completed "{lesson.title}"!',
-            data={'lesson_id': lesson.id, 'course_id': lesson.course.id}
+            data={'lesson_id': lesson.id, 'course_id': lesson.course_id}
         )
 
         return Response(
@@ -0,0 +1,30 @@
+"""
+Prometheus Metrics Endpoint
+"""
+import hmac
+
+from django.http import HttpResponse, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+
+from .. import metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus text exposition of learning.metrics. A plain Django view so
+    scrapes skip DRF authentication; they must send METRICS["TOKEN"], and
+    without a configured token nothing is served.
+    """
+    config = metrics.get_config()
+    if not config["ENABLED"]:
+        return HttpResponse(status=404)
+    token = config["TOKEN"]
+    if not token:
+        return HttpResponseForbidden("Set METRICS_TOKEN to expose metrics")
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    if not hmac.compare_digest(supplied, token):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type=CONTENT_TYPE)
@@ -7,7 +7,8 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import serializers
 
-from ..models import Notification
+from .. import archive
+from ..models import ArchiveSegment, Notification
 
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -21,6 +22,7 @@ class NotificationSerializer(serializers.ModelSerializer):
 class NotificationListView(generics.ListAPIView):
     """
     GET: List all notifications for the authenticated user.
+    ?include_archived=true adds notifications moved to the archive.
     """
     serializer_class = NotificationSerializer
     permission_classes = [IsAuthenticated]
@@ -28,6 +30,13 @@ class NotificationListView(generics.ListAPIView):
     def get_queryset(self):
         return Notification.objects.filter(user=self.request.user).order_by('-created_at')
 
+    def list(self, request, *args, **kwargs):
+        if not archive.include_archived(request):
+            return super().list(request, *args, **kwargs)
+        notifications = list(self.get_queryset()) + list(archive.archived('notifications', user_id=request.user.id))
+        notifications.sort(key=lambda notification: notification.created_at, reverse=True)
+        return Response(self.get_serializer(notifications, many=True).data)
+
 
 class UnreadCountView(APIView):
     """
@@ -81,10 +90,11 @@ class MarkAllReadView(APIView):
 
 class ClearNotificationsView(APIView):
     """
-    DELETE: Clear all notifications for the user.
+    DELETE: Clear all notifications for the user, archived ones included.
     """
     permission_classes = [IsAuthenticated]
 
     def delete(self, request):
         Notification.objects.filter(user=request.user).delete()
+        ArchiveSegment.objects.filter(kind='notifications', user=request.user).delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
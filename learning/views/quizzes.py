@@ -1,18 +1,23 @@
 from typing import List, Dict, Any
-from django.db.models import QuerySet
+from django.db.models import QuerySet, Count, Max, prefetch_related_objects
 from django.shortcuts import get_object_or_404
 from django.conf import settings
+from django.utils import timezone
 from django.core.mail import send_mail
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, BasePermission
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.request import Request
 from rest_framework.serializers import BaseSerializer
 
-from ..models import Course, Lesson, Enrollment, LessonProgress, Quiz, Question, QuizAttempt
+from .. import archive, question_import
+from ..models import Course, Enrollment, LessonProgress, Quiz, Question, QuizAttempt
 from ..serializers import QuizSerializer, QuestionSerializer, QuizAttemptSerializer
 from ..permissions import IsInstructor, IsStudent
+from ..structure import get_course_structure
+from ..utils.conditional import build_etag, not_modified, set_validators
 
 
 class QuizListCreateView(generics.ListCreateAPIView):
@@ -31,6 +36,17 @@ class QuizListCreateView(generics.ListCreateAPIView):
         course_id = self.kwargs.get('course_id')
         return Quiz.objects.filter(course_id=course_id)
 
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        # Question edits bump Quiz.updated_at, so (count, max updated_at) covers the nested body
+        version = self.get_queryset().aggregate(count=Count('id'), last=Max('updated_at'))
+        etag = build_etag("quizzes", self.kwargs.get('course_id'), version['count'], version['last'])
+        cached = not_modified(request, etag, version['last'])
+        if cached is not None:
+            return cached
+
+        response = super().list(request, *args, **kwargs)
+        return set_validators(response, etag, version['last'])
+
     def perform_create(self, serializer: BaseSerializer) -> None:
         course_id = self.kwargs.get('course_id')
         course = get_object_or_404(Course, pk=course_id, instructor=self.request.user)
@@ -59,6 +75,61 @@ class QuestionListCreateView(generics.ListCreateAPIView):
             correct_option=serializer.validated_data["correct_option"].strip().upper()
         )
 
+        # Bump the quiz version so cached quiz lists are revalidated
+        Quiz.objects.filter(pk=quiz.pk).update(updated_at=timezone.now())
+
+
+class QuestionBulkImportView(APIView):
+    """
+    Instructor creates or edits many questions of a quiz at once
+    (see learning/question_import.py for the formats).
+
+    Body: {"questions": [...]}, or {"format": "csv|aiken|gift|json", "text": "..."},
+    or a multipart "file" (format from the "format" field or the file name).
+    Nothing is written unless every row is valid.
+    """
+    permission_classes = [IsAuthenticated, IsInstructor]
+    parser_classes = (JSONParser, MultiPartParser, FormParser)
+
+    def post(self, request: Request, quiz_id: int) -> Response:
+        # One ownership check for the whole batch
+        quiz = get_object_or_404(Quiz, pk=quiz_id, course__instructor=request.user)
+
+        upload = request.FILES.get('file')
+        fmt = request.data.get('format')
+        if upload is not None:
+            fmt = fmt or question_import.guess_format(upload.name)
+            try:
+                source = upload.read().decode('utf-8-sig')
+            except UnicodeDecodeError:
+                return Response({"error": "The file must be UTF-8 encoded"}, status=status.HTTP_400_BAD_REQUEST)
+        elif 'questions' in request.data:
+            fmt, source = 'json', request.data['questions']
+        else:
+            source = request.data.get('text', '')
+        if fmt not in question_import.FORMATS:
+            return Response(
+                {"error": f"format must be one of: {', '.join(question_import.FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            rows = question_import.parse(source, fmt)
+        except question_import.ParseError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        if not rows:
+            return Response({"error": "No questions found"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > question_import.MAX_QUESTIONS:
+            return Response(
+                {"error": f"At most {question_import.MAX_QUESTIONS} questions per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        summary, errors = question_import.import_questions(quiz, rows)
+        if errors:
+            return Response({"error": "No questions were saved", "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(summary, status=status.HTTP_200_OK)
+
 
 class AttemptQuizView(APIView):
     permission_classes = [IsAuthenticated, IsStudent]
@@ -75,14 +146,9 @@ class AttemptQuizView(APIView):
         )
 
         # 2. Ensure FINAL lesson is completed
-        final_lesson = (
-            Lesson.objects
-            .filter(course=quiz.course)
-            .order_by("-lesson_order")
-            .first()
-        )
+        final_lesson_id = get_course_structure(quiz.course_id).final_lesson_id
 
-        if not final_lesson:
+        if not final_lesson_id:
             return Response(
                 {"error": "No lessons found for this course."},
                 status=status.HTTP_400_BAD_REQUEST
@@ -90,7 +156,7 @@ class AttemptQuizView(APIView):
 
         if not LessonProgress.objects.filter(
             enrollment=enrollment,
-            lesson=final_lesson,
+            lesson_id=final_lesson_id,
             completed_at__isnull=False
         ).exists():
             return Response(
@@ -202,13 +268,23 @@ class AttemptQuizView(APIView):
 
 
 class QuizResultsView(APIView):
+    """
+    The student's attempts at a quiz, newest first.
+    ?include_archived=true adds attempts moved to the archive (learning/archive.py).
+    """
     permission_classes = [IsAuthenticated, IsStudent]
 
     def get(self, request: Request, quiz_id: int) -> Response:
-        attempts = QuizAttempt.objects.filter(
+        attempts = list(QuizAttempt.objects.filter(
             student=request.user,
             quiz_id=quiz_id
-        ).order_by("-attempted_at")
+        ).select_related("quiz__course").order_by("-attempted_at"))
+
+        if archive.include_archived(request):
+            archived = [a for a in archive.archived("attempts", user_id=request.user.id) if a.quiz_id == quiz_id]
+            if archived and Quiz.all_objects.filter(pk=quiz_id).exists():
+                prefetch_related_objects(archived, "quiz__course")
+                attempts = sorted(attempts + archived, key=lambda a: a.attempted_at, reverse=True)
 
         serializer = QuizAttemptSerializer(attempts, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
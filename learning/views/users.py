@@ -31,7 +31,7 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
 
         if user.is_staff or getattr(user.role, "name", "") == "ADMIN":
             if user_id:
-                target_user = get_object_or_404(User, id=user_id)
+                target_user = get_object_or_404(User.objects.select_related("role"), id=user_id)
                 
                 # 🚫 SECURITY: Admin cannot view other Admins
                 if getattr(target_user.role, "name", "") == "ADMIN" and target_user != user:
@@ -0,0 +1,436 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+from learning import counters
+from learning.models import (
+    Role, Course, Lesson, Quiz, Question, Enrollment, LessonProgress,
+    QuizAttempt, CourseRating, Comment, Notification,
+)
+
+User = get_user_model()
+
+# Synthetic timeline: two years of activity ending here (fixed for determinism)
+TIMELINE_START = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+TIMELINE_DAYS = 730
+
+WORDS = (
+    "django python model view serializer query index cache request response "
+    "lesson course quiz student progress migration database table column "
+    "transaction signal middleware template router endpoint token session "
+    "async channel socket queue worker batch schema field relation manager "
+    "filter annotate aggregate prefetch select join order limit offset page"
+).split()
+
+# Per-process state set by _init_worker (or directly when running in-process)
+_CONTEXT = {}
+
+
+def _init_worker(context):
+    import django
+    from django.apps import apps
+    if not apps.ready:  # spawn start method (Windows/macOS) re-imports everything
+        django.setup()
+    _CONTEXT.clear()
+    _CONTEXT.update(context)
+
+
+def _rng(phase, chunk_index):
+    return random.Random(f"{_CONTEXT['seed']}:{phase}:{chunk_index}")
+
+
+def _when(rng, start_day=0):
+    day = rng.uniform(start_day, TIMELINE_DAYS)
+    return TIMELINE_START + timedelta(days=day)
+
+
+def _text(rng, words):
+    return " ".join(rng.choices(WORDS, k=words)).capitalize() + "."
+
+
+def _course_index(title):
+    """Position of a generated course, from its "<prefix> course <i>: ..." title."""
+    return int(title.split(':', 1)[0].rsplit(' ', 1)[1])
+
+
+def _zipf_weights(count, exponent=1.1):
+    """Cumulative Zipf weights so a few items get most of the traffic."""
+    total, cumulative = 0.0, []
+    for rank in range(1, count + 1):
+        total += 1.0 / (rank ** exponent)
+        cumulative.append(total)
+    return cumulative
+
+
+# ---- chunk generators: each returns {Model: [instances]} for one chunk ----
+
+def _gen_users(rng, chunk):
+    role_ids, prefix, password = _CONTEXT['role_ids'], _CONTEXT['prefix'], _CONTEXT['password']
+    users = []
+    for i, role in chunk:
+        users.append(User(
+            username=f"{prefix}_{role.lower()}_{i}",
+            email=f"{prefix}_{role.lower()}_{i}@example.com",
+            password=password,
+            role_id=role_ids[role],
+            is_staff=role == "INSTRUCTOR",
+            created_at=_when(rng),
+        ))
+    return {User: users}
+
+
+def _gen_courses(rng, chunk):
+    instructors = _CONTEXT['instructor_ids']
+    weights = _zipf_weights(len(instructors))
+    courses = []
+    for i in chunk:
+        courses.append(Course(
+            instructor_id=rng.choices(instructors, cum_weights=weights)[0],
+            title=f"{_CONTEXT['prefix']} course {i}: {_text(rng, 4)}",
+            description=_text(rng, 40),
+            is_published=rng.random() < 0.85,
+            created_at=_when(rng),
+        ))
+    return {Course: courses}
+
+
+def _gen_content(rng, chunk):
+    lessons_per_course, questions_per_quiz = _CONTEXT['lessons_per_course'], _CONTEXT['questions_per_quiz']
+    lessons, quizzes = [], []
+    for course_id in chunk:
+        count = max(1, int(rng.gauss(lessons_per_course, lessons_per_course / 3)))
+        for order in range(1, count + 1):
+            paragraphs = "\n\n".join(_text(rng, rng.randint(60, 200)) for _ in range(rng.randint(2, 6)))
+            lessons.append(Lesson(
+                course_id=course_id,
+                title=f"Lesson {order}: {_text(rng, 3)}",
+                content=paragraphs,
+                lesson_order=order,
+            ))
+        quizzes.append(Quiz(course_id=course_id, total_marks=questions_per_quiz, pass_marks=questions_per_quiz // 2))
+    return {Lesson: lessons, Quiz: quizzes}
+
+
+def _gen_questions(rng, chunk):
+    questions = []
+    for quiz_id in chunk:
+        for _ in range(_CONTEXT['questions_per_quiz']):
+            questions.append(Question(
+                quiz_id=quiz_id,
+                question_text=_text(rng, 12) + "?",
+                option_a=_text(rng, 3),
+                option_b=_text(rng, 3),
+                option_c=_text(rng, 3),
+                option_d=_text(rng, 3),
+                correct_option=rng.choice("ABCD"),
+            ))
+    return {Question: questions}
+
+
+def _gen_enrollments(rng, chunk):
+    courses = _CONTEXT['published_course_ids']
+    weights = _zipf_weights(len(courses))
+    per_student = _CONTEXT['enrollments_per_student']
+    enrollments = []
+    for student_id in chunk:
+        # Heavy-tailed: most students take a couple of courses, a few take many
+        wanted = min(len(courses), 1 + int(rng.expovariate(1 / max(per_student - 1, 0.1))))
+        # Picked by position, so the choice never depends on primary key values
+        picked = set()
+        while len(picked) < wanted:
+            picked.add(rng.choices(range(len(courses)), cum_weights=weights)[0])
+        for index in sorted(picked):
+            enrollments.append(Enrollment(student_id=student_id, course_id=courses[index], enrolled_at=_when(rng)))
+    return {Enrollment: enrollments}
+
+
+def _gen_activity(rng, chunk):
+    course_lessons, course_quiz = _CONTEXT['course_lessons'], _CONTEXT['course_quiz']
+    progress, attempts, ratings, comments, notifications = [], [], [], [], []
+
+    for enrollment_id, student_id, course_id, enrolled_at in chunk:
+        lessons = course_lessons.get(course_id, ())
+        notifications.append(Notification(
+            user_id=student_id,
+            notification_type='ENROLLED',
+            message=f"Successfully enrolled in course {course_id}",
+            data={'course_id': course_id},
+            is_read=rng.random() < 0.7,
+            created_at=enrolled_at,
+        ))
+
+        # A quarter finish the course; the rest skew low (early drop-off)
+        if rng.random() < 0.25:
+            completed = len(lessons)
+        else:
+            completed = round(rng.betavariate(0.8, 1.6) * len(lessons))
+        moment = enrolled_at
+        for lesson_id in lessons[:completed]:
+            moment += timedelta(hours=rng.uniform(1, 72))
+            progress.append(LessonProgress(enrollment_id=enrollment_id, lesson_id=lesson_id, completed_at=moment))
+
+        quiz_id = course_quiz.get(course_id)
+        if lessons and completed == len(lessons) and quiz_id:
+            for attempt in range(rng.randint(1, 3)):
+                passed = rng.random() < 0.6 + 0.15 * attempt
+                score = rng.uniform(50, 100) if passed else rng.uniform(0, 49)
+                moment += timedelta(hours=rng.uniform(1, 48))
+                attempts.append(QuizAttempt(
+                    student_id=student_id, quiz_id=quiz_id, score=round(score, 1),
+                    is_passed=passed, attempted_at=moment,
+                ))
+                notifications.append(Notification(
+                    user_id=student_id,
+                    notification_type='QUIZ_GRADED',
+                    message=f"Quiz graded: {score:.0f}%",
+                    data={'quiz_id': quiz_id, 'course_id': course_id, 'score': score, 'is_passed': passed},
+                    is_read=rng.random() < 0.5,
+                    created_at=moment,
+                ))
+                if passed:
+                    break
+
+        if rng.random() < 0.3:
+            ratings.append(CourseRating(
+                student_id=student_id, course_id=course_id,
+                rating=rng.choices((1, 2, 3, 4, 5), weights=(2, 3, 10, 35, 50))[0],
+                feedback=_text(rng, rng.randint(0, 20)) if rng.random() < 0.5 else "",
+                created_at=moment + timedelta(hours=rng.uniform(1, 240)),
+            ))
+
+        if rng.random() < 0.1:
+            lesson_id = rng.choice(lessons[:completed]) if completed and rng.random() < 0.6 else None
+            comments.append(Comment(
+                user_id=student_id, course_id=course_id, lesson_id=lesson_id, text=_text(rng, 25),
+                created_at=enrolled_at + timedelta(hours=rng.uniform(1, 24 * 30)),
+            ))
+
+    return {
+        LessonProgress: progress,
+        QuizAttempt: attempts,
+        CourseRating: ratings,
+        Comment: comments,
+        Notification: notifications,
+    }
+
+
+def _gen_replies(rng, chunk):
+    course_instructor = _CONTEXT['course_instructor']
+    replies = []
+    for comment_id, course_id, lesson_id, created_at in chunk:
+        if rng.random() < 0.4:
+            replies.append(Comment(
+                user_id=course_instructor[course_id], course_id=course_id, lesson_id=lesson_id,
+                parent_id=comment_id, text=_text(rng, 20),
+                created_at=created_at + timedelta(hours=rng.uniform(1, 96)),
+            ))
+    return {Comment: replies}
+
+
+GENERATORS = {
+    'users': _gen_users,
+    'courses': _gen_courses,
+    'content': _gen_content,
+    'questions': _gen_questions,
+    'enrollments': _gen_enrollments,
+    'activity': _gen_activity,
+    'replies': _gen_replies,
+}
+
+
+@contextmanager
+def _generated_timestamps(model):
+    """
+    Turn off auto_now_add on model's fields for the block, so bulk_create
+    inserts the generated times instead of "now". Yields those fields.
+    """
+    fields = [field for field in model._meta.concrete_fields if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield fields
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _run_chunk(phase, chunk_index, chunk):
+    rows = GENERATORS[phase](_rng(phase, chunk_index), chunk)
+    counts = {}
+    now = timezone.now()
+    for model, objects in rows.items():
+        with _generated_timestamps(model) as stamped:
+            for obj in objects:
+                for field in stamped:
+                    if getattr(obj, field.attname) is None:
+                        setattr(obj, field.attname, now)
+            model.objects.bulk_create(objects, batch_size=_CONTEXT['batch_size'])
+        counts[model.__name__] = len(objects)
+    return counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Deterministically generates a large, skewed dataset (users, courses, lessons, quizzes, '
+        'enrollments, progress, attempts, ratings, comments, notifications) for load and benchmark runs'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000, help='Total users (about 2%% instructors)')
+        parser.add_argument('--courses', type=int, default=200)
+        parser.add_argument('--lessons-per-course', type=int, default=12)
+        parser.add_argument('--questions-per-quiz', type=int, default=10)
+        parser.add_argument('--enrollments-per-student', type=float, default=4.0)
+        parser.add_argument('--seed', type=int, default=2024)
+        parser.add_argument('--prefix', default='scale', help='Username/title prefix for generated rows')
+        parser.add_argument('--password', default='password123')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Parent items per worker task')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Parallel worker processes (forced to 1 on SQLite)')
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(f'Users with prefix "{prefix}_" already exist. Use a different --prefix.')
+
+        self.workers = 1 if connection.vendor == 'sqlite' else max(1, options['workers'])
+        self.chunk_size = options['chunk_size']
+        self.totals = {}
+
+        role_ids = {}
+        for name in ('ADMIN', 'INSTRUCTOR', 'STUDENT'):
+            role_ids[name] = Role.objects.get_or_create(name=name)[0].id
+
+        self.context = {
+            'seed': options['seed'],
+            'prefix': prefix,
+            'batch_size': options['batch_size'],
+            'password': make_password(options['password']),  # hashed once for every user
+            'role_ids': role_ids,
+            'lessons_per_course': options['lessons_per_course'],
+            'questions_per_quiz': options['questions_per_quiz'],
+            'enrollments_per_student': options['enrollments_per_student'],
+        }
+
+        started = time.perf_counter()
+        self.stdout.write(f'Seeding "{prefix}" with {self.workers} worker(s)...')
+
+        # 1. Users
+        instructor_count = max(1, options['users'] // 50)
+        people = [(i, 'INSTRUCTOR') for i in range(instructor_count)]
+        people += [(i, 'STUDENT') for i in range(options['users'] - instructor_count)]
+        # Parallel chunks finish in any order, so primary keys are not deterministic:
+        # every list below is kept in generation order and picked from by position.
+        first_id = self.max_id(User)
+        self.phase('users', people)
+        user_ids = dict(
+            User.objects.filter(pk__gt=first_id, username__startswith=f'{prefix}_').values_list('username', 'id')
+        )
+        ids = [user_ids[f'{prefix}_{role.lower()}_{i}'] for i, role in people]
+        self.context['instructor_ids'] = ids[:instructor_count]
+        student_ids = ids[instructor_count:]
+        student_position = {student_id: n for n, student_id in enumerate(student_ids)}
+
+        # 2. Courses
+        first_id = self.max_id(Course)
+        self.phase('courses', list(range(options['courses'])))
+        course_rows = sorted(
+            Course.all_objects.filter(pk__gt=first_id).values_list('id', 'instructor_id', 'is_published', 'title'),
+            key=lambda row: _course_index(row[3]),
+        )
+        course_position = {cid: n for n, (cid, _, _, _) in enumerate(course_rows)}
+        self.context['published_course_ids'] = [cid for cid, _, published, _ in course_rows if published]
+        self.context['course_instructor'] = {cid: instructor for cid, instructor, _, _ in course_rows}
+
+        # 3. Lessons + quizzes, then questions
+        first_lesson, first_quiz = self.max_id(Lesson), self.max_id(Quiz)
+        self.phase('content', [cid for cid, _, _, _ in course_rows])
+        course_lessons = {}
+        for lesson_id, course_id in (
+            Lesson.all_objects.filter(pk__gt=first_lesson).order_by('course_id', 'lesson_order')
+            .values_list('id', 'course_id')
+        ):
+            course_lessons.setdefault(course_id, []).append(lesson_id)
+        quiz_rows = sorted(
+            Quiz.all_objects.filter(pk__gt=first_quiz).values_list('id', 'course_id'),
+            key=lambda row: course_position[row[1]],
+        )
+        self.context['course_lessons'] = {cid: tuple(ids) for cid, ids in course_lessons.items()}
+        self.context['course_quiz'] = {course_id: quiz_id for quiz_id, course_id in quiz_rows}
+        self.phase('questions', [quiz_id for quiz_id, _ in quiz_rows])
+
+        # 4. Enrollments
+        first_id = self.max_id(Enrollment)
+        if self.context['published_course_ids']:
+            self.phase('enrollments', student_ids)
+        enrollments = sorted(
+            Enrollment.all_objects.filter(pk__gt=first_id).values_list('id', 'student_id', 'course_id', 'enrolled_at'),
+            key=lambda row: (student_position[row[1]], course_position[row[2]]),
+        )
+
+        # 5. Progress, attempts, ratings, comments, notifications
+        first_id = self.max_id(Comment)
+        self.phase('activity', enrollments)
+
+        # 6. Instructor replies to threads
+        # At most one thread per enrollment, so (student, course) orders them
+        threads = sorted(
+            Comment.objects.filter(pk__gt=first_id, parent__isnull=True)
+            .values_list('id', 'course_id', 'lesson_id', 'created_at', 'user_id'),
+            key=lambda row: (student_position[row[4]], course_position[row[1]]),
+        )
+        self.phase('replies', [row[:4] for row in threads])
+
+        # bulk_create sends no signals, so the dashboard counters missed every row
+        counters.reconcile()
+
+        elapsed = time.perf_counter() - started
+        total = sum(self.totals.values())
+        self.stdout.write('')
+        for name, count in sorted(self.totals.items()):
+            self.stdout.write(f'  {name:<16} {count:>12,}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)'
+        ))
+
+    def phase(self, name, items):
+        started = time.perf_counter()
+        chunks = [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+        counts = {}
+
+        if self.workers == 1 or len(chunks) == 1:
+            _init_worker(self.context)
+            results = (_run_chunk(name, index, chunk) for index, chunk in enumerate(chunks))
+            for result in results:
+                self.merge(counts, result)
+        else:
+            # Child processes open their own connections; never share the parent's
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker, initargs=(self.context,)
+            ) as pool:
+                futures = [pool.submit(_run_chunk, name, index, chunk) for index, chunk in enumerate(chunks)]
+                for future in futures:
+                    self.merge(counts, future.result())
+
+        rows = sum(counts.values())
+        self.stdout.write(f'  {name:<12} {rows:>10,} rows in {time.perf_counter() - started:6.1f}s')
+
+    def merge(self, counts, result):
+        for model_name, count in result.items():
+            counts[model_name] = counts.get(model_name, 0) + count
+            self.totals[model_name] = self.totals.get(model_name, 0) + count
+
+    @staticmethod
+    def max_id(model):
+        manager = getattr(model, 'all_objects', model.objects)
+        return manager.order_by('-pk').values_list('pk', flat=True).first() or 0